@@ -0,0 +1,197 @@
+"""
+Synthetic AvailRQ corpus generator.
+
+    python -m benchmarks.corpus --requests 1000 --output corpus.xml
+
+Generates request documents that look like production traffic. Most are valid
+requests: 1-5 rooms of 1-4 pax (children on some), an optional <AvailDestinations>,
+and varied languages, currencies, nationalities, quotas and stays. The rest are
+rejected requests, spread evenly over REJECTION_KINDS, one for every way a request
+can be turned down. Each document is written on one line, so the file can be
+replayed with python -m src.main --input corpus.xml.
+"""
+import argparse
+import datetime
+import random
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from src.configs import (
+    ALLOWED_CHILD_COUNT_PER_ROOM,
+    ALLOWED_CURRENCIES,
+    ALLOWED_NATIONALITIES,
+    ALLOWED_ROOM_COUNT,
+    ALLOWED_ROOM_GUEST_COUNT,
+    MAX_OPTIONS_QUOTA,
+    MAX_XML_DEPTH,
+    VALID_LANGUAGES,
+)
+
+# The error each kind of rejected request is answered with
+REJECTION_KINDS: Dict[str, str] = {
+    "malformed_xml": "Invalid XML format.",
+    "input_limit": "Request exceeds the maximum nesting depth.",
+    "options_quota": f"optionsQuota cannot be greater than {MAX_OPTIONS_QUOTA}.",
+    "missing_parameters": "Missing required parameters: password, username, or CompanyID.",
+    "company_id": "CompanyID must be an integer.",
+    "single_destination": "For Single search type, exactly one AvailDestination is required.",
+    "room_count": "Exceeded maximum allowed room count.",
+    "room_guests": "Exceeded maximum allowed guests per room.",
+    "invalid_age": "Invalid age value in Pax element.",
+    "children_per_room": "Exceeded maximum children per room.",
+    "child_without_adult": "Each room with children must have at least one adult.",
+    "missing_dates": "Missing StartDate or EndDate.",
+    "date_format": "Dates must be in dd/mm/yyyy format.",
+    "start_too_soon": "StartDate must be at least 2 days after today.",
+    "stay_too_short": "The stay duration must be at least 3 nights.",
+}
+KINDS = ("valid",) + tuple(REJECTION_KINDS)
+
+DESTINATIONS = ("PMI", "BCN", "MAD", "AGP", "IBZ", "TFS", "LPA", "LON", "PAR", "ROM", "NYC", "MIA")
+
+
+class CorpusRequest(NamedTuple):
+    kind: str
+    xml: str
+
+
+def _room(rng: random.Random, children: Optional[int] = None, adults: Optional[int] = None) -> List[str]:
+    if children is None:
+        children = rng.choice((0, 0, 0, 1, 2)) if ALLOWED_CHILD_COUNT_PER_ROOM else 0
+        children = min(children, ALLOWED_CHILD_COUNT_PER_ROOM, ALLOWED_ROOM_GUEST_COUNT - 1)
+    if adults is None:
+        adults = rng.randint(1, ALLOWED_ROOM_GUEST_COUNT - children)
+    # Pax aged 5 or under count as children; older children travel as adults
+    ages = [str(rng.randint(18, 80)) for _ in range(adults)] + [str(rng.randint(0, 5)) for _ in range(children)]
+    if adults and rng.random() < 0.2:
+        ages[0] = str(rng.randint(6, 17))
+    rng.shuffle(ages)
+    return ages
+
+
+def _rooms_xml(rooms: List[List[str]]) -> str:
+    return "".join("<Paxes>" + "".join(f'<Pax age="{age}"/>' for age in room) + "</Paxes>" for room in rooms)
+
+
+def _destinations_xml(codes: Sequence[str], rng: random.Random) -> str:
+    # Suppliers send the code as an attribute or as the element's text
+    if rng.random() < 0.5:
+        children = "".join(f'<Destination code="{code}"/>' for code in codes)
+    else:
+        children = "".join(f"<Destination>{code}</Destination>" for code in codes)
+    return f"<AvailDestinations>{children}</AvailDestinations>"
+
+
+def generate_request(kind: str, rng: random.Random, today: Optional[datetime.date] = None) -> str:
+    """
+    One AvailRQ document of the given kind ("valid" or one of REJECTION_KINDS).
+    """
+    today = today or datetime.date.today()
+    start = today + datetime.timedelta(days=rng.randint(3, 180))
+    nights = rng.choice((3, 3, 4, 5, 7, 7, 10, 14, 21, 28))
+    fields = {
+        "language": rng.choice(sorted(VALID_LANGUAGES) + ["it"]),
+        "quota": str(rng.randint(1, MAX_OPTIONS_QUOTA)),
+        "parameters": f'<Parameter password="pw{rng.randrange(10**6)}" username="agency{rng.randrange(500)}" '
+                      f'CompanyID="{rng.randrange(100000, 1000000)}"/>',
+        "search_type": "Multiple",
+        "destinations": [],
+        "rooms": [_room(rng) for _ in range(min(rng.choice((1, 1, 1, 2, 2, 3, 4, 5)), ALLOWED_ROOM_COUNT))],
+        "start": start.strftime("%d/%m/%Y"),
+        "end": (start + datetime.timedelta(days=nights)).strftime("%d/%m/%Y"),
+        "currency": rng.choice(sorted(ALLOWED_CURRENCIES) + ["CHF"]),
+        "nationality": rng.choice(sorted(ALLOWED_NATIONALITIES) + ["ES", "FR"]),
+    }
+    if rng.random() < 0.5:
+        fields["destinations"] = rng.sample(DESTINATIONS, rng.choice((1, 1, 2, 3)))
+        if len(fields["destinations"]) == 1 and rng.random() < 0.5:
+            fields["search_type"] = "Single"
+
+    if kind == "options_quota":
+        fields["quota"] = str(MAX_OPTIONS_QUOTA + rng.randint(1, 50))
+    elif kind == "missing_parameters":
+        fields["parameters"] = '<Parameter username="agency1" CompanyID="123456"/>'
+    elif kind == "company_id":
+        fields["parameters"] = '<Parameter password="pw" username="agency1" CompanyID="ACME"/>'
+    elif kind == "single_destination":
+        fields["search_type"] = "Single"
+        fields["destinations"] = rng.choice(([], rng.sample(DESTINATIONS, 2)))
+    elif kind == "room_count":
+        fields["rooms"] = [_room(rng) for _ in range(ALLOWED_ROOM_COUNT + 1)]
+    elif kind == "room_guests":
+        fields["rooms"][-1] = _room(rng, children=0, adults=ALLOWED_ROOM_GUEST_COUNT + 1)
+    elif kind == "invalid_age":
+        fields["rooms"][-1][0] = rng.choice(("x", "", "4.5", "adult"))
+    elif kind == "children_per_room":
+        fields["rooms"][-1] = _room(rng, children=ALLOWED_CHILD_COUNT_PER_ROOM + 1, adults=1)
+    elif kind == "child_without_adult":
+        fields["rooms"][-1] = _room(rng, children=rng.randint(1, ALLOWED_CHILD_COUNT_PER_ROOM), adults=0)
+    elif kind == "date_format":
+        fields["start"] = start.isoformat()
+    elif kind == "start_too_soon":
+        fields["start"] = today.strftime("%d/%m/%Y")
+        fields["end"] = (today + datetime.timedelta(days=nights)).strftime("%d/%m/%Y")
+    elif kind == "stay_too_short":
+        fields["end"] = (start + datetime.timedelta(days=rng.randint(0, 2))).strftime("%d/%m/%Y")
+    elif kind not in KINDS:
+        raise ValueError(f"Unknown request kind: {kind}")
+
+    dates = "" if kind == "missing_dates" else (
+        f"<StartDate>{fields['start']}</StartDate><EndDate>{fields['end']}</EndDate>"
+    )
+    extra = "<Extra>" * MAX_XML_DEPTH + "</Extra>" * MAX_XML_DEPTH if kind == "input_limit" else ""
+    xml = (
+        '<AvailRQ xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema">'
+        f"<timeoutMilliseconds>25000</timeoutMilliseconds>"
+        f"<source><languageCode>{fields['language']}</languageCode></source>"
+        f"<optionsQuota>{fields['quota']}</optionsQuota>"
+        f"<Configuration><Parameters>{fields['parameters']}</Parameters></Configuration>"
+        f"<SearchType>{fields['search_type']}</SearchType>"
+        + (_destinations_xml(fields["destinations"], rng) if fields["destinations"] or kind == "single_destination" else "")
+        + dates
+        + f"<Currency>{fields['currency']}</Currency>"
+        f"<Nationality>{fields['nationality']}</Nationality>"
+        + _rooms_xml(fields["rooms"])
+        + extra
+        + "</AvailRQ>"
+    )
+    if kind == "malformed_xml":
+        xml = xml[:rng.randint(len(xml) // 4, len(xml) - 2)]
+    return xml
+
+
+def generate_corpus(
+    count: int,
+    seed: int = 1,
+    rejected_share: float = 0.2,
+    today: Optional[datetime.date] = None
+) -> List[CorpusRequest]:
+    """
+    count requests: rejected_share of them rejected, spread evenly over
+    REJECTION_KINDS, and the rest valid, in random order.
+    """
+    rng = random.Random(seed)
+    rejected = round(count * rejected_share)
+    rejection_kinds = list(REJECTION_KINDS)
+    kinds = ["valid"] * (count - rejected) + [rejection_kinds[index % len(rejection_kinds)] for index in range(rejected)]
+    rng.shuffle(kinds)
+    return [CorpusRequest(kind, generate_request(kind, rng, today)) for kind in kinds]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.corpus")
+    arg_parser.add_argument("--requests", type=int, default=1000)
+    arg_parser.add_argument("--rejected-share", type=float, default=0.2)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--output", default="-", help="file to write, one document per line; - for stdout")
+    args = arg_parser.parse_args(argv)
+
+    corpus = generate_corpus(args.requests, args.seed, args.rejected_share)
+    lines = "".join(request.xml + "\n" for request in corpus)
+    if args.output == "-":
+        print(lines, end="")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures the mmap hotel inventory at multi-million-hotel sizes.
+
+    python -m benchmarks.inventory_lookup --hotels 2000000 --destinations 50000
+
+Builds an inventory file of --hotels random hotels, then reports the time to open it,
+the time per destination lookup and the Python memory traced while doing so, next to
+loading the same hotels into a dict of lists as the baseline.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import timeit
+import tracemalloc
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from src.inventory import HOTEL_DTYPE, open_inventory, write_inventory
+
+
+def _hotels(count: int, destinations: int, seed: int) -> List[Tuple[str, int, int]]:
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, destinations, count)
+    return [(f"D{code:06d}", hotel_code, int(category)) for hotel_code, (code, category) in enumerate(
+        zip(codes.tolist(), rng.integers(1, 6, count).tolist()), start=1_000_000
+    )]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.inventory_lookup")
+    arg_parser.add_argument("--hotels", type=int, default=2_000_000)
+    arg_parser.add_argument("--destinations", type=int, default=50_000)
+    arg_parser.add_argument("--lookups", type=int, default=20_000)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args(argv)
+
+    hotels = _hotels(args.hotels, args.destinations, args.seed)
+    fd, path = tempfile.mkstemp(suffix=".inv")
+    os.close(fd)
+    try:
+        started = time.perf_counter()
+        write_inventory(path, hotels)
+        build_s = time.perf_counter() - started
+
+        rng = random.Random(args.seed)
+        queries = [f"D{rng.randrange(args.destinations):06d}" for _ in range(args.lookups)]
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        inventory = open_inventory(path)
+        open_s = time.perf_counter() - started
+        open_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        mmap_us = min(timeit.repeat(
+            lambda: [inventory.hotels_for(code) for code in queries], number=1, repeat=5
+        )) / len(queries) * 1e6
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        by_destination = {}
+        for destination, hotel_code, _ in hotels:
+            by_destination.setdefault(destination, []).append(hotel_code)
+        dict_s = time.perf_counter() - started
+        dict_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        dict_us = min(timeit.repeat(
+            lambda: [by_destination.get(code, []) for code in queries], number=1, repeat=5
+        )) / len(queries) * 1e6
+
+        assert all(
+            inventory.hotels_for(code).tolist() == sorted(by_destination.get(code, [])) for code in queries[:1000]
+        )
+        print(f"hotels: {len(inventory)}, destinations: {inventory.destination_count}, "
+              f"file: {os.path.getsize(path) / 2**20:.1f} MiB ({HOTEL_DTYPE.itemsize} B/record), build {build_s:.1f} s")
+        print(f"{'method':<14} {'open/load ms':>13} {'python KiB':>11} {'lookup us':>10}")
+        print(f"{'mmap index':<14} {open_s * 1000:>13.2f} {open_bytes / 1024:>11.0f} {mmap_us:>10.2f}")
+        print(f"{'dict of lists':<14} {dict_s * 1000:>13.2f} {dict_bytes / 1024:>11.0f} {dict_us:>10.2f}")
+        del inventory
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
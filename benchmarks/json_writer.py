@@ -0,0 +1,71 @@
+"""
+Compares ways of writing an offer list as compact JSON.
+
+    python -m benchmarks.json_writer --counts 50 10000 200000
+
+For each offer count it writes the same OfferBatch to a sink with json.dumps over
+to_dicts(), with encode_offers and with the streaming write_offers, and reports total
+time, time to the first write and traced peak memory. All three outputs are checked
+to be byte-identical.
+"""
+import argparse
+import hashlib
+import json
+import time
+import tracemalloc
+from typing import Callable, Optional, Sequence
+from src.pricing import price_offers
+from src.serialization import COMPACT_SEPARATORS, encode_offers, write_bytes, write_offers
+
+
+class _Sink:
+    """
+    Discards what it is given, keeping a running SHA-256 and the time of the first write.
+    """
+
+    def __init__(self) -> None:
+        self.first_write: Optional[float] = None
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data: bytes) -> None:
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        self.sha256.update(data)
+
+
+def _measure(write: Callable[[_Sink], None]) -> tuple:
+    sink = _Sink()
+    tracemalloc.start()
+    started = time.perf_counter()
+    write(sink)
+    total = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return total, sink.first_write - started, peak, sink
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.json_writer")
+    arg_parser.add_argument("--counts", type=int, nargs="+", default=[50, 10_000, 200_000])
+    args = arg_parser.parse_args(argv)
+
+    methods = {
+        "json.dumps": lambda offers, sink: write_bytes(
+            json.dumps(offers.to_dicts(), separators=COMPACT_SEPARATORS).encode(), sink
+        ),
+        "encode_offers": lambda offers, sink: write_bytes(encode_offers(offers), sink),
+        "write_offers": write_offers,
+    }
+    print(f"{'offers':>7} {'method':<14} {'total ms':>9} {'first byte ms':>14} {'peak KiB':>9}")
+    for count in args.counts:
+        offers = price_offers("EUR", "US", count)
+        digests = set()
+        for name, method in methods.items():
+            total, first, peak, sink = _measure(lambda sink: method(offers, sink))
+            digests.add(sink.sha256.digest())
+            print(f"{count:>7} {name:<14} {total * 1000:>9.2f} {first * 1000:>14.3f} {peak / 1024:>9.0f}")
+        assert len(digests) == 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Measures markup rule loading and lookup at production rule counts.
+
+    python -m benchmarks.markup_rules --rules 100000 --lookups 20000
+
+It writes --rules random rules by company, market, currency and stay dates to a
+temporary CSV, loads it into a MarkupRuleIndex and reports the load time and the time
+per markup_for lookup, next to a linear scan over the same rules for comparison.
+"""
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+import timeit
+from typing import List, Optional, Sequence, Tuple
+from src.markup_rules import KEY_PATTERNS, RULE_FIELDS, MarkupRule, load_markup_rules
+
+MARKETS = ("US", "GB", "CA", "*")
+CURRENCIES = ("USD", "EUR", "GBP", "*")
+FIRST_DAY = datetime.date(2030, 1, 1)
+
+
+def _random_rules(count: int, companies: int, rng: random.Random) -> List[MarkupRule]:
+    rules = []
+    for _ in range(count):
+        start = FIRST_DAY + datetime.timedelta(days=rng.randrange(365))
+        market, currency = rng.choice(MARKETS), rng.choice(CURRENCIES)
+        rules.append(MarkupRule(
+            company_id=rng.randrange(companies) if rng.random() < 0.95 else None,
+            market=None if market == "*" else market,
+            currency=None if currency == "*" else currency,
+            markup=round(rng.uniform(0, 15), 2),
+            start=start,
+            end=start + datetime.timedelta(days=rng.randrange(1, 90)),
+        ))
+    return rules
+
+
+def _write_rules(path: str, rules: List[MarkupRule]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(RULE_FIELDS) + "\n")
+        for rule in rules:
+            f.write(
+                f"{'*' if rule.company_id is None else rule.company_id},{rule.market or '*'},{rule.currency or '*'},"
+                f"{rule.start.isoformat()},{rule.end.isoformat()},{rule.markup}\n"
+            )
+
+
+def _linear_markup(rules: List[MarkupRule], company_id: int, market: str, currency: str, day: datetime.date) -> Optional[float]:
+    # The scan the index replaces: every rule is checked, the most specific key wins,
+    # then the narrowest range, then the rule listed last
+    best: Optional[Tuple[int, int, int]] = None
+    markup = None
+    for order, rule in enumerate(rules):
+        if (
+            (rule.company_id is None or rule.company_id == company_id)
+            and (rule.market is None or rule.market == market)
+            and (rule.currency is None or rule.currency == currency)
+            and rule.start <= day <= rule.end
+        ):
+            pattern = (rule.company_id is not None, rule.market is not None, rule.currency is not None)
+            rank = (-KEY_PATTERNS.index(pattern), -(rule.end - rule.start).days, order)
+            if best is None or rank > best:
+                best, markup = rank, rule.markup
+    return markup
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.markup_rules")
+    arg_parser.add_argument("--rules", type=int, default=100_000)
+    arg_parser.add_argument("--companies", type=int, default=5_000)
+    arg_parser.add_argument("--lookups", type=int, default=20_000)
+    arg_parser.add_argument("--scans", type=int, default=100, help="lookups checked and timed with the linear scan")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    rules = _random_rules(args.rules, args.companies, rng)
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        _write_rules(path, rules)
+        started = time.perf_counter()
+        index = load_markup_rules(path)
+        load_s = time.perf_counter() - started
+    finally:
+        os.remove(path)
+
+    queries = [
+        (
+            rng.randrange(args.companies),
+            rng.choice(MARKETS[:-1]),
+            rng.choice(CURRENCIES[:-1]),
+            FIRST_DAY + datetime.timedelta(days=rng.randrange(400)),
+        )
+        for _ in range(args.lookups)
+    ]
+    indexed_us = min(timeit.repeat(
+        lambda: [index.markup_for(*query) for query in queries], number=1, repeat=5
+    )) / len(queries) * 1e6
+
+    scanned = queries[:args.scans]
+    assert all(index.markup_for(*query) == _linear_markup(rules, *query) for query in scanned)
+    linear_us = min(timeit.repeat(
+        lambda: [_linear_markup(rules, *query) for query in scanned], number=1, repeat=3
+    )) / len(scanned) * 1e6
+
+    print(f"rules loaded:      {len(index):>10}")
+    print(f"load + index:      {load_s * 1000:>10.1f} ms")
+    print(f"indexed lookup:    {indexed_us:>10.2f} us")
+    print(f"linear scan:       {linear_us:>10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
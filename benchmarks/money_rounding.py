@@ -0,0 +1,62 @@
+"""
+Compares the integer-cent pricing path with the float path it replaced and with Decimal.
+
+    python -m benchmarks.money_rounding --prices 1000000
+
+Prices --prices random net amounts with configured-style markups and exchange rates
+(a few decimals each) three ways: float arrays rounded with np.round, the integer
+batch path (src.money.price_minor_units) and Decimal, one price at a time. Reports
+the time per price and how many prices differ from Decimal rounded with
+MONEY_ROUNDING, which is the exact answer.
+"""
+import argparse
+import time
+from decimal import Decimal
+from typing import Optional, Sequence
+import numpy as np
+from src.configs import MONEY_ROUNDING
+from src.money import MARKUP_SCALE, RATE_SCALE, price_minor_units
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.money_rounding")
+    arg_parser.add_argument("--prices", type=int, default=1_000_000)
+    arg_parser.add_argument("--decimal-prices", type=int, default=100_000,
+                            help="prices checked against Decimal (it is slow)")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    net = rng.integers(1, 10**6, args.prices)
+    markup = rng.choice(np.array([0, 32_000, 50_000, 75_000, 125_000]), args.prices)
+    rate = rng.choice(np.array([770_000, 850_000, 900_000, 1_100_000, 1_170_000, 1_300_000]), args.prices)
+
+    started = time.perf_counter()
+    float_prices = np.round(net / 100 * (1 + markup / MARKUP_SCALE) * (rate / RATE_SCALE), 2)
+    float_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    integer_prices = price_minor_units(net, markup, rate)
+    integer_s = time.perf_counter() - started
+
+    checked = min(args.decimal_prices, args.prices)
+    columns = [column[:checked].tolist() for column in (net, markup, rate)]
+    started = time.perf_counter()
+    decimal_prices = [
+        int((Decimal(n) * (MARKUP_SCALE + m) * r / (MARKUP_SCALE * RATE_SCALE)).to_integral_value(MONEY_ROUNDING))
+        for n, m, r in zip(*columns)
+    ]
+    decimal_s = time.perf_counter() - started
+
+    reference = np.array(decimal_prices)
+    float_cents = np.rint(float_prices[:checked] * 100).astype(np.int64)
+    print(f"prices: {args.prices}, checked against Decimal: {checked}, rounding: {MONEY_ROUNDING}")
+    print(f"{'method':<16} {'ns/price':>9} {'off by a cent':>14}")
+    print(f"{'float64 arrays':<16} {float_s / args.prices * 1e9:>9.1f} {np.count_nonzero(float_cents != reference):>14}")
+    print(f"{'integer arrays':<16} {integer_s / args.prices * 1e9:>9.1f} "
+          f"{np.count_nonzero(integer_prices[:checked] != reference):>14}")
+    print(f"{'Decimal':<16} {decimal_s / checked * 1e9:>9.1f} {0:>14}")
+
+
+if __name__ == "__main__":
+    main()
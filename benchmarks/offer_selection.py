@@ -0,0 +1,87 @@
+"""
+Compares streaming top-k offer selection with collecting and sorting every offer.
+
+    python -m benchmarks.offer_selection --suppliers 200 --offers 500 --quota 50
+
+Each supplier batch holds --offers offers over a shared pool of hotels, so the same
+hotel arrives from several suppliers. Reports time and traced peak memory of
+TopOffers.add_batch against building the full list of Offer tuples, deduplicating
+it and sorting it.
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List, Optional, Sequence
+import numpy as np
+from src.offer_selection import Offer, TopOffers, iter_offers
+from src.pricing import OfferBatch, price_offers
+
+
+def _batches(suppliers: int, offers: int, hotels: int, seed: int) -> List[OfferBatch]:
+    rng = np.random.default_rng(seed)
+    template = price_offers("EUR", "US", offers)
+    batches = []
+    for _ in range(suppliers):
+        factor = rng.uniform(0.8, 1.2, offers)
+        batches.append(OfferBatch(
+            hotel_codes=rng.integers(0, hotels, offers),
+            net=template.net * factor,
+            markup=template.markup,
+            selling_price=np.round(template.selling_price * factor, 2),
+            exchange_rate=template.exchange_rate,
+            currency=template.currency,
+            selling_currency=template.selling_currency,
+            market=template.market,
+        ))
+    return batches
+
+
+def _streaming(batches: List[OfferBatch], quota: int) -> List[Offer]:
+    top = TopOffers(quota)
+    for batch in batches:
+        top.add_batch(batch)
+    return top.offers()
+
+
+def _collect_and_sort(batches: List[OfferBatch], quota: int) -> List[Offer]:
+    everything = [offer for batch in batches for offer in iter_offers(batch)]
+    cheapest = {}
+    for position, offer in enumerate(everything):
+        best = cheapest.get(offer.hotel_code)
+        if best is None or offer.selling_price < best[0]:
+            cheapest[offer.hotel_code] = (offer.selling_price, position, offer)
+    return [entry[2] for entry in sorted(cheapest.values())[:quota]]
+
+
+def _measure(func: Callable[[], List[Offer]]) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.offer_selection")
+    arg_parser.add_argument("--suppliers", type=int, default=200)
+    arg_parser.add_argument("--offers", type=int, default=500)
+    arg_parser.add_argument("--hotels", type=int, default=20_000)
+    arg_parser.add_argument("--quota", type=int, default=50)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args(argv)
+
+    batches = _batches(args.suppliers, args.offers, args.hotels, args.seed)
+    streamed, streaming_s, streaming_peak = _measure(lambda: _streaming(batches, args.quota))
+    collected, collect_s, collect_peak = _measure(lambda: _collect_and_sort(batches, args.quota))
+    assert [offer.selling_price for offer in streamed] == [offer.selling_price for offer in collected]
+
+    print(f"candidates: {args.suppliers * args.offers}, quota: {args.quota}")
+    print(f"{'method':<18} {'ms':>8} {'peak KiB':>10}")
+    print(f"{'streaming top-k':<18} {streaming_s * 1000:>8.1f} {streaming_peak / 1024:>10.0f}")
+    print(f"{'collect and sort':<18} {collect_s * 1000:>8.1f} {collect_peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
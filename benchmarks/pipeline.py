@@ -0,0 +1,241 @@
+"""
+End-to-end and per-stage benchmark of process_request over a synthetic corpus.
+
+    python -m benchmarks.pipeline --requests 2000 --output results.json
+    python -m benchmarks.pipeline --requests 2000 --baseline results.json
+
+Generates a corpus with benchmarks/corpus.py and first checks that every request gets
+the answer its kind calls for. It then times process_request on every request, overall
+and for valid and rejected requests, with the response cache off so every valid
+request is priced; each rejection kind also gets its own end_to_end.rejected.<kind>
+metric, so a slower rejection path (e.g. options_quota) is flagged on its own instead
+of being averaged away among the valid requests. It also times each stage on its own: parse, every validator of
+VALIDATION_STEPS (run on every parsed request), offer and serialization (on the valid
+ones). For each it reports calls, throughput and p50/p99 latency.
+--output writes the results as JSON. --baseline compares them with a saved file,
+flags every p50 or p99 that got slower by more than --tolerance (and at least
+--min-delta-us), and exits with status 1 if any did.
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from benchmarks.corpus import REJECTION_KINDS, CorpusRequest, generate_corpus
+from src.config_snapshot import ConfigSnapshot, current_snapshot
+from src.configs import DEFAULT_PARSER
+from src.main import process_request
+from src.pricing import price_offers
+from src.response_cache import RESPONSE_CACHE
+from src.serialization import encode_offers
+from src.validation_plan import VALIDATION_STEPS
+from src.xml_parser import parse_request
+
+STAGES = ("parse",) + tuple(step.name for step in VALIDATION_STEPS) + ("offer", "serialize")
+COMPARED_FIELDS = ("p50_us", "p99_us")
+
+
+def check_corpus(corpus: List[CorpusRequest]) -> None:
+    """
+    Raises AssertionError unless valid requests get offers and every rejected request
+    gets the error of its kind.
+    """
+    for request in corpus:
+        answer = json.loads(process_request(request.xml))
+        if request.kind == "valid":
+            assert isinstance(answer, list) and answer, f"valid request rejected: {answer}"
+        else:
+            assert answer == {"error": REJECTION_KINDS[request.kind]}, f"{request.kind} answered with {answer}"
+
+
+def _timed(func: Callable[[], Any]) -> Tuple[Any, float]:
+    started = time.perf_counter_ns()
+    try:
+        result = func()
+    except (ET.ParseError, ValueError) as e:
+        result = e
+    return result, (time.perf_counter_ns() - started) / 1000
+
+
+def measure_end_to_end(corpus: List[CorpusRequest], rounds: int, parser: str = DEFAULT_PARSER) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {"end_to_end": [], "end_to_end.valid": [], "end_to_end.rejected": []}
+    samples.update((f"end_to_end.rejected.{kind}", []) for kind in REJECTION_KINDS)
+    for _ in range(rounds):
+        for request in corpus:
+            _, elapsed_us = _timed(lambda: process_request(request.xml, parser))
+            samples["end_to_end"].append(elapsed_us)
+            if request.kind == "valid":
+                samples["end_to_end.valid"].append(elapsed_us)
+            else:
+                samples["end_to_end.rejected"].append(elapsed_us)
+                samples[f"end_to_end.rejected.{request.kind}"].append(elapsed_us)
+    return samples
+
+
+def measure_stages(
+    corpus: List[CorpusRequest],
+    rounds: int,
+    snapshot: ConfigSnapshot,
+    parser: str = DEFAULT_PARSER
+) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    pricing = snapshot.pricing
+    for _ in range(rounds):
+        for corpus_request in corpus:
+            request, elapsed_us = _timed(lambda: parse_request(corpus_request.xml, parser, snapshot.limits))
+            samples["parse"].append(elapsed_us)
+            if isinstance(request, Exception):
+                continue
+
+            validated = {}
+            for step in VALIDATION_STEPS:
+                result, elapsed_us = _timed(lambda: step.validate(request, snapshot.rules))
+                samples[step.name].append(elapsed_us)
+                validated[step.name] = result
+            if any(isinstance(result, Exception) for result in validated.values()):
+                continue
+
+            def offer():
+                # As process_request_bytes prices it: effective markup, inventory hotels, stay periods
+                currency, market = validated["extract_currency"], validated["extract_nationality_and_market"]
+                company_id = validated["extract_required_parameters"]["CompanyID"]
+                start_date, end_date = validated["validate_dates"]
+                markup = pricing.markup_for(company_id, market, currency, start_date)
+                hotel_codes = None
+                if snapshot.inventory is not None and request.destination_codes:
+                    hotel_codes = snapshot.inventory.resolve(request.destination_codes)
+                periods = None
+                if pricing.rate_calendar is not None:
+                    periods = pricing.markup_periods(company_id, market, currency, start_date, end_date)
+                return price_offers(
+                    currency, market, validated["validate_options_quota"], pricing, markup, hotel_codes, periods
+                )
+
+            offers, elapsed_us = _timed(offer)
+            samples["offer"].append(elapsed_us)
+            _, elapsed_us = _timed(lambda: encode_offers(offers))
+            samples["serialize"].append(elapsed_us)
+    return samples
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """
+    Calls, throughput (calls per second of time spent in the stage) and latency
+    percentiles of each metric's samples, in microseconds.
+    """
+    summary = {}
+    for name, values in samples.items():
+        if not values:
+            continue
+        latencies = np.array(values)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        summary[name] = {
+            "calls": len(latencies),
+            "throughput_per_s": round(len(latencies) / (latencies.sum() / 1e6), 1),
+            "mean_us": round(float(latencies.mean()), 2),
+            "p50_us": round(float(p50), 2),
+            "p99_us": round(float(p99), 2),
+        }
+    return summary
+
+
+def compare(
+    metrics: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+    min_delta_us: float
+) -> List[Tuple[str, str, float, float]]:
+    """
+    (metric, field, baseline, current) for every compared latency that got slower by
+    more than tolerance (a fraction) and by at least min_delta_us.
+    """
+    regressions = []
+    for name, current in metrics.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for field in COMPARED_FIELDS:
+            if field not in before:
+                continue
+            delta = current[field] - before[field]
+            if delta > before[field] * tolerance and delta >= min_delta_us:
+                regressions.append((name, field, before[field], current[field]))
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.pipeline")
+    arg_parser.add_argument("--requests", type=int, default=2000)
+    arg_parser.add_argument("--rounds", type=int, default=3, help="passes over the corpus")
+    arg_parser.add_argument("--rejected-share", type=float, default=0.2)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--parser", choices=("expat", "etree"), default=DEFAULT_PARSER)
+    arg_parser.add_argument("--output", help="JSON file to write the results to")
+    arg_parser.add_argument("--baseline", help="JSON results to compare with")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    arg_parser.add_argument("--min-delta-us", type=float, default=2.0, help="smaller slowdowns are never flagged")
+    args = arg_parser.parse_args(argv)
+
+    corpus = generate_corpus(args.requests, args.seed, args.rejected_share)
+    check_corpus(corpus)
+    snapshot = current_snapshot()
+    max_entries = RESPONSE_CACHE.max_entries
+    RESPONSE_CACHE.max_entries = 0
+    try:
+        samples = measure_end_to_end(corpus, args.rounds, args.parser)
+    finally:
+        RESPONSE_CACHE.max_entries = max_entries
+    samples.update(measure_stages(corpus, args.rounds, snapshot, args.parser))
+    metrics = summarize(samples)
+    results = {
+        "meta": {
+            "date": datetime.date.today().isoformat(),
+            "requests": args.requests,
+            "rounds": args.rounds,
+            "rejected_share": args.rejected_share,
+            "seed": args.seed,
+            "parser": args.parser,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "metrics": metrics,
+    }
+
+    baseline = {}
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["metrics"]
+    regressions = compare(metrics, baseline, args.tolerance, args.min_delta_us)
+    flagged = {(name, field) for name, field, _, _ in regressions}
+
+    print(f"requests: {args.requests} x {args.rounds} rounds, rejected share: {args.rejected_share}, parser: {args.parser}")
+    header = f"{'metric':<44} {'calls':>7} {'per s':>9} {'p50 us':>9} {'p99 us':>9}"
+    print(header + (f" {'p50 vs base':>12} {'p99 vs base':>12}" if baseline else ""))
+    for name, metric in metrics.items():
+        line = (f"{name:<44} {metric['calls']:>7} {metric['throughput_per_s']:>9.0f} "
+                f"{metric['p50_us']:>9.2f} {metric['p99_us']:>9.2f}")
+        if name in baseline:
+            for field in COMPARED_FIELDS:
+                change = f"{(metric[field] / baseline[name][field] - 1) * 100:+.1f}%" if baseline[name][field] else "n/a"
+                line += f" {change + (' !' if (name, field) in flagged else ''):>12}"
+        print(line)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for name, field, before, current in regressions:
+            print(f"  {name} {field}: {before:.2f} -> {current:.2f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
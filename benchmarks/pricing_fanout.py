@@ -0,0 +1,49 @@
+"""
+Measures the pipeline at growing optionsQuota fan-out.
+
+    python -m benchmarks.pricing_fanout --repeat 2000
+
+For each quota it reports the time of the array pricing step, the dict conversion at
+the edge and the whole process_request call, per request and per offer.
+"""
+import argparse
+import datetime
+import timeit
+from typing import Optional, Sequence
+from src.main import SAMPLE_XML, process_request
+from src.pricing import price_offers
+
+
+def _request_xml(quota: int) -> str:
+    start = datetime.date.today() + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    return (
+        SAMPLE_XML
+        .replace("14/10/2025", start.strftime("%d/%m/%Y"))
+        .replace("26/10/2025", end.strftime("%d/%m/%Y"))
+        .replace("<optionsQuota>20</optionsQuota>", f"<optionsQuota>{quota}</optionsQuota>")
+    )
+
+
+def _per_call_us(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.pricing_fanout")
+    arg_parser.add_argument("--repeat", type=int, default=2000)
+    arg_parser.add_argument("--quotas", type=int, nargs="+", default=[1, 10, 20, 50])
+    args = arg_parser.parse_args(argv)
+
+    print(f"{'quota':>5} {'pricing us':>11} {'to_dicts us':>12} {'request us':>11} {'request us/offer':>17}")
+    for quota in args.quotas:
+        xml_str = _request_xml(quota)
+        batch = price_offers("EUR", "US", quota)
+        pricing = _per_call_us(lambda: price_offers("EUR", "US", quota), args.repeat)
+        to_dicts = _per_call_us(batch.to_dicts, args.repeat)
+        request = _per_call_us(lambda: process_request(xml_str, compact=True), args.repeat)
+        print(f"{quota:>5} {pricing:>11.1f} {to_dicts:>12.1f} {request:>11.1f} {request / quota:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
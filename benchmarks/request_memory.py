@@ -0,0 +1,64 @@
+"""
+Measures the memory held per in-flight request by each request representation.
+
+    python -m benchmarks.request_memory --requests 2000 --rooms 3
+
+For each representation it keeps --requests parsed copies of a sample AvailRQ alive
+at once, as a worker at peak concurrency would, and reports the traced bytes per
+request: the full ElementTree, the request record with one list of age strings per
+room, and the slotted AvailRequest with packed Room ages.
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Any, Callable, List, Optional, Sequence
+from src.main import SAMPLE_XML
+from src.xml_parser import extract_request, parse_xml
+
+
+def _sample_xml(rooms: int) -> str:
+    paxes = "".join(
+        '<Paxes><Pax age="35"/><Pax age="33"/><Pax age="4"/></Paxes>' for _ in range(rooms)
+    )
+    return SAMPLE_XML.replace("</AvailRQ>", f"<Rooms>{paxes}</Rooms></AvailRQ>")
+
+
+def _string_rooms(xml_str: str) -> Any:
+    # The record before packing: every age kept as its attribute string
+    request = extract_request(xml_str)
+    request.rooms = [[str(age) for age in room] for room in request.rooms]
+    return request
+
+
+def _bytes_per_request(build: Callable[[str], Any], xml_str: str, count: int) -> float:
+    # Distinct copies of the document, so no parsed strings are shared between requests
+    documents = [xml_str.replace("YYYYYYYYY", f"user{i:09d}") for i in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held: List[Any] = [build(document) for document in documents]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return (after - before) / count
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.request_memory")
+    arg_parser.add_argument("--requests", type=int, default=2000)
+    arg_parser.add_argument("--rooms", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    xml_str = _sample_xml(args.rooms)
+    representations = (
+        ("ElementTree", parse_xml),
+        ("record, str ages", _string_rooms),
+        ("AvailRequest, packed ages", extract_request),
+    )
+    print(f"{'representation':<26} {'bytes/request':>14}")
+    for name, build in representations:
+        print(f"{name:<26} {_bytes_per_request(build, xml_str, args.requests):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
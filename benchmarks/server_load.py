@@ -0,0 +1,112 @@
+"""
+Small keep-alive load test for src.server.
+
+    python -m benchmarks.server_load --connections 16 --requests 5000
+    python -m benchmarks.server_load --port 8080 --no-server   # against a running server
+
+Prints requests/sec and p50/p99 latency of POSTed AvailRQ documents. The bodies
+come from a synthetic corpus (benchmarks/corpus.py) that every connection cycles
+through from its own offset, and the in-process server runs with the response cache
+off (--cache keeps it), so the load measures pricing rather than cache hits and
+coalesced requests.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Optional, Sequence
+from benchmarks.corpus import generate_corpus
+from src.response_cache import RESPONSE_CACHE
+from src.server import AvailServer
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _read_response(reader: asyncio.StreamReader) -> bool:
+    # Reads one response; returns False when the server closes the connection after it
+    head = (await reader.readuntil(b"\r\n\r\n")).lower()
+    if b"transfer-encoding: chunked" not in head:
+        length = int(head.split(b"content-length: ", 1)[1].split(b"\r\n", 1)[0])
+        await reader.readexactly(length)
+    else:
+        while True:
+            size = int((await reader.readuntil(b"\r\n"))[:-2], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    return b"connection: close" not in head
+
+
+async def _client(host: str, port: int, bodies: List[bytes], offset: int, count: int, latencies: List[float]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    for index in range(offset, offset + count):
+        body = bodies[index % len(bodies)]
+        started = time.perf_counter()
+        writer.write(f"POST /avail HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+        keep_alive = await _read_response(reader)
+        latencies.append(time.perf_counter() - started)
+        if not keep_alive:
+            # A request rejected before its body was read ends the connection
+            writer.close()
+            reader, writer = await asyncio.open_connection(host, port)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(host: str, port: int, connections: int, requests: int, bodies: List[bytes]) -> None:
+    latencies: List[float] = []
+    per_connection = max(1, requests // connections)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, bodies, index * len(bodies) // connections, per_connection, latencies)
+        for index in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+
+    print(f"requests:     {len(latencies)} over {connections} keep-alive connections, {len(bodies)} distinct bodies")
+    print(f"throughput:   {len(latencies) / elapsed:,.0f} req/s")
+    print(f"latency p50:  {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"latency p99:  {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+async def _main(args: argparse.Namespace) -> None:
+    bodies = [request.xml.encode() for request in generate_corpus(args.corpus, args.seed, args.rejected_share)]
+    server = None
+    port = args.port
+    max_entries = RESPONSE_CACHE.max_entries
+    if not args.no_server:
+        if not args.cache:
+            RESPONSE_CACHE.max_entries = 0
+        server = AvailServer(host=args.host, port=0, max_in_flight=args.max_in_flight)
+        await server.start()
+        port = server.port
+    try:
+        await run_load(args.host, port, args.connections, args.requests, bodies)
+    finally:
+        RESPONSE_CACHE.max_entries = max_entries
+        if server is not None:
+            await server.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.server_load")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8080)
+    arg_parser.add_argument("--no-server", action="store_true", help="target an already running server")
+    arg_parser.add_argument("--connections", type=int, default=16)
+    arg_parser.add_argument("--requests", type=int, default=5000)
+    arg_parser.add_argument("--max-in-flight", type=int, default=64)
+    arg_parser.add_argument("--corpus", type=int, default=1000, help="distinct request bodies")
+    arg_parser.add_argument("--rejected-share", type=float, default=0.2)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--cache", action="store_true", help="keep the in-process server's response cache on")
+    asyncio.run(_main(arg_parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures nightly stay pricing over many candidate hotels as stays get longer.
+
+    python -m benchmarks.stay_pricing --hotels 20000 --nights 3 14 60 180
+
+Builds a rate calendar of --hotels hotels with a new rate every 30 days over two
+years, then for each stay length reports the time to compute every hotel's stay net
+from the calendar's prefix sums (RateCalendar.net_between) next to summing the
+nightly rates of the stay (a slice-sum over the date-indexed array), and the time of
+the whole nightly pricing (price_stays, with a markup change mid-stay).
+"""
+import argparse
+import datetime
+import timeit
+from dataclasses import replace
+from typing import Optional, Sequence
+import numpy as np
+from src.pricing import DEFAULT_PRICING, price_stays
+from src.rate_calendar import NightlyRate, RateCalendar
+
+BLOCK_DAYS = 30
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.stay_pricing")
+    arg_parser.add_argument("--hotels", type=int, default=20_000)
+    arg_parser.add_argument("--nights", type=int, nargs="+", default=[3, 14, 60, 180])
+    arg_parser.add_argument("--quota", type=int, default=50)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    blocks = 730 // BLOCK_DAYS
+    block_cents = rng.integers(5_000, 50_000, (args.hotels, blocks))
+    first_day = datetime.date(2030, 1, 1)
+    calendar = RateCalendar(
+        NightlyRate(
+            hotel_code,
+            first_day + datetime.timedelta(days=block * BLOCK_DAYS),
+            first_day + datetime.timedelta(days=(block + 1) * BLOCK_DAYS - 1),
+            cents / 100,
+        )
+        for hotel_code, row in enumerate(block_cents.tolist(), start=1_000_000)
+        for block, cents in enumerate(row)
+    )
+    nightly = np.repeat(block_cents, BLOCK_DAYS, axis=1)
+    pricing = replace(DEFAULT_PRICING, rate_calendar=calendar)
+    rows, _ = calendar.rows_for(calendar.hotel_codes)
+
+    print(f"hotels: {len(calendar)}, days: {calendar.days}")
+    print(f"{'nights':>6} {'prefix sums ms':>15} {'slice-sum ms':>13} {'price_stays ms':>15}")
+    for nights in args.nights:
+        start = first_day + datetime.timedelta(days=45)
+        end = start + datetime.timedelta(days=nights)
+        first, last = (start - first_day).days, (end - first_day).days
+        assert (calendar.net_between(rows, start, end) == nightly[rows, first:last].sum(axis=1)).all()
+        middle = start + datetime.timedelta(days=nights // 2)
+        periods = ((start, middle, 3.2), (middle, end, 8.0))
+
+        prefix_ms = min(timeit.repeat(lambda: calendar.net_between(rows, start, end), number=10, repeat=5)) * 100
+        slice_ms = min(timeit.repeat(lambda: nightly[rows, first:last].sum(axis=1), number=10, repeat=5)) * 100
+        stays_ms = min(timeit.repeat(
+            lambda: price_stays("EUR", "US", args.quota, periods, pricing), number=10, repeat=5
+        )) * 100
+        print(f"{nights:>6} {prefix_ms:>15.3f} {slice_ms:>13.3f} {stays_ms:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures supplier fan-out tail latency against local stub suppliers.
+
+    python -m benchmarks.supplier_fanout --suppliers 5 --median-ms 40 --sigma 0.5 --deadline-ms 200
+
+Runs --requests fan-outs concurrently in batches of --concurrency and reports the
+p50/p99/max time to answer, how often the deadline cut the fan-out short, and the
+mean number of offers returned against the quota. The stubs price their offers on
+the event loop, so at high concurrency the numbers include that CPU time.
+"""
+import argparse
+import asyncio
+import time
+from typing import List, Optional, Sequence
+from src.pricing import DEFAULT_PRICING
+from src.suppliers import LatencyProfile, SupplierQuery, fan_out, stub_suppliers
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def _run(args: argparse.Namespace) -> None:
+    latency = LatencyProfile(args.median_ms, args.sigma, args.tail_probability, args.tail_ms)
+    suppliers = stub_suppliers(args.suppliers, latency, seed=args.seed)
+    for supplier in suppliers:
+        supplier.offer_count = args.offers_per_supplier
+    query = SupplierQuery("EUR", "US", args.quota, DEFAULT_PRICING, DEFAULT_PRICING.markup)
+
+    async def one() -> tuple:
+        started = time.perf_counter()
+        result = await fan_out(suppliers, query, args.deadline_ms / 1000)
+        return time.perf_counter() - started, result.timed_out, len(result.offers)
+
+    results = []
+    for offset in range(0, args.requests, args.concurrency):
+        batch = min(args.concurrency, args.requests - offset)
+        results.extend(await asyncio.gather(*(one() for _ in range(batch))))
+
+    times_ms = sorted(elapsed * 1000 for elapsed, _, _ in results)
+    timed_out = sum(1 for _, out, _ in results if out)
+    offers = sum(count for _, _, count in results) / len(results)
+    print(f"requests:     {len(results):>8}")
+    print(f"p50 ms:       {_percentile(times_ms, 0.5):>8.1f}")
+    print(f"p99 ms:       {_percentile(times_ms, 0.99):>8.1f}")
+    print(f"max ms:       {times_ms[-1]:>8.1f}")
+    print(f"timed out:    {timed_out / len(results):>8.1%}")
+    print(f"offers/quota: {offers:>8.1f} / {args.quota}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.supplier_fanout")
+    arg_parser.add_argument("--suppliers", type=int, default=5)
+    arg_parser.add_argument("--offers-per-supplier", type=int, default=10)
+    arg_parser.add_argument("--quota", type=int, default=20)
+    arg_parser.add_argument("--median-ms", type=float, default=40.0)
+    arg_parser.add_argument("--sigma", type=float, default=0.5)
+    arg_parser.add_argument("--tail-probability", type=float, default=0.01)
+    arg_parser.add_argument("--tail-ms", type=float, default=2000.0)
+    arg_parser.add_argument("--deadline-ms", type=float, default=200.0)
+    arg_parser.add_argument("--requests", type=int, default=2000)
+    arg_parser.add_argument("--concurrency", type=int, default=20)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(_run(arg_parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import os
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Union
+from .configs import DEFAULT_BATCH_CHUNKSIZE, DEFAULT_PARSER
+from .config_snapshot import ConfigReloader, current_snapshot, reload_config
+from .main import process_request, process_request_bytes
+from .request_model import AvailRequest
+from .room_columns import room_errors
+from .validators import ValidationRules
+from .xml_parser import parse_request
+
+BATCH_MODES = ("serial", "thread", "process")
+
+
+def warm_worker(config_path: Optional[str] = None, watch: bool = False) -> None:
+    """
+    Pool initializer: imports the configuration and pipeline once per worker process,
+    so spawned workers do not pay for it on their first chunk. With config_path the
+    worker loads that config file, and with watch it keeps reloading it on change.
+    """
+    from . import configs, main  # noqa: F401
+    if config_path is not None:
+        if watch:
+            ConfigReloader(config_path).start()
+        else:
+            reload_config(config_path)
+
+
+def _room_check(message: Optional[str]) -> Callable[[AvailRequest, ValidationRules], Any]:
+    # Stands in for validate_rooms_and_passengers with the batch result
+    def check(request: AvailRequest, rules: ValidationRules) -> None:
+        if message is not None:
+            raise ValueError(message)
+    return check
+
+
+def _process_chunk_columnar(xml_docs: List[Union[str, bytes]], parser: str, compact: bool) -> List[str]:
+    """
+    Parses the whole chunk first and validates the rooms of all its requests at once
+    with room_errors; each request then runs the rest of the pipeline as usual.
+    Documents that fail to parse are left to process_request_bytes to report.
+    The whole chunk uses one config snapshot.
+    """
+    snapshot = current_snapshot()
+    parsed: List[Optional[AvailRequest]] = []
+    for xml_doc in xml_docs:
+        try:
+            parsed.append(parse_request(xml_doc, parser, snapshot.limits))
+        except (ET.ParseError, ValueError):
+            parsed.append(None)
+    errors = iter(room_errors([request for request in parsed if request is not None], snapshot.rules))
+
+    responses = []
+    for xml_doc, request in zip(xml_docs, parsed):
+        if request is None:
+            response = process_request_bytes(xml_doc, parser, pretty=not compact, snapshot=snapshot)
+        else:
+            overrides = {"validate_rooms_and_passengers": _room_check(next(errors))}
+            response = process_request_bytes(request, parser, pretty=not compact, overrides=overrides, snapshot=snapshot)
+        responses.append(response.decode())
+    return responses
+
+
+def _process_chunk(xml_docs: List[Union[str, bytes]], parser: str, compact: bool, columnar: bool = False) -> List[str]:
+    """
+    Runs a chunk of documents through process_request inside a worker.
+    """
+    if columnar:
+        return _process_chunk_columnar(xml_docs, parser, compact)
+    return [process_request(xml_doc, parser, compact) for xml_doc in xml_docs]
+
+
+def _chunked(xml_docs: Iterable[Union[str, bytes]], chunksize: int) -> Iterator[List[Union[str, bytes]]]:
+    iterator = iter(xml_docs)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _process_serial(
+    xml_docs: Iterable[Union[str, bytes]],
+    chunksize: int,
+    parser: str,
+    compact: bool,
+    columnar: bool
+) -> Iterator[str]:
+    if columnar:
+        for chunk in _chunked(xml_docs, chunksize):
+            yield from _process_chunk_columnar(chunk, parser, compact)
+        return
+    for xml_doc in xml_docs:
+        yield process_request(xml_doc, parser, compact)
+
+
+def _process_pooled(
+    mode: str,
+    workers: int,
+    xml_docs: Iterable[Union[str, bytes]],
+    chunksize: int,
+    parser: str,
+    compact: bool,
+    columnar: bool
+) -> Iterator[str]:
+    if mode == "thread":
+        executor: Executor = ThreadPoolExecutor(max_workers=workers)
+    else:
+        # Workers start from the config file in effect here, if one was loaded
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=warm_worker, initargs=(current_snapshot().source,)
+        )
+    # Keep a bounded number of chunks in flight so arbitrarily long inputs are not read ahead
+    pending: Deque[Future] = deque()
+    try:
+        for chunk in _chunked(xml_docs, chunksize):
+            pending.append(executor.submit(_process_chunk, chunk, parser, compact, columnar))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def process_requests(
+    xml_docs: Iterable[Union[str, bytes]],
+    mode: str = "serial",
+    max_workers: Optional[int] = None,
+    chunksize: int = DEFAULT_BATCH_CHUNKSIZE,
+    parser: str = DEFAULT_PARSER,
+    compact: bool = True,
+    columnar: bool = False
+) -> Iterator[str]:
+    """
+    Processes many XML requests and yields their JSON responses in input order.
+    mode selects serial execution, a thread pool or a process pool; pooled modes hand
+    chunksize documents to a worker at a time. With columnar the room and passenger
+    rules are evaluated for a whole chunk at once with NumPy (src.room_columns).
+    Each response, including error JSON, is exactly what
+    process_request(xml_doc, parser, compact) returns for that document.
+    Raises ValueError for an unknown mode or a non-positive chunksize.
+    """
+    if mode not in BATCH_MODES:
+        raise ValueError(f"Unknown batch mode: {mode}")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1.")
+    if mode == "serial":
+        return _process_serial(xml_docs, chunksize, parser, compact, columnar)
+
+    workers = max_workers or os.cpu_count() or 1
+    return _process_pooled(mode, workers, xml_docs, chunksize, parser, compact, columnar)
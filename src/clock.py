@@ -0,0 +1,27 @@
+import datetime
+import time
+from typing import Callable, Tuple
+
+
+class DayBoundary:
+    """
+    Shares a date derived from "today" (today + days_ahead) across requests.
+    The value is computed once per local day: each call only compares the current
+    timestamp with the next local midnight. The clock is injectable for tests.
+    """
+
+    def __init__(self, days_ahead: int, clock: Callable[[], float] = time.time) -> None:
+        self.days_ahead = days_ahead
+        self._clock = clock
+        # (timestamp of the next local midnight, boundary date), replaced as a whole
+        self._state: Tuple[float, datetime.date] = (float("-inf"), datetime.date.min)
+
+    def get(self) -> datetime.date:
+        now = self._clock()
+        valid_until, boundary = self._state
+        if now >= valid_until:
+            today = datetime.date.fromtimestamp(now)
+            tomorrow = datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time.min)
+            boundary = today + datetime.timedelta(days=self.days_ahead)
+            self._state = (tomorrow.timestamp(), boundary)
+        return boundary
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+from . import configs
+from .configs import CONFIG_RELOAD_INTERVAL
+from .inventory import Inventory, open_inventory
+from .pricing import DEFAULT_PRICING, PricingConfig
+from .validators import DEFAULT_RULES, ValidationRules
+from .xml_parser import DEFAULT_LIMITS, InputLimits
+
+# Settings a config file may override; the file is JSON keyed by these src/configs.py names
+RELOADABLE_SETTINGS = (
+    "CONVERSION_RATES", "PIVOT_CURRENCY",
+    "HOTEL_PRICE_CURRENCY", "DEFAULT_NET_PRICE", "DEFAULT_MARKUP", "SIMULATED_HOTEL_CODE", "SIMULATED_PRICE_STEP",
+    "MONEY_ROUNDING", "MARKUP_RULES_FILE", "RATE_CALENDAR_FILE", "INVENTORY_FILE",
+    "VALID_LANGUAGES", "DEFAULT_LANGUAGE", "DEFAULT_OPTIONS_QUOTA", "MAX_OPTIONS_QUOTA",
+    "ALLOWED_NATIONALITIES", "DEFAULT_NATIONALITY", "ALLOWED_CURRENCIES", "DEFAULT_CURRENCY",
+    "ALLOWED_MARKET_VALUES", "DEFAULT_MARKET",
+    "ALLOWED_ROOM_COUNT", "ALLOWED_ROOM_GUEST_COUNT", "ALLOWED_CHILD_COUNT_PER_ROOM",
+    "MAX_REQUEST_BYTES", "MAX_XML_ELEMENTS", "MAX_XML_DEPTH", "MAX_XML_PAXES", "MAX_XML_PAX",
+)
+
+
+@dataclass(frozen=True, eq=False)
+class ConfigSnapshot:
+    """
+    Immutable, versioned view of every reloadable setting: the validation rules, the
+    input limits, the pricing constants with their rate matrix and the mapped hotel
+    inventory. A request reads the
+    current snapshot once and uses it throughout, so a reload never changes the rules
+    under a request in flight. version increases with every reload; caches key on it.
+    """
+    version: int
+    rules: ValidationRules
+    limits: InputLimits
+    pricing: PricingConfig
+    source: Optional[str] = None
+    inventory: Optional[Inventory] = None
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, Any], version: int, source: Optional[str] = None) -> "ConfigSnapshot":
+        """
+        Builds a snapshot from settings keyed by their src/configs.py names.
+        """
+        return cls(
+            version=version,
+            rules=ValidationRules.from_configs(values),
+            limits=InputLimits.from_configs(values),
+            pricing=PricingConfig.from_configs(values),
+            source=source,
+            inventory=open_inventory(values["INVENTORY_FILE"]) if values["INVENTORY_FILE"] else None,
+        )
+
+
+def _setting_value(name: str, value: Any) -> Any:
+    """
+    Converts a JSON value to the type of the setting's default in src/configs.py.
+    Raises ValueError when it does not fit.
+    """
+    default = getattr(configs, name)
+    if isinstance(default, set):
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(f"Setting {name} must be a list of strings.")
+        return set(value)
+    if isinstance(default, dict):
+        # CONVERSION_RATES is written as {"USD": {"EUR": 0.9, ...}, ...}
+        if not isinstance(value, dict):
+            raise ValueError(f"Setting {name} must be an object of objects.")
+        rates: Dict[Tuple[str, str], float] = {}
+        for from_currency, targets in value.items():
+            if not isinstance(targets, dict):
+                raise ValueError(f"Setting {name} must be an object of objects.")
+            for to_currency, rate in targets.items():
+                if isinstance(rate, bool) or not isinstance(rate, (int, float)) or rate <= 0:
+                    raise ValueError(f"Setting {name} must hold positive rates.")
+                rates[(from_currency, to_currency)] = float(rate)
+        return rates
+    if isinstance(default, float) and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if type(value) is not type(default):
+        raise ValueError(f"Setting {name} must be of type {type(default).__name__}.")
+    return value
+
+
+def load_settings(path: str) -> Dict[str, Any]:
+    """
+    Reads a JSON object of setting overrides and returns every reloadable setting,
+    taking src/configs.py values for the ones the file leaves out.
+    Raises ValueError for unknown settings or values of the wrong type, and OSError
+    if the file cannot be read.
+    """
+    with open(path, encoding="utf-8") as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError("Config file must hold a JSON object.")
+    unknown = sorted(set(overrides) - set(RELOADABLE_SETTINGS))
+    if unknown:
+        raise ValueError(f"Unknown settings in config file: {', '.join(unknown)}")
+    values = {name: getattr(configs, name) for name in RELOADABLE_SETTINGS}
+    for name, value in overrides.items():
+        values[name] = _setting_value(name, value)
+    return values
+
+
+_current = ConfigSnapshot(
+    version=0,
+    rules=DEFAULT_RULES,
+    limits=DEFAULT_LIMITS,
+    pricing=DEFAULT_PRICING,
+    inventory=open_inventory(configs.INVENTORY_FILE) if configs.INVENTORY_FILE else None,
+)
+_reload_lock = threading.Lock()
+
+
+def current_snapshot() -> ConfigSnapshot:
+    """
+    Returns the snapshot in effect. Reading it takes no lock: snapshots are immutable
+    and a reload replaces the reference in one step.
+    """
+    return _current
+
+
+def config_version() -> int:
+    return _current.version
+
+
+def install_snapshot(snapshot: ConfigSnapshot) -> None:
+    global _current
+    _current = snapshot
+
+
+def reload_config(path: str) -> ConfigSnapshot:
+    """
+    Loads path into a new snapshot with the next version and installs it.
+    The current snapshot stays in effect if the file is invalid.
+    """
+    with _reload_lock:
+        snapshot = ConfigSnapshot.from_values(load_settings(path), _current.version + 1, path)
+        install_snapshot(snapshot)
+        return snapshot
+
+
+class ConfigReloader:
+    """
+    Watches a config file and reloads it when its modification time or size changes.
+    check() polls once; start() polls every interval seconds on a daemon thread.
+    A file that fails to load is skipped (last_error keeps the reason) until it changes.
+    """
+
+    def __init__(self, path: str, interval: float = CONFIG_RELOAD_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self.last_error: Optional[Exception] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """
+        Reloads the file if it changed since the last check. Returns True on a reload.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            self.last_error = e
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            reload_config(self.path)
+        except (OSError, ValueError) as e:
+            self.last_error = e
+            return False
+        self.last_error = None
+        return True
+
+    def start(self) -> None:
+        self.check()
+        self._thread = threading.Thread(target=self._run, name="config-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
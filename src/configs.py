@@ -11,12 +11,28 @@ CONVERSION_RATES: Dict[Tuple[str, str], float] = {
     ("GBP", "USD"): 1.3,
     ("GBP", "EUR"): 1.17,
 }
+# Currency used to triangulate pairs missing from CONVERSION_RATES
+PIVOT_CURRENCY = "USD"
 
 
 # Pricing simulation constants
 HOTEL_PRICE_CURRENCY = "USD"
 DEFAULT_NET_PRICE = 132.42
 DEFAULT_MARKUP = 3.2
+SIMULATED_HOTEL_CODE = 39971881     # Supplier code of the first simulated offer; later offers count up
+SIMULATED_PRICE_STEP = 0.05         # Each further simulated offer is 5% dearer than the first
+SCALAR_PRICING_MAX_OFFERS = 4       # Up to this many offers are priced with Python ints instead of arrays
+# How prices are rounded to cents (src/money.py): "ROUND_HALF_EVEN" or "ROUND_HALF_UP"
+MONEY_ROUNDING = "ROUND_HALF_EVEN"
+# CSV of markup rules by company, market, currency and stay dates (see src/markup_rules.py);
+# empty for DEFAULT_MARKUP everywhere
+MARKUP_RULES_FILE = ""
+# CSV of nightly net rates by hotel (see src/rate_calendar.py); when set, stays are priced
+# night by night. Empty for the flat simulated net price
+RATE_CALENDAR_FILE = ""
+# Hotel inventory built with python -m src.inventory; request destinations resolve to its
+# hotels. Empty for simulated hotel codes
+INVENTORY_FILE = ""
 
 # Constants for Languages
 VALID_LANGUAGES = {"en", "fr", "de", "es"}
@@ -41,4 +57,57 @@ DEFAULT_MARKET = "ES"
 # Room and Passenger Rules configuration
 ALLOWED_ROOM_COUNT = 5             # Maximum allowed rooms
 ALLOWED_ROOM_GUEST_COUNT = 4       # Maximum guests per room
-ALLOWED_CHILD_COUNT_PER_ROOM = 2   # Maximum children allowed per room
\ No newline at end of file
+ALLOWED_CHILD_COUNT_PER_ROOM = 2   # Maximum children allowed per room
+
+# Request parsing backend: "etree" (C ElementTree builder) or "expat" (single pass, no tree;
+# slower on CPython, but lets the server reject a body before it has all arrived)
+DEFAULT_PARSER = "etree"
+
+# Input guards enforced while the request is parsed; crossing one aborts the parse
+MAX_REQUEST_BYTES = 64 * 1024      # Size of the raw document
+MAX_XML_ELEMENTS = 1000            # Elements in the whole document
+MAX_XML_DEPTH = 16                 # Element nesting depth
+MAX_XML_PAXES = 50                 # <Paxes> blocks (rooms); the business limit is ALLOWED_ROOM_COUNT
+MAX_XML_PAX = 200                  # <Pax> elements across all rooms
+
+# Batch processing: number of documents handed to a pool worker per task
+DEFAULT_BATCH_CHUNKSIZE = 64
+
+# Streaming input: documents are split on the closing tag of STREAM_ROOT_TAG
+STREAM_ROOT_TAG = "AvailRQ"
+STREAM_READ_SIZE = 64 * 1024               # Bytes read from the input per call
+MAX_STREAM_DOCUMENT_BYTES = 1024 * 1024    # Longer documents are cut off and reported as invalid XML
+
+# HTTP front end (python -m src.server)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+SERVER_MAX_IN_FLIGHT = 64              # Requests processed concurrently; the rest wait on the connection
+SERVER_KEEP_ALIVE_TIMEOUT = 15.0       # Seconds an idle keep-alive connection stays open
+SERVER_MAX_BODY_BYTES = 1024 * 1024    # Larger bodies are answered with 413
+SERVER_READ_SIZE = 16 * 1024           # Body bytes read (and parsed) per step
+SERVER_FEED_MIN_BYTES = 4 * 1024       # Smaller reads are coalesced before a parse step...
+SERVER_FEED_WAIT = 0.002               # ...for at most this many seconds of silence from the client
+JSON_WRITE_BUFFER_SIZE = 8 * 1024      # Bytes the streaming offer writer gathers per write
+
+# Stub suppliers for offline fan-out testing (python -m src.server --stub-suppliers N):
+# log-normal latency around the median, with an occasional stall
+STUB_SUPPLIER_MEDIAN_MS = 40.0
+STUB_SUPPLIER_SIGMA = 0.5
+STUB_SUPPLIER_TAIL_PROBABILITY = 0.01
+STUB_SUPPLIER_TAIL_MS = 2000.0
+
+# Validation plan: record the rejection statistics of one request in N, and re-rank the
+# checks from them every N recorded requests (0 disables)
+VALIDATION_STATS_SAMPLE_INTERVAL = 16
+VALIDATION_REORDER_INTERVAL = 1000
+
+# Distinct StartDate/EndDate strings kept by the date parser cache
+DATE_PARSE_CACHE_SIZE = 4096
+
+# Response cache in front of the offer stage (RESPONSE_CACHE_MAX_ENTRIES = 0 disables it)
+RESPONSE_CACHE_MAX_ENTRIES = 10000
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RESPONSE_CACHE_TTL = 60.0          # Seconds
+
+# Config snapshots: settings file watched by the server (--config), checked every N seconds
+CONFIG_RELOAD_INTERVAL = 1.0
@@ -1,14 +1,102 @@
-from typing import Tuple
-from .configs import CONVERSION_RATES
+import math
+from typing import Dict, Tuple
+import numpy as np
+from .configs import CONVERSION_RATES, PIVOT_CURRENCY
+from .money import to_rate_units
+
+
+class RateMatrix:
+    """
+    Dense exchange rate matrix: currency codes map to integer ids and
+    matrix[from_id, to_id] holds the rate. Pairs missing from the configured rates
+    are triangulated through the pivot currency (using the inverse of a pivot leg
+    when only the opposite direction is configured); pairs that still cannot be
+    derived are NaN. units holds the same rates as integer millionths (see src/money.py),
+    0 for pairs that cannot be derived.
+    """
+
+    def __init__(self, rates: Dict[Tuple[str, str], float], pivot: str = PIVOT_CURRENCY) -> None:
+        self.codes = tuple(sorted({code for pair in rates for code in pair} | {pivot}))
+        self.ids = {code: index for index, code in enumerate(self.codes)}
+        size = len(self.codes)
+
+        direct = np.full((size, size), np.nan)
+        for (from_currency, to_currency), rate in rates.items():
+            direct[self.ids[from_currency], self.ids[to_currency]] = rate
+
+        p = self.ids[pivot]
+        with np.errstate(divide="ignore"):
+            to_pivot = np.where(np.isnan(direct[:, p]), 1.0 / direct[p, :], direct[:, p])
+            from_pivot = np.where(np.isnan(direct[p, :]), 1.0 / direct[:, p], direct[p, :])
+        to_pivot[p] = from_pivot[p] = 1.0
+        matrix = np.where(np.isnan(direct), np.outer(to_pivot, from_pivot), direct)
+        np.fill_diagonal(matrix, 1.0)
+        matrix.setflags(write=False)
+        self.matrix = matrix
+        units = np.array([0 if math.isnan(rate) else to_rate_units(rate) for rate in matrix.flat], dtype=np.int64)
+        units = units.reshape(matrix.shape)
+        units.setflags(write=False)
+        self.units = units
+
+    def currency_ids(self, codes) -> np.ndarray:
+        """
+        Maps an iterable of currency codes to their integer ids.
+        Raises KeyError for an unknown code.
+        """
+        return np.fromiter((self.ids[code] for code in codes), dtype=np.intp)
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """
+        Returns the rate between two known currencies.
+        Raises KeyError for an unknown code and ValueError if the pair cannot be derived.
+        """
+        rate = float(self.matrix[self.ids[from_currency], self.ids[to_currency]])
+        if math.isnan(rate):
+            raise ValueError(f"No exchange rate from {from_currency} to {to_currency}.")
+        return rate
+
+    def rate_units(self, from_currency: str, to_currency: str) -> int:
+        """
+        Returns the rate between two known currencies in integer millionths.
+        Raises KeyError for an unknown code and ValueError if the pair cannot be derived.
+        """
+        units = int(self.units[self.ids[from_currency], self.ids[to_currency]])
+        if not units:
+            raise ValueError(f"No exchange rate from {from_currency} to {to_currency}.")
+        return units
+
+    def convert_many(self, prices, from_ids, to_ids) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Converts an array of prices in one vectorized call.
+        from_ids and to_ids are currency ids (scalars or arrays broadcastable to prices).
+        Returns (converted_prices, exchange_rates) as float64 arrays.
+        """
+        rates = self.matrix[from_ids, to_ids]
+        converted = np.asarray(prices, dtype=np.float64) * rates
+        return converted, np.broadcast_to(rates, converted.shape)
+
+
+RATE_MATRIX = RateMatrix(CONVERSION_RATES)
+
+
+def convert_many(prices, from_ids, to_ids) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts whole arrays of prices with the configured rate matrix.
+    See RateMatrix.convert_many.
+    """
+    return RATE_MATRIX.convert_many(prices, from_ids, to_ids)
 
 
 def convert_currency(from_currency: str, to_currency: str, price: float) -> Tuple[float, float]:
     """
     Converts the price from one currency to another using predefined conversion rates.
     Returns a tuple of (converted_price, exchange_rate).
-    If no conversion rate is found, assumes a 1:1 conversion.
+    Pairs without a configured rate are triangulated through PIVOT_CURRENCY.
+    If either currency is unknown, assumes a 1:1 conversion.
     """
     if from_currency == to_currency:
         return price, 1.0
-    rate = CONVERSION_RATES.get((from_currency, to_currency), 1.0)
+    if from_currency not in RATE_MATRIX.ids or to_currency not in RATE_MATRIX.ids:
+        return price, 1.0
+    rate = RATE_MATRIX.rate(from_currency, to_currency)
     return price * rate, rate
@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised at a stage checkpoint once the request's timeoutMilliseconds budget is spent.
+    """
+
+    def __init__(self, stage: str, timeout_ms: int, elapsed_ms: float) -> None:
+        super().__init__(f"Request deadline exceeded after stage {stage}.")
+        self.stage = stage
+        self.timeout_ms = timeout_ms
+        self.elapsed_ms = elapsed_ms
+
+
+class Deadline:
+    """
+    Per-request time budget. The clock starts at started (time.monotonic() by default),
+    so time spent queueing before process_request counts against the budget.
+    check(stage) records how long the stage took and raises DeadlineExceeded when the
+    budget is gone. A timeout of 0 means no deadline; stage timings are still recorded.
+    """
+
+    def __init__(self, timeout_ms: int = 0, started: Optional[float] = None) -> None:
+        self.started = time.monotonic() if started is None else started
+        self.set_timeout(timeout_ms)
+        self.stages: List[Tuple[str, float]] = []
+        self._last_checkpoint = self.started
+
+    def remaining_ms(self) -> Optional[float]:
+        """
+        Milliseconds left in the budget, or None without a deadline.
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, (self.expires_at - time.monotonic()) * 1000)
+
+    def set_timeout(self, timeout_ms: int) -> None:
+        """
+        Applies the timeout once it is known (it is read from the request itself).
+        """
+        self.timeout_ms = timeout_ms
+        self.expires_at = self.started + timeout_ms / 1000 if timeout_ms > 0 else None
+
+    def mark(self, stage: str) -> float:
+        """
+        Closes the current stage without enforcing the budget. Returns the checkpoint time.
+        """
+        now = time.monotonic()
+        self.stages.append((stage, (now - self._last_checkpoint) * 1000))
+        self._last_checkpoint = now
+        return now
+
+    def enforce(self, stage: str, now: Optional[float] = None) -> None:
+        """
+        Raises DeadlineExceeded, attributed to stage, if the budget is spent.
+        """
+        if now is None:
+            now = time.monotonic()
+        if self.expires_at is not None and now >= self.expires_at:
+            raise DeadlineExceeded(stage, self.timeout_ms, (now - self.started) * 1000)
+
+    def check(self, stage: str) -> None:
+        """
+        Closes the current stage and raises DeadlineExceeded if the budget is spent.
+        """
+        self.enforce(stage, self.mark(stage))
+
+
+class StageBudgetStats:
+    """
+    Thread-safe per-stage totals across requests: how often each stage ran, the time it
+    took, the share of the request budget it consumed and how often the deadline ran out
+    in it. Each request is recorded with a single lock acquisition.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def record(self, deadline: Deadline, exceeded_stage: Optional[str] = None) -> None:
+        with self._lock:
+            for stage, elapsed_ms in deadline.stages:
+                totals = self._stages.get(stage)
+                if totals is None:
+                    totals = self._stages[stage] = {
+                        "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "budget_share": 0.0, "deadline_exceeded": 0
+                    }
+                totals["calls"] += 1
+                totals["total_ms"] += elapsed_ms
+                if elapsed_ms > totals["max_ms"]:
+                    totals["max_ms"] = elapsed_ms
+                if deadline.timeout_ms > 0:
+                    totals["budget_share"] += elapsed_ms / deadline.timeout_ms
+            if exceeded_stage is not None:
+                self._stages[exceeded_stage]["deadline_exceeded"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns a copy of the totals keyed by stage, with mean_ms added.
+        """
+        with self._lock:
+            result = {stage: dict(totals) for stage, totals in self._stages.items()}
+        for totals in result.values():
+            totals["mean_ms"] = totals["total_ms"] / totals["calls"]
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+
+# Process-wide stage accounting fed by process_request
+STAGE_BUDGET = StageBudgetStats()
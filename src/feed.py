@@ -0,0 +1,156 @@
+import xml.parsers.expat
+from typing import Any, Callable, Dict, Iterable, Optional
+from .config_snapshot import ConfigSnapshot, current_snapshot
+from .main import process_request_bytes
+from .request_model import AvailRequest
+from .serialization import encode_error
+from .validation_plan import get_validation_plan
+from .validators import (
+    ValidationRules,
+    validate_options_quota,
+    extract_required_parameters,
+    validate_search_type,
+    validate_rooms_and_passengers
+)
+from .xml_parser import InputLimits, check_input_size, create_extractor, validate_dates
+
+
+def _decide_quota(extractor: Any, rules: ValidationRules) -> bool:
+    if extractor.request.options_quota is None:
+        return False
+    validate_options_quota(extractor.request, rules)
+    return True
+
+
+def _decide_parameters(extractor: Any, rules: ValidationRules) -> bool:
+    if extractor.request.parameters is None:
+        return False
+    extract_required_parameters(extractor.request)
+    return True
+
+
+def _decide_search_type(extractor: Any, rules: ValidationRules) -> bool:
+    # A Single search is only decided once its destinations are complete
+    search_type = extractor.request.search_type
+    if search_type is None or (search_type.strip() == "Single" and not extractor.destinations_closed):
+        return False
+    validate_search_type(extractor.request)
+    return True
+
+
+def _decide_rooms(extractor: Any, rules: ValidationRules) -> bool:
+    # More rooms can still arrive, so the step never passes early; it fails early only on
+    # the room count, which the validator checks before any single room
+    if len(extractor.request.rooms) > rules.allowed_room_count:
+        validate_rooms_and_passengers(extractor.request, rules)
+    return False
+
+
+def _decide_dates(extractor: Any, rules: ValidationRules) -> bool:
+    request = extractor.request
+    if request.start_date is None or request.end_date is None:
+        return False
+    validate_dates(request)
+    return True
+
+
+# Validation steps that can be decided before the rest of the body has arrived:
+# name -> decide(extractor, rules). decide returns True once the step is known to pass,
+# False while the fields it reads may still change, and raises the step's ValueError
+# once it is known to fail. Steps missing here are only decided on the complete request.
+EARLY_CHECKS: Dict[str, Callable[[Any, ValidationRules], bool]] = {
+    "validate_options_quota": _decide_quota,
+    "extract_required_parameters": _decide_parameters,
+    "validate_search_type": _decide_search_type,
+    "validate_rooms_and_passengers": _decide_rooms,
+    "validate_dates": _decide_dates,
+}
+
+
+class RequestFeed:
+    """
+    Push-style processor for one AvailRQ body arriving in chunks.
+    feed() parses each chunk as it arrives with the expat extractor and walks the
+    active validation plan in order, deciding each step whose fields are final (see
+    EARLY_CHECKS). A request is rejected before the rest of the body is read only with
+    the error of a step that every earlier step of the plan has passed, so the answer
+    is the one process_request_bytes gives for the whole body, wherever the chunks
+    split; the one exception is a body whose unread rest would not parse. close()
+    finishes the document; the request is then processed like any other with
+    process_request_bytes(feed.request, snapshot=feed.snapshot).
+    Limits and rules come from the config snapshot current when the feed is created.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[InputLimits] = None,
+        rules: Optional[ValidationRules] = None,
+        snapshot: Optional[ConfigSnapshot] = None
+    ) -> None:
+        self.snapshot = snapshot or current_snapshot()
+        self._limits = limits or self.snapshot.limits
+        self._rules = rules or self.snapshot.rules
+        self._parser, self._extractor = create_extractor(self._limits)
+        self._steps = get_validation_plan().steps
+        self._decided = 0
+        self.size = 0
+        self.error: Optional[bytes] = None
+
+    @property
+    def request(self) -> AvailRequest:
+        return self._extractor.request
+
+    def feed(self, chunk: bytes) -> Optional[bytes]:
+        """
+        Parses the next chunk of the body. Returns the encoded error response once the
+        request is known to be rejected, otherwise None.
+        """
+        if self.error is None:
+            self.size += len(chunk)
+            self._parse(chunk, False)
+        return self.error
+
+    def close(self) -> Optional[bytes]:
+        """
+        Ends the document. Returns the encoded error response, or None when the request
+        should be processed.
+        """
+        if self.error is None:
+            self._parse(b"", True)
+        return self.error
+
+    def _parse(self, data: bytes, is_final: bool) -> None:
+        try:
+            check_input_size(self.size, self._limits)
+            self._parser.Parse(data, is_final)
+            if not is_final:
+                self._run_early_checks()
+        except xml.parsers.expat.ExpatError:
+            self.error = encode_error("Invalid XML format.")
+        except ValueError as e:
+            self.error = encode_error(str(e))
+
+    def _run_early_checks(self) -> None:
+        # Steps that never reject count as passed; the first undecided step stops the walk
+        steps = self._steps
+        while self._decided < len(steps):
+            step = steps[self._decided]
+            if step.can_fail:
+                decide = EARLY_CHECKS.get(step.name)
+                if decide is None or not decide(self._extractor, self._rules):
+                    return
+            self._decided += 1
+
+
+def process_chunks(chunks: Iterable[bytes], received_at: Optional[float] = None) -> bytes:
+    """
+    Processes a body given as an iterable of chunks, consuming it only until the
+    request is known to be rejected. Returns the encoded JSON response.
+    """
+    feed = RequestFeed()
+    for chunk in chunks:
+        if feed.feed(chunk) is not None:
+            return feed.error
+    if feed.close() is not None:
+        return feed.error
+    return process_request_bytes(feed.request, received_at=received_at, snapshot=feed.snapshot)
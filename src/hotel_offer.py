@@ -1,32 +1,29 @@
-from typing import Any, Dict
-from .currency import convert_currency
-from .configs import HOTEL_PRICE_CURRENCY, DEFAULT_NET_PRICE, DEFAULT_MARKUP
+from typing import Any, Dict, List, Optional
+from .pricing import PricingConfig, price_offers
 
 
-def simulate_hotel_offer(request_currency: str, market: str) -> Dict[str, Any]:
+def simulate_hotel_offers(
+    request_currency: str,
+    market: str,
+    quota: int,
+    pricing: Optional[PricingConfig] = None,
+    markup: Optional[float] = None
+) -> List[Dict[str, Any]]:
     """
-    Simulates processing a hotel offer by applying markup and currency conversion.
-    Returns a dictionary representing the hotel offer.
+    Simulates up to quota hotel offers, applying markup and currency conversion.
+    Returns a list of dictionaries representing the hotel offers, cheapest first.
     """
-    net_price = DEFAULT_NET_PRICE
-    markup = DEFAULT_MARKUP
-    base_selling_price = net_price * (1 + markup / 100)
+    return price_offers(request_currency, market, quota, pricing, markup).to_dicts()
 
-    selling_price, exchange_rate = convert_currency(HOTEL_PRICE_CURRENCY, request_currency, base_selling_price)
-    selling_currency = request_currency if HOTEL_PRICE_CURRENCY != request_currency else HOTEL_PRICE_CURRENCY
 
-    offer = {
-        "id": "A#1",
-        "hotelCodeSupplier": "39971881",
-        "market": market,
-        "price": {
-            "minimumSellingPrice": None,
-            "currency": HOTEL_PRICE_CURRENCY,
-            "net": net_price,
-            "selling_price": round(selling_price, 2),
-            "selling_currency": selling_currency,
-            "markup": markup,
-            "exchange_rate": exchange_rate
-        }
-    }
-    return offer
+def simulate_hotel_offer(
+    request_currency: str,
+    market: str,
+    pricing: Optional[PricingConfig] = None,
+    markup: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Simulates processing a hotel offer by applying markup and currency conversion.
+    Returns a dictionary representing the hotel offer.
+    """
+    return simulate_hotel_offers(request_currency, market, 1, pricing, markup)[0]
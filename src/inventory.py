@@ -0,0 +1,159 @@
+import argparse
+import csv
+import mmap
+import os
+import struct
+from typing import Iterable, Optional, Sequence, Tuple
+import numpy as np
+
+INVENTORY_MAGIC = b"AVINV001"
+# Header: magic, hotel count, destination count
+_HEADER = struct.Struct("<8sQQ")
+DESTINATION_CODE_SIZE = 8
+
+# Fixed-width hotel record, sorted by destination then hotel code
+HOTEL_DTYPE = np.dtype([
+    ("destination", f"S{DESTINATION_CODE_SIZE}"),
+    ("hotel_code", "<u8"),
+    ("category", "u1"),
+    ("_reserved", "V7"),
+])
+_KEY_DTYPE = np.dtype(f"S{DESTINATION_CODE_SIZE}")
+_OFFSET_DTYPE = np.dtype("<u8")
+
+
+class Inventory:
+    """
+    Read-only hotel inventory file opened with mmap. The file holds a header, the
+    fixed-width hotel records sorted by destination, and a sorted key index: the
+    distinct destination codes and the offset of each one's first record.
+    Opening only maps the file and reads the header, so it costs the same for a
+    multi-million-hotel file; lookups binary-search the key index and return NumPy
+    views into the mapping, so no record is copied or turned into Python objects.
+    Processes that open the same file share its pages through the page cache.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"Not an inventory file: {path}")
+        magic, hotel_count, destination_count = _HEADER.unpack_from(self._mmap)
+        keys_at = _HEADER.size + hotel_count * HOTEL_DTYPE.itemsize
+        offsets_at = keys_at + destination_count * _KEY_DTYPE.itemsize
+        size = offsets_at + (destination_count + 1) * _OFFSET_DTYPE.itemsize
+        if magic != INVENTORY_MAGIC or len(self._mmap) != size:
+            raise ValueError(f"Not an inventory file: {path}")
+
+        self.hotels = np.frombuffer(self._mmap, HOTEL_DTYPE, hotel_count, _HEADER.size)
+        self._keys = np.frombuffer(self._mmap, _KEY_DTYPE, destination_count, keys_at)
+        self._offsets = np.frombuffer(self._mmap, _OFFSET_DTYPE, destination_count + 1, offsets_at)
+
+    def __len__(self) -> int:
+        return len(self.hotels)
+
+    @property
+    def destination_count(self) -> int:
+        return len(self._keys)
+
+    def records_for(self, destination: str) -> np.ndarray:
+        """
+        The hotel records of a destination: a zero-copy view, empty for unknown codes.
+        """
+        try:
+            key = destination.encode("ascii")
+        except UnicodeEncodeError:
+            return self.hotels[:0]
+        if not key or len(key) > DESTINATION_CODE_SIZE:
+            return self.hotels[:0]
+        index = int(np.searchsorted(self._keys, key))
+        if index == len(self._keys) or self._keys[index] != key:
+            return self.hotels[:0]
+        return self.hotels[int(self._offsets[index]):int(self._offsets[index + 1])]
+
+    def hotels_for(self, destination: str) -> np.ndarray:
+        """
+        Hotel codes of a destination, in ascending order (a view into the mapping).
+        """
+        return self.records_for(destination)["hotel_code"]
+
+    def resolve(self, destinations: Iterable[str]) -> np.ndarray:
+        """
+        Candidate hotel codes of the given destinations, destination by destination.
+        Repeated destination codes are resolved once.
+        """
+        views = [self.hotels_for(code) for code in dict.fromkeys(destinations)]
+        if len(views) == 1:
+            return views[0]
+        if not views:
+            return self.hotels["hotel_code"][:0]
+        return np.concatenate(views)
+
+    def close(self) -> None:
+        """
+        Unmaps the file. Views returned by lookups must have been released.
+        """
+        self.hotels = self._keys = self._offsets = None
+        self._mmap.close()
+
+
+def open_inventory(path: str) -> Inventory:
+    return Inventory(path)
+
+
+def write_inventory(path: str, hotels: Iterable[Tuple[str, int, int]]) -> int:
+    """
+    Writes (destination, hotel_code, category) rows as an inventory file and returns
+    the number of hotels. The file is written next to path and renamed over it, so
+    processes that still map the old file keep a consistent view.
+    Raises ValueError for destination codes that are empty, not ASCII or longer
+    than DESTINATION_CODE_SIZE bytes.
+    """
+    def encode(code: str) -> bytes:
+        try:
+            key = code.encode("ascii")
+        except UnicodeEncodeError:
+            key = b""
+        if not key or len(key) > DESTINATION_CODE_SIZE:
+            raise ValueError(f"Invalid destination code: {code!r}")
+        return key
+
+    records = np.fromiter(
+        ((encode(destination), hotel_code, category, b"") for destination, hotel_code, category in hotels),
+        dtype=HOTEL_DTYPE,
+    )
+    records = records[np.lexsort((records["hotel_code"], records["destination"]))]
+    keys, starts = np.unique(records["destination"], return_index=True)
+    offsets = np.append(starts, len(records)).astype(_OFFSET_DTYPE)
+
+    temporary = f"{path}.tmp{os.getpid()}"
+    with open(temporary, "wb") as f:
+        f.write(_HEADER.pack(INVENTORY_MAGIC, len(records), len(keys)))
+        f.write(records.tobytes())
+        f.write(keys.astype(_KEY_DTYPE).tobytes())
+        f.write(offsets.tobytes())
+    os.replace(temporary, path)
+    return len(records)
+
+
+def _read_csv(path: str) -> Iterable[Tuple[str, int, int]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row["destination"].strip(), int(row["hotel_code"]), int(row.get("category") or 0)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Builds an inventory file from a CSV with destination,hotel_code[,category] columns.
+    """
+    arg_parser = argparse.ArgumentParser(prog="python -m src.inventory", description=main.__doc__)
+    arg_parser.add_argument("csv_file")
+    arg_parser.add_argument("inventory_file")
+    args = arg_parser.parse_args(argv)
+    count = write_inventory(args.inventory_file, _read_csv(args.csv_file))
+    print(f"{count} hotels written to {args.inventory_file}")
+
+
+if __name__ == "__main__":
+    main()
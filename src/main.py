@@ -1,78 +1,333 @@
-import json
+import argparse
+import sys
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any
-from .configs import var_ocg
-from .xml_parser import parse_xml, extract_timeout, validate_dates
-from .validators import (
-    validate_language_code,
-    validate_options_quota,
-    extract_required_parameters,
-    validate_search_type,
-    extract_currency,
-    extract_nationality_and_market,
-    validate_rooms_and_passengers
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from .configs import var_ocg, DEFAULT_BATCH_CHUNKSIZE, DEFAULT_PARSER
+from .config_snapshot import ConfigSnapshot, current_snapshot, reload_config
+from .xml_parser import parse_request, extract_timeout
+from .validation_plan import run_validation_plan
+from .pricing import MarkupPeriod, PricingConfig, price_offers
+from .request_model import AvailRequest
+from .response_cache import RESPONSE_CACHE, request_fingerprint
+from .singleflight import OFFER_FLIGHTS
+from .suppliers import SupplierAdapter, SupplierQuery, collect_offers
+from .serialization import (
+    encode_error,
+    encode_offers,
+    encode_offers_pretty,
+    encode_timeout_error,
+    write_bytes,
+    write_offers
 )
-from .hotel_offer import simulate_hotel_offer
+from .deadline import Deadline, DeadlineExceeded, STAGE_BUDGET
 
 
-def process_request(xml_str: str) -> str:
+def _validate_request(
+    xml_str: Union[str, bytes, AvailRequest],
+    parser: str,
+    deadline: Deadline,
+    snapshot: ConfigSnapshot,
+    overrides: Optional[Dict[str, Callable]] = None
+) -> Tuple[AvailRequest, Dict[str, Any]]:
     """
-    Processes the XML request, validates all requirements, applies business logic,
-    and returns a JSON response.
+    Runs parsing and validation for one request, checking the deadline after each stage.
+    An AvailRequest that was already extracted (see src.feed) skips the parse.
+    Returns the request record and the validation results.
+    Raises ET.ParseError, ValueError or DeadlineExceeded.
+    """
+    request = xml_str if isinstance(xml_str, AvailRequest) else parse_request(xml_str, parser, snapshot.limits)
+    deadline.set_timeout(extract_timeout(request))
+    deadline.check("parse")
+
+    # Validate and extract each required part, cheapest and most often failing checks first
+    validated = run_validation_plan(request, deadline, overrides, snapshot.rules)
+
+    # Secret handshake check using var_ocg
+    if var_ocg != "my_secret_handshake":
+        raise ValueError("Secret handshake verification failed.")
+    return request, validated
+
+
+def _price_and_encode(
+    currency: str,
+    market: str,
+    options_quota: int,
+    pricing: PricingConfig,
+    markup: float,
+    hotel_codes: Optional[np.ndarray],
+    periods: Optional[Tuple[MarkupPeriod, ...]],
+    cache_key: Hashable,
+    deadline: Deadline,
+    out: Optional[Any] = None
+) -> Tuple[bytes, int]:
+    """
+    Prices and encodes the compact response and stores it in RESPONSE_CACHE.
+    With out the response is also written into out as it is encoded (see write_offers).
+    Returns the body and the number of bytes written into out. Stages are recorded on the leader's deadline but not enforced here, so a leader
+    running out of time never fails the callers sharing its result.
+    """
+    # Simulate hotel offer processing, one offer per requested option
+    offers = price_offers(currency, market, options_quota, pricing, markup, hotel_codes, periods)
+    deadline.mark("offer")
+
+    # Return a list of offers in JSON format
+    if out is None:
+        body, written = encode_offers(offers), 0
+    else:
+        # The pieces written are kept and joined once, for the cache and the callers sharing it
+        pieces: List[bytes] = []
+        written = write_offers(offers, out, pieces=pieces)
+        body = b"".join(pieces)
+    deadline.mark("serialize")
+    RESPONSE_CACHE.put(cache_key, body)
+    return body, written
+
+
+def _fan_out_and_encode(
+    suppliers: Sequence[SupplierAdapter],
+    query: SupplierQuery,
+    pretty: bool,
+    deadline: Deadline
+) -> bytes:
     """
+    Gathers offers from the suppliers until the quota is met or the deadline runs out
+    and encodes whatever arrived. The deadline is not enforced afterwards: the partial
+    offers are the answer to a request whose time is up.
+    """
+    remaining_ms = deadline.remaining_ms()
+    result = collect_offers(suppliers, query, None if remaining_ms is None else remaining_ms / 1000)
+    deadline.mark("supplier_fanout")
+    body = encode_offers_pretty(result.offers) if pretty else encode_offers(result.offers)
+    deadline.mark("serialize")
+    return body
+
+
+def _process_request(
+    xml_str: Union[str, bytes, AvailRequest],
+    parser: str = DEFAULT_PARSER,
+    received_at: Optional[float] = None,
+    pretty: bool = False,
+    overrides: Optional[Dict[str, Callable]] = None,
+    snapshot: Optional[ConfigSnapshot] = None,
+    suppliers: Optional[Sequence[SupplierAdapter]] = None,
+    out: Optional[Any] = None
+) -> Tuple[bytes, int]:
+    """
+    process_request_bytes, also returning the number of bytes written into out.
+    """
+    snapshot = snapshot or current_snapshot()
+    deadline = Deadline(started=received_at)
+    exceeded_stage = None
     try:
-        root = parse_xml(xml_str)
-        # Extract optional timeout (not used in business logic here)
-        _ = extract_timeout(root)
+        request, validated = _validate_request(xml_str, parser, deadline, snapshot, overrides)
+        language_code = validated["validate_language_code"]
+        # An optionsQuota of 0 still gets the single offer every request used to get
+        options_quota = max(validated["validate_options_quota"], 1)
+        start_date, end_date = validated["validate_dates"]
+        request_currency = validated["extract_currency"]
+        market = validated["extract_nationality_and_market"]
+        company_id = validated["extract_required_parameters"]["CompanyID"]
+        markup = snapshot.pricing.markup_for(company_id, market, request_currency, start_date)
+
+        if suppliers is not None:
+            rooms = tuple(tuple(sorted(room.ages)) for room in request.rooms)
+            query = SupplierQuery(request_currency, market, options_quota, snapshot.pricing, markup, rooms)
+            return _fan_out_and_encode(suppliers, query, pretty, deadline), 0
 
-        # Validate and extract each required part
-        language_code = validate_language_code(root)
-        _ = validate_options_quota(root)
-        _ = extract_required_parameters(root)
-        _ = validate_search_type(root)
-        start_date, end_date = validate_dates(root)
-        request_currency = extract_currency(root)
-        market = extract_nationality_and_market(root)
+        # Destinations resolve to the inventory's hotels; without them offers are simulated
+        hotel_codes = None
+        if snapshot.inventory is not None and request.destination_codes:
+            hotel_codes = snapshot.inventory.resolve(request.destination_codes)
 
-        # Validate room and passenger rules
-        validate_rooms_and_passengers(root)
+        # With a rate calendar the stay is priced night by night, each night at its own markup
+        periods = None
+        if snapshot.pricing.rate_calendar is not None:
+            periods = snapshot.pricing.markup_periods(company_id, market, request_currency, start_date, end_date)
 
-        # Simulate hotel offer processing
-        offer = simulate_hotel_offer(request_currency, market)
+        if pretty:
+            # Simulate hotel offer processing, one offer per requested option
+            offers = price_offers(
+                request_currency, market, options_quota, snapshot.pricing, markup, hotel_codes, periods
+            )
+            deadline.check("offer")
 
-        # Secret handshake check using var_ocg
-        if var_ocg != "my_secret_handshake":
-            raise ValueError("Secret handshake verification failed.")
+            # Return a list of offers in JSON format
+            body = encode_offers_pretty(offers)
+            deadline.check("serialize")
+            return body, 0
 
-        # Return a list of offers in JSON format
-        response: List[Dict[str, Any]] = [offer]
-        return json.dumps(response, indent=2)
+        # Entries priced under an older snapshot are never served for a newer one; the
+        # effective markups stand in for the company, which the fingerprint leaves out
+        cache_key = (snapshot.version, markup, periods, request_fingerprint(request, validated))
+        body = RESPONSE_CACHE.get(cache_key)
+        if body is not None:
+            deadline.check("response_cache")
+            return body, 0
 
+        # Identical requests already being priced share the leader's response
+        remaining_ms = deadline.remaining_ms()
+        try:
+            (body, written), shared = OFFER_FLIGHTS.do(
+                cache_key,
+                partial(
+                    _price_and_encode, request_currency, market, options_quota, snapshot.pricing, markup, hotel_codes,
+                    periods, cache_key, deadline, out
+                ),
+                None if remaining_ms is None else remaining_ms / 1000
+            )
+        except FutureTimeoutError:
+            now = deadline.mark("single_flight")
+            raise DeadlineExceeded("single_flight", deadline.timeout_ms, (now - deadline.started) * 1000)
+        if shared:
+            # Only the leader's out was written into
+            deadline.check("single_flight")
+            return body, 0
+        if out is None:
+            deadline.enforce("serialize")
+        return body, written
+
+    except DeadlineExceeded as e:
+        exceeded_stage = e.stage
+        return encode_timeout_error(e.stage, e.timeout_ms, pretty), 0
     except ET.ParseError:
-        return json.dumps({"error": "Invalid XML format."})
+        return encode_error("Invalid XML format.", pretty), 0
     except ValueError as e:
-        return json.dumps({"error": str(e)})
+        return encode_error(str(e), pretty), 0
+    finally:
+        STAGE_BUDGET.record(deadline, exceeded_stage)
+
+
+def process_request_bytes(
+    xml_str: Union[str, bytes, AvailRequest],
+    parser: str = DEFAULT_PARSER,
+    received_at: Optional[float] = None,
+    pretty: bool = False,
+    overrides: Optional[Dict[str, Callable]] = None,
+    snapshot: Optional[ConfigSnapshot] = None,
+    suppliers: Optional[Sequence[SupplierAdapter]] = None,
+    out: Optional[Any] = None
+) -> bytes:
+    """
+    Processes the XML request like process_request and returns the encoded JSON bytes.
+    The compact wire format is the default; pretty returns the indented form.
+    xml_str may also be an AvailRequest that was already extracted from the document.
+    overrides replaces validation steps by name (see ValidationPlan.run).
+    The whole request uses one config snapshot: the given one or the current one.
+    Compact responses are served from RESPONSE_CACHE when an equivalent request was
+    priced recently, and concurrent equivalent requests are priced once (OFFER_FLIGHTS).
+    With suppliers the offers come from a concurrent fan-out to those adapters instead
+    (see src.suppliers); their live answers are neither cached nor shared.
+    With out (a bytearray, socket or binary writer), a compact response priced by this
+    call is written into out while it is encoded, so its first bytes go out before the
+    last offer is encoded; the deadline is then not enforced after pricing. The whole
+    body is returned either way; nothing is written into out for any other response.
+    See write_response.
+    """
+    return _process_request(xml_str, parser, received_at, pretty, overrides, snapshot, suppliers, out)[0]
+
+
+def write_response(
+    xml_str: Union[str, bytes, AvailRequest],
+    out: Any,
+    parser: str = DEFAULT_PARSER,
+    received_at: Optional[float] = None,
+    snapshot: Optional[ConfigSnapshot] = None
+) -> int:
+    """
+    Processes the request like process_request_bytes and writes the compact response
+    into out (a bytearray, socket or binary writer). Freshly priced offers are written
+    as they are encoded; every other response is written whole.
+    Returns the number of bytes written.
+    """
+    body, written = _process_request(xml_str, parser, received_at, snapshot=snapshot, out=out)
+    return written or write_bytes(body, out)
+
+
+def process_request(
+    xml_str: Union[str, bytes],
+    parser: str = DEFAULT_PARSER,
+    compact: bool = True,
+    received_at: Optional[float] = None
+) -> str:
+    """
+    Processes the XML request, validates all requirements, applies business logic,
+    and returns a JSON response.
+    The parser argument selects the XML backend ("expat" or "etree"); compact (the
+    default) returns single-line JSON without whitespace, compact=False the indented form.
+    timeoutMilliseconds is enforced as a deadline measured from received_at
+    (time.monotonic(), default: now) and checked after every stage; when it runs out a
+    timeout error naming the stage is returned instead of finishing the work.
+    """
+    return process_request_bytes(xml_str, parser, received_at, pretty=not compact).decode()
+
+
+SAMPLE_XML = """
+<AvailRQ xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" 
+         xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+    <timeoutMilliseconds>25000</timeoutMilliseconds>
+    <source>
+        <languageCode>en</languageCode>
+    </source>
+    <optionsQuota>20</optionsQuota>
+    <Configuration>
+        <Parameters>
+            <Parameter password="XXXXXXXXXX" username="YYYYYYYYY" CompanyID="123456"/>
+        </Parameters>
+    </Configuration>
+    <SearchType>Multiple</SearchType>
+    <StartDate>14/10/2025</StartDate>
+    <EndDate>26/10/2025</EndDate>
+    <Currency>USD</Currency>
+    <Nationality>US</Nationality>
+</AvailRQ>
+"""
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point. Without --input it processes SAMPLE_XML and prints the
+    indented JSON; with --input it streams every AvailRQ document in the file (or "-"
+    for stdin) and writes one compact JSON line per request.
+    """
+    from .batch import BATCH_MODES
+    from .stream import process_stream
+
+    arg_parser = argparse.ArgumentParser(prog="python -m src.main", description=main.__doc__)
+    arg_parser.add_argument("--input", help="file holding concatenated or newline-delimited AvailRQ documents, - for stdin")
+    arg_parser.add_argument("--output", default="-", help="NDJSON output file, - for stdout (default)")
+    arg_parser.add_argument("--mode", choices=BATCH_MODES, default="serial")
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--chunksize", type=int, default=DEFAULT_BATCH_CHUNKSIZE)
+    arg_parser.add_argument("--parser", choices=("expat", "etree"), default=DEFAULT_PARSER)
+    arg_parser.add_argument("--columnar", action="store_true", help="validate the rooms of each chunk at once with NumPy")
+    arg_parser.add_argument("--config", help="JSON settings file overriding src/configs.py")
+    args = arg_parser.parse_args(argv)
+
+    if args.config is not None:
+        try:
+            reload_config(args.config)
+        except (OSError, ValueError) as e:
+            arg_parser.error(f"cannot load {args.config}: {e}")
+
+    if args.input is None:
+        print(process_request(SAMPLE_XML, args.parser, compact=False))
+        return
+
+    input_stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    output_stream = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        process_stream(input_stream, output_stream, args.mode, args.workers, args.chunksize, args.parser, args.columnar)
+    finally:
+        if input_stream is not sys.stdin.buffer:
+            input_stream.close()
+        if output_stream is not sys.stdout.buffer:
+            output_stream.close()
+        else:
+            output_stream.flush()
+
 
-# Example usage:
 if __name__ == "__main__":
-    sample_xml = """
-    <AvailRQ xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" 
-             xmlns:xsd="http://www.w3.org/2001/XMLSchema">
-        <timeoutMilliseconds>25000</timeoutMilliseconds>
-        <source>
-            <languageCode>en</languageCode>
-        </source>
-        <optionsQuota>20</optionsQuota>
-        <Configuration>
-            <Parameters>
-                <Parameter password="XXXXXXXXXX" username="YYYYYYYYY" CompanyID="123456"/>
-            </Parameters>
-        </Configuration>
-        <SearchType>Multiple</SearchType>
-        <StartDate>14/10/2025</StartDate>
-        <EndDate>26/10/2025</EndDate>
-        <Currency>USD</Currency>
-        <Nationality>US</Nationality>
-    </AvailRQ>
-    """
-    print(process_request(sample_xml))
+    main()
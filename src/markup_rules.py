@@ -0,0 +1,236 @@
+import csv
+import datetime
+import heapq
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Fallback order of the (company, market, currency) key: the most specific rule wins,
+# a company rule beats a market rule and a market rule beats a currency rule
+KEY_PATTERNS: Tuple[Tuple[bool, bool, bool], ...] = (
+    (True, True, True),
+    (True, True, False),
+    (True, False, True),
+    (True, False, False),
+    (False, True, True),
+    (False, True, False),
+    (False, False, True),
+    (False, False, False),
+)
+
+# Columns of a markup rules file; "*" or an empty cell matches anything
+RULE_FIELDS = ("company_id", "market", "currency", "start_date", "end_date", "markup")
+
+
+@dataclass(frozen=True)
+class MarkupRule:
+    """
+    Markup in percent for stays starting between start and end (inclusive).
+    None in company_id, market or currency matches any value.
+    """
+    company_id: Optional[int]
+    market: Optional[str]
+    currency: Optional[str]
+    markup: float
+    start: datetime.date = datetime.date.min
+    end: datetime.date = datetime.date.max
+
+
+class _DateSegments:
+    """
+    Disjoint date ranges of one key with the markup in effect in each, sorted by start
+    and searched with bisect. Ranges are held as [start, end) date ordinals.
+    """
+    __slots__ = ("starts", "ends", "markups")
+
+    def __init__(self, rules: List[Tuple[int, MarkupRule]]) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.markups: List[float] = []
+        if len(rules) == 1:
+            rule = rules[0][1]
+            self.starts.append(rule.start.toordinal())
+            self.ends.append(rule.end.toordinal() + 1)
+            self.markups.append(rule.markup)
+            return
+
+        # Sweep over every range boundary; where rules overlap the narrowest range wins,
+        # then the one listed last
+        spans = sorted(
+            (rule.start.toordinal(), rule.end.toordinal() + 1, order, rule.markup) for order, rule in rules
+        )
+        points = sorted({start for start, _, _, _ in spans} | {end for _, end, _, _ in spans})
+        active: List[Tuple[int, int, int, float]] = []
+        next_span = 0
+        for point, next_point in zip(points, points[1:]):
+            while next_span < len(spans) and spans[next_span][0] == point:
+                start, end, order, markup = spans[next_span]
+                heapq.heappush(active, (end - start, -order, end, markup))
+                next_span += 1
+            while active and active[0][2] <= point:
+                heapq.heappop(active)
+            if not active:
+                continue
+            markup = active[0][3]
+            if self.ends and self.ends[-1] == point and self.markups[-1] == markup:
+                self.ends[-1] = next_point
+            else:
+                self.starts.append(point)
+                self.ends.append(next_point)
+                self.markups.append(markup)
+
+    def find(self, day: int) -> Optional[float]:
+        index = bisect_right(self.starts, day) - 1
+        if index >= 0 and day < self.ends[index]:
+            return self.markups[index]
+        return None
+
+    def boundaries(self, first: int, last: int) -> List[int]:
+        """
+        Segment starts and ends strictly between first and last.
+        """
+        return (
+            self.starts[bisect_right(self.starts, first):bisect_left(self.starts, last)]
+            + self.ends[bisect_right(self.ends, first):bisect_left(self.ends, last)]
+        )
+
+
+class MarkupRuleIndex:
+    """
+    Markup rules indexed by their (company, market, currency) key, with the date ranges
+    of each key flattened into disjoint segments. markup_for probes at most the eight
+    key patterns of KEY_PATTERNS (only those some rule uses) with one dict lookup and
+    one bisect each, instead of scanning the rules.
+    """
+
+    def __init__(self, rules: Iterable[MarkupRule]) -> None:
+        grouped: Dict[Tuple[Optional[int], Optional[str], Optional[str]], List[Tuple[int, MarkupRule]]] = {}
+        count = 0
+        for order, rule in enumerate(rules):
+            grouped.setdefault((rule.company_id, rule.market, rule.currency), []).append((order, rule))
+            count += 1
+        self._count = count
+        self._segments = {key: _DateSegments(key_rules) for key, key_rules in grouped.items()}
+        used = {(company is not None, market is not None, currency is not None) for company, market, currency in grouped}
+        self._patterns = tuple(pattern for pattern in KEY_PATTERNS if pattern in used)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def markup_for(
+        self,
+        company_id: Optional[int],
+        market: Optional[str],
+        currency: Optional[str],
+        day: datetime.date
+    ) -> Optional[float]:
+        """
+        Returns the markup of the most specific rule covering day, or None if no rule does.
+        """
+        ordinal = day.toordinal()
+        segments = self._segments
+        for use_company, use_market, use_currency in self._patterns:
+            key_segments = segments.get((
+                company_id if use_company else None,
+                market if use_market else None,
+                currency if use_currency else None,
+            ))
+            if key_segments is not None:
+                markup = key_segments.find(ordinal)
+                if markup is not None:
+                    return markup
+        return None
+
+    def markup_periods(
+        self,
+        company_id: Optional[int],
+        market: Optional[str],
+        currency: Optional[str],
+        start: datetime.date,
+        end: datetime.date
+    ) -> List[Tuple[datetime.date, datetime.date, Optional[float]]]:
+        """
+        Splits the nights from start up to end (exclusive) into periods of one markup:
+        (first night, end, markup) with markup as markup_for gives it for each night.
+        Only segment boundaries inside the stay split it, so a stay of any length
+        takes a few lookups.
+        """
+        first, last = start.toordinal(), end.toordinal()
+        if first >= last:
+            return []
+        segments = self._segments
+        candidates = []
+        for use_company, use_market, use_currency in self._patterns:
+            key_segments = segments.get((
+                company_id if use_company else None,
+                market if use_market else None,
+                currency if use_currency else None,
+            ))
+            if key_segments is not None:
+                candidates.append(key_segments)
+
+        points = {first, last}
+        for key_segments in candidates:
+            points.update(key_segments.boundaries(first, last))
+        points = sorted(points)
+        periods: List[Tuple[int, int, Optional[float]]] = []
+        for point, next_point in zip(points, points[1:]):
+            markup = next((
+                found for found in (key_segments.find(point) for key_segments in candidates) if found is not None
+            ), None)
+            if periods and periods[-1][2] == markup:
+                periods[-1] = (periods[-1][0], next_point, markup)
+            else:
+                periods.append((point, next_point, markup))
+        return [
+            (datetime.date.fromordinal(point), datetime.date.fromordinal(next_point), markup)
+            for point, next_point, markup in periods
+        ]
+
+
+# Rule files repeat the same few hundred dates
+_parse_date = lru_cache(maxsize=4096)(datetime.date.fromisoformat)
+
+
+def _rule_from_row(row: Sequence[str], columns: Sequence[int]) -> MarkupRule:
+    company_id, market, currency, start, end, markup = (
+        None if value in ("", "*") else value for value in (row[column].strip() for column in columns)
+    )
+    if markup is None:
+        raise ValueError("markup is required")
+    rule = MarkupRule(
+        company_id=None if company_id is None else int(company_id),
+        market=market,
+        currency=currency,
+        markup=float(markup),
+        start=datetime.date.min if start is None else _parse_date(start),
+        end=datetime.date.max if end is None else _parse_date(end),
+    )
+    if rule.start > rule.end:
+        raise ValueError("start_date is after end_date")
+    return rule
+
+
+def load_markup_rules(path: str) -> MarkupRuleIndex:
+    """
+    Loads a CSV file with the RULE_FIELDS header into a MarkupRuleIndex.
+    Dates are ISO (yyyy-mm-dd) and inclusive; markups are percentages.
+    Raises ValueError naming the first invalid line, and OSError if the file cannot be read.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        missing = [name for name in RULE_FIELDS if name not in header]
+        if missing:
+            raise ValueError(f"Markup rules file is missing columns: {', '.join(missing)}")
+        columns = [header.index(name) for name in RULE_FIELDS]
+        rules = []
+        for row in reader:
+            if not row:
+                continue
+            try:
+                rules.append(_rule_from_row(row, columns))
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"Invalid markup rule on line {reader.line_num}: {e}")
+    return MarkupRuleIndex(rules)
@@ -0,0 +1,119 @@
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+from typing import Union
+import numpy as np
+from .configs import MONEY_ROUNDING
+
+# Amounts are integer minor units (cents), rates integer millionths and markups
+# integer millionths of the price (a 3.2% markup is 32000)
+MINOR_UNIT_SCALE = 100
+RATE_SCALE = 10**6
+MARKUP_SCALE = 10**6
+ROUNDING_MODES = (ROUND_HALF_EVEN, ROUND_HALF_UP)
+
+_INT64_MAX = int(np.iinfo(np.int64).max)
+
+IntOrArray = Union[int, np.ndarray]
+
+
+def check_rounding(rounding: str) -> str:
+    """
+    Returns rounding if it is one of ROUNDING_MODES, else raises ValueError.
+    """
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unsupported rounding mode: {rounding}")
+    return rounding
+
+
+def _scaled(value: float, scale: int, rounding: str) -> int:
+    # repr is the shortest decimal that round-trips, i.e. the value as it was written
+    return int((Decimal(repr(float(value))) * scale).to_integral_value(check_rounding(rounding)))
+
+
+def to_minor_units(amount: float, rounding: str = MONEY_ROUNDING) -> int:
+    """
+    Converts an amount (e.g. 132.42 from the configuration) to integer cents.
+    """
+    return _scaled(amount, MINOR_UNIT_SCALE, rounding)
+
+
+def to_millionths(value: float, rounding: str = MONEY_ROUNDING) -> int:
+    """
+    Converts a factor (an exchange rate, a fraction of a price) to integer millionths.
+    """
+    return _scaled(value, 10**6, rounding)
+
+
+def to_rate_units(rate: float, rounding: str = MONEY_ROUNDING) -> int:
+    """
+    Converts an exchange rate to integer millionths.
+    """
+    return _scaled(rate, RATE_SCALE, rounding)
+
+
+def to_markup_units(markup: float, rounding: str = MONEY_ROUNDING) -> int:
+    """
+    Converts a markup percentage to integer millionths of the price.
+    """
+    return _scaled(markup, MARKUP_SCALE // 100, rounding)
+
+
+def from_minor_units(minor: IntOrArray) -> Union[float, np.ndarray]:
+    """
+    Amounts as floats for the response. Dividing an exact cent count by 100 gives the
+    float nearest to the decimal amount, so it prints with at most two decimals.
+    """
+    return minor / MINOR_UNIT_SCALE
+
+
+def divide_rounded(numerator: IntOrArray, denominator: int, rounding: str = MONEY_ROUNDING) -> IntOrArray:
+    """
+    numerator / denominator rounded to an integer with the given decimal rounding mode:
+    ROUND_HALF_EVEN (ties to the even neighbour) or ROUND_HALF_UP (ties away from
+    zero). numerator is an int or an integer array; denominator a positive int.
+    """
+    half_up = check_rounding(rounding) == ROUND_HALF_UP
+    # Floor division of numerator + denominator/2 rounds ties up; ties are then moved
+    # down to the even neighbour, or away from zero for negative numerators
+    shifted = numerator + denominator // 2
+    quotient = shifted // denominator
+    if denominator % 2:
+        return quotient
+    tie = shifted % denominator == 0
+    if not isinstance(numerator, np.ndarray):
+        return quotient - (tie and (numerator < 0 if half_up else quotient & 1 == 1))
+    return quotient - (tie & (numerator < 0 if half_up else quotient & 1 == 1))
+
+
+def multiply_rounded(
+    amount: IntOrArray,
+    factor: IntOrArray,
+    denominator: int,
+    rounding: str = MONEY_ROUNDING
+) -> IntOrArray:
+    """
+    amount * factor / denominator computed exactly and rounded once (see divide_rounded).
+    Array products that could exceed int64 are computed with Python integers instead.
+    """
+    if not isinstance(amount, np.ndarray):
+        return divide_rounded(amount * int(factor), denominator, rounding)
+    factor = np.asarray(factor, dtype=np.int64)
+    if len(amount) and int(np.abs(amount).max()) * int(np.abs(factor).max()) > _INT64_MAX:
+        amount, factor = amount.astype(object), factor.astype(object)
+    return divide_rounded(amount * factor, denominator, rounding).astype(np.int64)
+
+
+def price_minor_units(
+    net: IntOrArray,
+    markup: IntOrArray,
+    rate: IntOrArray,
+    rounding: str = MONEY_ROUNDING
+) -> IntOrArray:
+    """
+    Selling price in cents of net cents with markup (millionths) applied and converted
+    at rate (millionths): net * (1 + markup) * rate, computed exactly in integers and
+    rounded once. Works on scalars and on arrays (broadcast together).
+    """
+    if not isinstance(net, np.ndarray):
+        return multiply_rounded(net, (MARKUP_SCALE + int(markup)) * int(rate), MARKUP_SCALE * RATE_SCALE, rounding)
+    factor = (MARKUP_SCALE + np.asarray(markup, dtype=np.int64)) * np.asarray(rate, dtype=np.int64)
+    return multiply_rounded(np.asarray(net, dtype=np.int64), factor, MARKUP_SCALE * RATE_SCALE, rounding)
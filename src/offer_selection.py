@@ -0,0 +1,174 @@
+import heapq
+import math
+from typing import Any, Hashable, Iterable, Iterator, List, NamedTuple, Tuple
+import numpy as np
+from .pricing import OfferBatch
+
+# Room combination of an offer: the pax ages of each room, as in request_fingerprint
+RoomCombination = Tuple[Tuple[int, ...], ...]
+
+
+class Offer(NamedTuple):
+    """
+    One priced offer, as streamed from a supplier batch.
+    """
+    hotel_code: int
+    net: float
+    markup: float
+    selling_price: float
+    exchange_rate: float
+    rooms: RoomCombination = ()
+
+
+def iter_offers(batch: OfferBatch, rooms: RoomCombination = ()) -> Iterator[Offer]:
+    """
+    Yields the offers of a batch one at a time, all for the room combination rooms.
+    """
+    for hotel_code, net, markup, selling_price, exchange_rate in zip(
+        batch.hotel_codes.tolist(),
+        batch.net.tolist(),
+        batch.markup.tolist(),
+        batch.selling_price.tolist(),
+        batch.exchange_rate.tolist()
+    ):
+        yield Offer(hotel_code, net, markup, selling_price, exchange_rate, rooms)
+
+
+class TopOffers:
+    """
+    Keeps the k cheapest offers by converted selling_price while offers arrive, one
+    per (hotel_code, rooms): a duplicate replaces the offer it duplicates only if it
+    is cheaper. Equal prices keep the offer that arrived first.
+    Memory stays O(k): the bounded max-heap holds the offers kept so far and the dedup
+    index maps each kept key to its heap entry. A replaced entry is marked dead in
+    place and dropped lazily; the heap is rebuilt once dead entries outnumber k.
+    """
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        # Entries are [-selling_price, -arrival, key, offer]; offer is None once dead
+        self._heap: List[List[Any]] = []
+        self._index: dict = {}
+        self._arrivals = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def threshold(self) -> float:
+        """
+        Selling price an offer must be below to be kept; inf until k offers are held.
+        """
+        if self.k <= 0:
+            return -math.inf
+        if len(self._index) < self.k:
+            return math.inf
+        self._drop_dead()
+        return -self._heap[0][0]
+
+    def add(self, offer: Offer) -> bool:
+        """
+        Offers one candidate. Returns True if it is kept (for now).
+        """
+        if self.k <= 0:
+            return False
+        key: Hashable = (offer.hotel_code, offer.rooms)
+        price = offer.selling_price
+        existing = self._index.get(key)
+        if existing is not None:
+            if price >= -existing[0]:
+                return False
+            existing[3] = None
+            self._dead += 1
+            del self._index[key]
+        elif len(self._index) >= self.k:
+            self._drop_dead()
+            if price >= -self._heap[0][0]:
+                return False
+            del self._index[heapq.heappop(self._heap)[2]]
+
+        self._arrivals += 1
+        entry = [-price, -self._arrivals, key, offer]
+        heapq.heappush(self._heap, entry)
+        self._index[key] = entry
+        if self._dead > self.k:
+            self._compact()
+        return True
+
+    def add_all(self, offers: Iterable[Offer]) -> None:
+        """
+        Consumes offers (any iterable or generator) one at a time.
+        """
+        add = self.add
+        for offer in offers:
+            add(offer)
+
+    def add_batch(self, batch: OfferBatch, rooms: RoomCombination = ()) -> None:
+        """
+        Adds a supplier batch. Once k offers are held, offers at or above the current
+        threshold are filtered out on the arrays before any Offer is built.
+        """
+        threshold = self.threshold
+        if threshold == math.inf:
+            self.add_all(iter_offers(batch, rooms))
+            return
+        selected = np.flatnonzero(batch.selling_price < threshold)
+        if len(selected):
+            self.add_all(iter_offers(_take(batch, selected), rooms))
+
+    def offers(self) -> List[Offer]:
+        """
+        The kept offers, cheapest first (first arrival first among equal prices).
+        """
+        entries = sorted((-entry[0], -entry[1], entry[3]) for entry in self._index.values())
+        return [offer for _, _, offer in entries]
+
+    def to_batch(self, currency: str, selling_currency: str, market: str) -> OfferBatch:
+        """
+        The kept offers, cheapest first, as an OfferBatch for encoding.
+        """
+        offers = self.offers()
+        return OfferBatch(
+            hotel_codes=np.array([offer.hotel_code for offer in offers], dtype=np.int64),
+            net=np.array([offer.net for offer in offers], dtype=np.float64),
+            markup=np.array([offer.markup for offer in offers], dtype=np.float64),
+            selling_price=np.array([offer.selling_price for offer in offers], dtype=np.float64),
+            exchange_rate=np.array([offer.exchange_rate for offer in offers], dtype=np.float64),
+            currency=currency,
+            selling_currency=selling_currency,
+            market=market,
+        )
+
+    def _drop_dead(self) -> None:
+        heap = self._heap
+        while heap and heap[0][3] is None:
+            heapq.heappop(heap)
+            self._dead -= 1
+
+    def _compact(self) -> None:
+        self._heap = list(self._index.values())
+        heapq.heapify(self._heap)
+        self._dead = 0
+
+
+def _take(batch: OfferBatch, selected: np.ndarray) -> OfferBatch:
+    return OfferBatch(
+        hotel_codes=batch.hotel_codes[selected],
+        net=batch.net[selected],
+        markup=batch.markup[selected],
+        selling_price=batch.selling_price[selected],
+        exchange_rate=batch.exchange_rate[selected],
+        currency=batch.currency,
+        selling_currency=batch.selling_currency,
+        market=batch.market,
+    )
+
+
+def select_cheapest(offers: Iterable[Offer], k: int) -> List[Offer]:
+    """
+    The k cheapest distinct offers of a stream, cheapest first, without materializing it.
+    """
+    top = TopOffers(k)
+    top.add_all(offers)
+    return top.offers()
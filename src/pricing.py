@@ -0,0 +1,344 @@
+import datetime
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from . import configs
+from .currency import RATE_MATRIX, RateMatrix
+from .markup_rules import MarkupRuleIndex, load_markup_rules
+from .money import (
+    MARKUP_SCALE,
+    RATE_SCALE,
+    check_rounding,
+    divide_rounded,
+    from_minor_units,
+    multiply_rounded,
+    price_minor_units,
+    to_markup_units,
+    to_millionths,
+    to_minor_units
+)
+from .rate_calendar import RateCalendar, load_rate_calendar
+
+# Nights from the first up to the end (exclusive) priced with one markup
+MarkupPeriod = Tuple[datetime.date, datetime.date, float]
+
+
+@dataclass(frozen=True, eq=False)
+class PricingConfig:
+    """
+    Immutable copy of the pricing constants from src/configs.py (or a config snapshot),
+    with the exchange rates precomputed into a RateMatrix and the markup rules of
+    MARKUP_RULES_FILE loaded into an index. markup is the default when no rule matches.
+    rate_calendar holds the nightly rates of RATE_CALENDAR_FILE, if one is set.
+    Prices are computed in integer cents and rounded with rounding (see src/money.py).
+    """
+    rate_matrix: RateMatrix
+    hotel_price_currency: str
+    net_price: float
+    markup: float
+    hotel_code: int
+    price_step: float
+    markup_rules: Optional[MarkupRuleIndex] = None
+    rounding: str = configs.MONEY_ROUNDING
+    rate_calendar: Optional[RateCalendar] = None
+
+    def __post_init__(self) -> None:
+        check_rounding(self.rounding)
+
+    @classmethod
+    def from_configs(cls, values: Optional[Mapping[str, Any]] = None) -> "PricingConfig":
+        """
+        Builds the pricing constants from src/configs.py, or from values keyed by the
+        same setting names.
+        """
+        if values is None:
+            values, rate_matrix = vars(configs), RATE_MATRIX
+        else:
+            rate_matrix = RateMatrix(values["CONVERSION_RATES"], values["PIVOT_CURRENCY"])
+        return cls(
+            rate_matrix=rate_matrix,
+            hotel_price_currency=values["HOTEL_PRICE_CURRENCY"],
+            net_price=values["DEFAULT_NET_PRICE"],
+            markup=values["DEFAULT_MARKUP"],
+            hotel_code=values["SIMULATED_HOTEL_CODE"],
+            price_step=values["SIMULATED_PRICE_STEP"],
+            markup_rules=load_markup_rules(values["MARKUP_RULES_FILE"]) if values["MARKUP_RULES_FILE"] else None,
+            rounding=values["MONEY_ROUNDING"],
+            rate_calendar=load_rate_calendar(values["RATE_CALENDAR_FILE"]) if values["RATE_CALENDAR_FILE"] else None,
+        )
+
+    @cached_property
+    def net_price_minor(self) -> int:
+        return to_minor_units(self.net_price, self.rounding)
+
+    @cached_property
+    def price_step_units(self) -> int:
+        return to_millionths(self.price_step, self.rounding)
+
+    def markup_for(
+        self,
+        company_id: Optional[int],
+        market: Optional[str],
+        currency: Optional[str],
+        stay_start: datetime.date
+    ) -> float:
+        """
+        Effective markup of a request: the most specific matching rule, else the default.
+        """
+        if self.markup_rules is not None:
+            markup = self.markup_rules.markup_for(company_id, market, currency, stay_start)
+            if markup is not None:
+                return markup
+        return self.markup
+
+    def markup_periods(
+        self,
+        company_id: Optional[int],
+        market: Optional[str],
+        currency: Optional[str],
+        start: datetime.date,
+        end: datetime.date
+    ) -> Tuple[MarkupPeriod, ...]:
+        """
+        The stay's nights split into periods of one effective markup, each night's as
+        markup_for would give it for a stay starting that night.
+        """
+        if self.markup_rules is None:
+            return ((start, end, self.markup),)
+        periods: List[MarkupPeriod] = []
+        for first, last, markup in self.markup_rules.markup_periods(company_id, market, currency, start, end):
+            markup = self.markup if markup is None else markup
+            if periods and periods[-1][2] == markup:
+                periods[-1] = (periods[-1][0], last, markup)
+            else:
+                periods.append((first, last, markup))
+        return tuple(periods)
+
+
+DEFAULT_PRICING = PricingConfig.from_configs()
+
+
+@dataclass(frozen=True, eq=False)
+class OfferBatch:
+    """
+    Priced offers of one request held as parallel arrays (one element per offer).
+    Offers only become dicts in to_dicts(), at the edge of the pipeline.
+    """
+    hotel_codes: np.ndarray
+    net: np.ndarray
+    markup: np.ndarray
+    selling_price: np.ndarray
+    exchange_rate: np.ndarray
+    currency: str
+    selling_currency: str
+    market: str
+
+    def __len__(self) -> int:
+        return len(self.hotel_codes)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Returns the offers in the response format, with ids A#1, A#2, ...
+        """
+        currency = self.currency
+        selling_currency = self.selling_currency
+        market = self.market
+        return [
+            {
+                "id": f"A#{index}",
+                "hotelCodeSupplier": str(hotel_code),
+                "market": market,
+                "price": {
+                    "minimumSellingPrice": None,
+                    "currency": currency,
+                    "net": net,
+                    "selling_price": selling_price,
+                    "selling_currency": selling_currency,
+                    "markup": markup,
+                    "exchange_rate": exchange_rate
+                }
+            }
+            for index, (hotel_code, net, markup, selling_price, exchange_rate) in enumerate(zip(
+                self.hotel_codes.tolist(),
+                self.net.tolist(),
+                self.markup.tolist(),
+                self.selling_price.tolist(),
+                self.exchange_rate.tolist()
+            ), start=1)
+        ]
+
+
+def simulate_net_minor_units(count: int, pricing: Optional[PricingConfig] = None) -> np.ndarray:
+    """
+    Simulated supplier net prices in cents: DEFAULT_NET_PRICE, then SIMULATED_PRICE_STEP
+    dearer per offer.
+    """
+    pricing = pricing or DEFAULT_PRICING
+    steps = MARKUP_SCALE + pricing.price_step_units * np.arange(count, dtype=np.int64)
+    return divide_rounded(pricing.net_price_minor * steps, MARKUP_SCALE, pricing.rounding)
+
+
+def simulate_net_prices(count: int, pricing: Optional[PricingConfig] = None) -> np.ndarray:
+    """
+    Simulated supplier net prices, see simulate_net_minor_units.
+    """
+    return from_minor_units(simulate_net_minor_units(count, pricing))
+
+
+def price_offers(
+    request_currency: str,
+    market: str,
+    quota: int,
+    pricing: Optional[PricingConfig] = None,
+    markup: Optional[float] = None,
+    hotel_codes: Optional[np.ndarray] = None,
+    periods: Optional[Sequence[MarkupPeriod]] = None
+) -> OfferBatch:
+    """
+    Prices up to quota simulated offers in one pass over arrays: applies the markup to
+    the net prices and converts them to the request currency in integer cents, rounding
+    once (see src.money.price_minor_units).
+    markup is the request's effective markup (see PricingConfig.markup_for); by
+    default the pricing's default markup. hotel_codes are the candidate hotels (see
+    src.inventory), of which the first quota are priced; by default simulated codes.
+    With a rate calendar, periods (see PricingConfig.markup_periods) select nightly
+    pricing of the stay instead, see price_stays.
+    Unknown currencies are priced 1:1; raises ValueError for a pair without a rate.
+    """
+    pricing = pricing or DEFAULT_PRICING
+    if periods is not None and pricing.rate_calendar is not None:
+        return price_stays(request_currency, market, quota, periods, pricing, hotel_codes)
+    count = max(0, quota) if hotel_codes is None else min(max(0, quota), len(hotel_codes))
+    markup = pricing.markup if markup is None else markup
+    rate = _rate_units(pricing, request_currency)
+    markup_units = to_markup_units(markup, pricing.rounding)
+    if count <= configs.SCALAR_PRICING_MAX_OFFERS:
+        return _price_few_offers(request_currency, market, count, pricing, markup, markup_units, rate, hotel_codes)
+    net = simulate_net_minor_units(count, pricing)
+    selling_price = price_minor_units(net, markup_units, rate, pricing.rounding)
+
+    return OfferBatch(
+        hotel_codes=(
+            pricing.hotel_code + np.arange(count, dtype=np.int64) if hotel_codes is None
+            else hotel_codes[:count].astype(np.int64)
+        ),
+        net=from_minor_units(net),
+        markup=np.full(count, markup, dtype=np.float64),
+        selling_price=from_minor_units(selling_price),
+        exchange_rate=np.full(count, rate / RATE_SCALE),
+        currency=pricing.hotel_price_currency,
+        selling_currency=request_currency,
+        market=market,
+    )
+
+
+def _price_few_offers(
+    request_currency: str,
+    market: str,
+    count: int,
+    pricing: PricingConfig,
+    markup: float,
+    markup_units: int,
+    rate: int,
+    hotel_codes: Optional[np.ndarray]
+) -> OfferBatch:
+    # price_offers for a handful of offers: the same integer arithmetic on Python ints,
+    # as setting up the arrays costs more than pricing a few offers
+    net = [
+        divide_rounded(pricing.net_price_minor * (MARKUP_SCALE + pricing.price_step_units * index), MARKUP_SCALE,
+                       pricing.rounding)
+        for index in range(count)
+    ]
+    selling_price = [price_minor_units(amount, markup_units, rate, pricing.rounding) for amount in net]
+    return OfferBatch(
+        hotel_codes=np.array(
+            range(pricing.hotel_code, pricing.hotel_code + count) if hotel_codes is None else hotel_codes[:count],
+            dtype=np.int64
+        ),
+        net=np.array([from_minor_units(amount) for amount in net], dtype=np.float64),
+        markup=np.array([markup] * count, dtype=np.float64),
+        selling_price=np.array([from_minor_units(amount) for amount in selling_price], dtype=np.float64),
+        exchange_rate=np.array([rate / RATE_SCALE] * count, dtype=np.float64),
+        currency=pricing.hotel_price_currency,
+        selling_currency=request_currency,
+        market=market,
+    )
+
+
+def price_stays(
+    request_currency: str,
+    market: str,
+    quota: int,
+    periods: Sequence[MarkupPeriod],
+    pricing: Optional[PricingConfig] = None,
+    hotel_codes: Optional[np.ndarray] = None
+) -> OfferBatch:
+    """
+    Prices the stay covered by periods at every candidate hotel of the rate calendar
+    (hotel_codes, by default all of its hotels) and returns the quota cheapest, cheapest
+    first. Hotels without a rate for every night are left out. Each period's net is a
+    difference of the calendar's prefix sums, so the cost per hotel depends on the
+    number of markup periods, not on the length of the stay; the marked-up periods are
+    summed exactly and rounded once. Each offer's markup is the stay's effective
+    markup, its periods' markups weighted by their net.
+    """
+    pricing = pricing or DEFAULT_PRICING
+    calendar = pricing.rate_calendar
+    if hotel_codes is None:
+        codes, rows, known = calendar.hotel_codes, np.arange(len(calendar)), np.ones(len(calendar), dtype=bool)
+    else:
+        codes = np.asarray(hotel_codes, dtype=np.int64)
+        rows, known = calendar.rows_for(codes)
+    if periods:
+        known &= calendar.available(rows, periods[0][0], periods[-1][1])
+    else:
+        known[:] = False
+    rows, codes = rows[known], codes[known]
+
+    net = np.zeros(len(rows), dtype=np.int64)
+    marked_up = np.zeros(len(rows), dtype=np.int64)
+    for first, end, markup in periods:
+        period_net = calendar.net_between(rows, first, end)
+        net += period_net
+        marked_up += period_net * (MARKUP_SCALE + to_markup_units(markup, pricing.rounding))
+    rate = _rate_units(pricing, request_currency)
+    selling_price = multiply_rounded(marked_up, rate, MARKUP_SCALE * RATE_SCALE, pricing.rounding)
+
+    cheapest = _cheapest(selling_price, max(0, quota))
+    net, marked_up = net[cheapest], marked_up[cheapest]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        markup = np.where(
+            net > 0, (marked_up - net * MARKUP_SCALE) / net / (MARKUP_SCALE // 100), periods[0][2] if periods else 0.0
+        )
+    return OfferBatch(
+        hotel_codes=codes[cheapest],
+        net=from_minor_units(net),
+        markup=np.round(markup, 4),
+        selling_price=from_minor_units(selling_price[cheapest]),
+        exchange_rate=np.full(len(cheapest), rate / RATE_SCALE),
+        currency=pricing.hotel_price_currency,
+        selling_currency=request_currency,
+        market=market,
+    )
+
+
+def _cheapest(prices: np.ndarray, count: int) -> np.ndarray:
+    """
+    Indices of the count lowest prices, lowest first and in index order among equals.
+    Only the prices up to the count-th lowest are sorted.
+    """
+    if count >= len(prices):
+        return np.argsort(prices, kind="stable")
+    if count == 0:
+        return np.zeros(0, dtype=np.intp)
+    threshold = np.partition(prices, count - 1)[count - 1]
+    candidates = np.flatnonzero(prices <= threshold)
+    return candidates[np.argsort(prices[candidates], kind="stable")][:count]
+
+
+def _rate_units(pricing: PricingConfig, request_currency: str) -> int:
+    rate_matrix = pricing.rate_matrix
+    if request_currency in rate_matrix.ids and pricing.hotel_price_currency in rate_matrix.ids:
+        return rate_matrix.rate_units(pricing.hotel_price_currency, request_currency)
+    return RATE_SCALE
@@ -0,0 +1,121 @@
+import csv
+import datetime
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+import numpy as np
+from .money import to_minor_units
+
+# Columns of a rate calendar file; dates are ISO and inclusive
+CALENDAR_FIELDS = ("hotel_code", "start_date", "end_date", "net")
+
+
+@dataclass(frozen=True)
+class NightlyRate:
+    """
+    Net price per night of a hotel for the nights from start to end (inclusive).
+    """
+    hotel_code: int
+    start: datetime.date
+    end: datetime.date
+    net: float
+
+
+class RateCalendar:
+    """
+    Nightly net rates of every hotel as a dense, date-indexed array: one row per hotel
+    (sorted by hotel code) and one column per day from first_day, in integer cents.
+    Each row is stored as prefix sums, together with a prefix count of nights without
+    a rate, so the net of any stay is two lookups per hotel whatever its length.
+    Where ranges of one hotel overlap the rate listed last wins.
+    """
+
+    def __init__(self, rates: Iterable[NightlyRate]) -> None:
+        rates = list(rates)
+        self.hotel_codes = np.unique(np.array([rate.hotel_code for rate in rates], dtype=np.int64))
+        self.first_day = min((rate.start.toordinal() for rate in rates), default=0)
+        self.days = max((rate.end.toordinal() + 1 for rate in rates), default=0) - self.first_day
+
+        nightly = np.zeros((len(self.hotel_codes), self.days), dtype=np.int64)
+        rated = np.zeros((len(self.hotel_codes), self.days), dtype=bool)
+        rows = np.searchsorted(self.hotel_codes, [rate.hotel_code for rate in rates])
+        for row, rate in zip(rows.tolist(), rates):
+            first, last = rate.start.toordinal() - self.first_day, rate.end.toordinal() + 1 - self.first_day
+            nightly[row, first:last] = to_minor_units(rate.net)
+            rated[row, first:last] = True
+
+        self._net = np.zeros((len(self.hotel_codes), self.days + 1), dtype=np.int64)
+        np.cumsum(nightly, axis=1, out=self._net[:, 1:])
+        self._closed = np.zeros((len(self.hotel_codes), self.days + 1), dtype=np.int32)
+        np.cumsum(~rated, axis=1, out=self._closed[:, 1:])
+
+    def __len__(self) -> int:
+        return len(self.hotel_codes)
+
+    def rows_for(self, hotel_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calendar rows of the given hotel codes and a mask of the codes it has rates for.
+        """
+        hotel_codes = np.asarray(hotel_codes, dtype=np.int64)
+        if not len(self.hotel_codes):
+            return np.zeros(len(hotel_codes), dtype=np.intp), np.zeros(len(hotel_codes), dtype=bool)
+        rows = np.minimum(np.searchsorted(self.hotel_codes, hotel_codes), len(self.hotel_codes) - 1)
+        return rows, self.hotel_codes[rows] == hotel_codes
+
+    def _columns(self, start: datetime.date, end: datetime.date) -> Tuple[int, int]:
+        return start.toordinal() - self.first_day, end.toordinal() - self.first_day
+
+    def available(self, rows: np.ndarray, start: datetime.date, end: datetime.date) -> np.ndarray:
+        """
+        Whether each hotel row has a rate for every night from start up to end.
+        """
+        first, last = self._columns(start, end)
+        if first < 0 or last > self.days or first >= last:
+            return np.zeros(len(rows), dtype=bool)
+        return self._closed[rows, last] == self._closed[rows, first]
+
+    def net_between(self, rows: np.ndarray, start: datetime.date, end: datetime.date) -> np.ndarray:
+        """
+        Net in cents of the nights from start up to end for each hotel row; nights
+        outside the calendar or without a rate count as 0 (see available).
+        """
+        first, last = self._columns(start, end)
+        first, last = min(max(first, 0), self.days), min(max(last, 0), self.days)
+        return self._net[rows, last] - self._net[rows, first]
+
+
+def _rate_from_row(row, columns) -> NightlyRate:
+    hotel_code, start, end, net = (row[column].strip() for column in columns)
+    rate = NightlyRate(
+        hotel_code=int(hotel_code),
+        start=datetime.date.fromisoformat(start),
+        end=datetime.date.fromisoformat(end),
+        net=float(net),
+    )
+    if rate.start > rate.end:
+        raise ValueError("start_date is after end_date")
+    if rate.net < 0:
+        raise ValueError("net is negative")
+    return rate
+
+
+def load_rate_calendar(path: str) -> RateCalendar:
+    """
+    Loads a CSV file with the CALENDAR_FIELDS header into a RateCalendar.
+    Raises ValueError naming the first invalid line, and OSError if the file cannot be read.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        missing = [name for name in CALENDAR_FIELDS if name not in header]
+        if missing:
+            raise ValueError(f"Rate calendar file is missing columns: {', '.join(missing)}")
+        columns = [header.index(name) for name in CALENDAR_FIELDS]
+        rates = []
+        for row in reader:
+            if not row:
+                continue
+            try:
+                rates.append(_rate_from_row(row, columns))
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"Invalid nightly rate on line {reader.line_num}: {e}")
+    return RateCalendar(rates)
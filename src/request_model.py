@@ -0,0 +1,67 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class Room:
+    """
+    Passenger ages of one <Paxes> block, packed one byte per pax.
+    Ages are parsed with int() as they are added and clamped to 0..255, which keeps
+    the child (<= 5) / adult split; invalid_age records an age that is not an integer.
+    """
+    __slots__ = ("ages", "invalid_age")
+
+    def __init__(self, ages: Iterable[str] = ()) -> None:
+        self.ages = array("B")
+        self.invalid_age = False
+        for age in ages:
+            self.add(age)
+
+    def add(self, age: str) -> None:
+        """
+        Appends the raw age attribute of one <Pax>.
+        """
+        try:
+            value = int(age)
+        except ValueError:
+            self.invalid_age = True
+            value = 0
+        self.ages.append(0 if value < 0 else 255 if value > 255 else value)
+
+    def __len__(self) -> int:
+        return len(self.ages)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ages)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Room):
+            return NotImplemented
+        return self.ages == other.ages and self.invalid_age == other.invalid_age
+
+    def __repr__(self) -> str:
+        invalid = ", invalid_age=True" if self.invalid_age else ""
+        return f"Room({self.ages.tolist()}{invalid})"
+
+
+@dataclass(slots=True)
+class AvailRequest:
+    """
+    Raw fields of an AvailRQ document, filled by a single pass over the XML.
+    Text fields hold the element text as written (None when the element is absent,
+    "" when it is present but empty); validation happens in the validators.
+    """
+    timeout: Optional[str] = None
+    language_code: Optional[str] = None
+    options_quota: Optional[str] = None
+    parameters: Optional[Dict[str, str]] = None
+    search_type: Optional[str] = None
+    destination_count: Optional[int] = None
+    # Code of each <AvailDestinations> child (its code attribute, else its text)
+    destination_codes: List[str] = field(default_factory=list)
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    currency: Optional[str] = None
+    nationality: Optional[str] = None
+    # One Room per <Paxes> block, in document order
+    rooms: List[Room] = field(default_factory=list)
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from .config_snapshot import config_version
+from .configs import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_TTL
+from .request_model import AvailRequest
+
+
+def request_fingerprint(request: AvailRequest, validated: Dict[str, Any]) -> Hashable:
+    """
+    Canonical key of a validated request: only the fields that drive the offer stage
+    (currency, market, dates, rooms, destinations and quota), so requests that differ in whitespace,
+    namespaces, attribute order or credentials share an entry. Pax order within a room
+    does not matter.
+    """
+    start_date, end_date = validated["validate_dates"]
+    return (
+        validated["extract_currency"],
+        validated["extract_nationality_and_market"],
+        start_date,
+        end_date,
+        tuple(tuple(sorted(room.ages)) for room in request.rooms),
+        tuple(request.destination_codes),
+        validated["validate_options_quota"],
+    )
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of encoded responses, bounded by entry count and total bytes,
+    with a TTL per entry. Everything is dropped when the config token (by default the
+    config snapshot version) changes.
+    Counts hits, misses, evictions (capacity), expirations (TTL) and invalidations.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        ttl: float = RESPONSE_CACHE_TTL,
+        config_token: Callable[[], Hashable] = config_version,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._config_token = config_token
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, float]]" = OrderedDict()
+        self._token = config_token()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _check_token(self) -> None:
+        # Called with the lock held
+        token = self._config_token()
+        if token != self._token:
+            self._token = token
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """
+        Returns the cached response for key, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._check_token()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self._bytes -= len(value)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        """
+        Stores value under key, evicting least recently used entries to stay within bounds.
+        Values larger than max_bytes are not stored.
+        """
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._check_token()
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[key] = (value, self._clock() + self.ttl)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+# Process-wide cache used by process_request
+RESPONSE_CACHE = ResponseCache()
@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import List, Optional, Sequence
+import numpy as np
+from .request_model import AvailRequest
+from .validators import DEFAULT_RULES, ValidationRules
+
+# Error codes of validate_rooms_columnar, one per message of validate_rooms_and_passengers
+ROOM_OK = 0
+ROOM_COUNT_EXCEEDED = 1
+ROOM_GUESTS_EXCEEDED = 2
+ROOM_INVALID_AGE = 3
+ROOM_CHILDREN_EXCEEDED = 4
+ROOM_ADULT_REQUIRED = 5
+
+ROOM_ERROR_MESSAGES = {
+    ROOM_COUNT_EXCEEDED: "Exceeded maximum allowed room count.",
+    ROOM_GUESTS_EXCEEDED: "Exceeded maximum allowed guests per room.",
+    ROOM_INVALID_AGE: "Invalid age value in Pax element.",
+    ROOM_CHILDREN_EXCEEDED: "Exceeded maximum children per room.",
+    ROOM_ADULT_REQUIRED: "Each room with children must have at least one adult.",
+}
+
+
+@dataclass(frozen=True, eq=False)
+class RoomColumns:
+    """
+    Rooms and passengers of a batch of requests as flat arrays: every pax age of the
+    batch in one uint8 array, per room its pax count and invalid-age flag, and per
+    request its room count. Rooms are in request order, then document order.
+    """
+    ages: np.ndarray
+    room_sizes: np.ndarray
+    room_invalid: np.ndarray
+    request_rooms: np.ndarray
+
+    @classmethod
+    def from_requests(cls, requests: Sequence[AvailRequest]) -> "RoomColumns":
+        rooms = [room for request in requests for room in request.rooms]
+        room_ages = list(map(attrgetter("ages"), rooms))
+        return cls(
+            # Room ages are already packed, so joining them is a copy, not a per-pax loop
+            ages=np.frombuffer(b"".join(room_ages), dtype=np.uint8),
+            room_sizes=np.fromiter(map(len, room_ages), dtype=np.int64, count=len(rooms)),
+            room_invalid=np.fromiter(map(attrgetter("invalid_age"), rooms), dtype=np.bool_, count=len(rooms)),
+            request_rooms=np.fromiter(map(len, map(attrgetter("rooms"), requests)), dtype=np.int64, count=len(requests)),
+        )
+
+    @property
+    def room_request(self) -> np.ndarray:
+        """
+        Request index of every room.
+        """
+        return np.repeat(np.arange(len(self.request_rooms)), self.request_rooms)
+
+
+def _segment_sums(values: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    # Sums of consecutive segments of the given sizes; empty segments sum to 0
+    totals = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(values, out=totals[1:])
+    ends = np.cumsum(sizes)
+    return totals[ends] - totals[ends - sizes]
+
+
+def validate_rooms_columnar(columns: RoomColumns, rules: Optional[ValidationRules] = None) -> np.ndarray:
+    """
+    Evaluates the room and passenger rules of validate_rooms_and_passengers for a whole
+    batch at once and returns one error code per request (ROOM_OK when it passes).
+    The code is the one for the message the scalar validator raises: the room count
+    first, then the first failing room, where guests, invalid ages, children and the
+    adult requirement are checked in that order.
+    """
+    rules = rules or DEFAULT_RULES
+    room_sizes = columns.room_sizes
+    children = _segment_sums(columns.ages <= 5, room_sizes)
+
+    # Later assignments take precedence, so the rules go from last checked to first
+    room_codes = np.zeros(len(room_sizes), dtype=np.int8)
+    room_codes[(children > 0) & (children == room_sizes)] = ROOM_ADULT_REQUIRED
+    room_codes[children > rules.allowed_child_count_per_room] = ROOM_CHILDREN_EXCEEDED
+    room_codes[columns.room_invalid] = ROOM_INVALID_AGE
+    room_codes[room_sizes > rules.allowed_room_guest_count] = ROOM_GUESTS_EXCEEDED
+
+    codes = np.zeros(len(columns.request_rooms), dtype=np.int8)
+    failing = np.flatnonzero(room_codes)
+    if failing.size:
+        # Rooms are grouped by request, so a request's first failing room starts its run
+        failing_requests = columns.room_request[failing]
+        first = np.empty(failing.size, dtype=np.bool_)
+        first[0] = True
+        np.not_equal(failing_requests[1:], failing_requests[:-1], out=first[1:])
+        codes[failing_requests[first]] = room_codes[failing[first]]
+    codes[columns.request_rooms > rules.allowed_room_count] = ROOM_COUNT_EXCEEDED
+    return codes
+
+
+def room_errors(requests: Sequence[AvailRequest], rules: Optional[ValidationRules] = None) -> List[Optional[str]]:
+    """
+    Returns, per request, the message validate_rooms_and_passengers would raise, or None.
+    """
+    codes = validate_rooms_columnar(RoomColumns.from_requests(requests), rules)
+    return [ROOM_ERROR_MESSAGES.get(code) for code in codes.tolist()]
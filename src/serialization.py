@@ -0,0 +1,150 @@
+import json
+from functools import lru_cache
+from typing import Any, Iterator, List, Optional, Union
+from .configs import JSON_WRITE_BUFFER_SIZE
+from .pricing import OfferBatch
+
+# Compact wire format, identical to json.dumps(obj, separators=(",", ":"))
+COMPACT_SEPARATORS = (",", ":")
+# Offers converted from the arrays at a time while encoding
+OFFER_BLOCK_SIZE = 1024
+
+
+@lru_cache(maxsize=256)
+def _offer_fragments(currency: str, selling_currency: str, market: str) -> tuple:
+    """
+    Pre-encoded static pieces of a compact offer object, between the per-offer values.
+    """
+    return (
+        b'","market":' + json.dumps(market).encode() + b',"price":{"minimumSellingPrice":null,"currency":'
+        + json.dumps(currency).encode() + b',"net":',
+        b',"selling_price":',
+        b',"selling_currency":' + json.dumps(selling_currency).encode() + b',"markup":',
+        b',"exchange_rate":',
+    )
+
+
+def _offer_objects(offers: OfferBatch) -> Iterator[bytes]:
+    """
+    Yields the compact JSON object of each offer, in order. The arrays are converted
+    to Python values OFFER_BLOCK_SIZE offers at a time.
+    """
+    market_and_net, selling_price_key, currency_and_markup, exchange_rate_key = _offer_fragments(
+        offers.currency, offers.selling_currency, offers.market
+    )
+    for start in range(0, len(offers), OFFER_BLOCK_SIZE):
+        block = slice(start, start + OFFER_BLOCK_SIZE)
+        # %r of a float is its repr, which is what the json encoder writes for finite floats
+        yield from (
+            b'{"id":"A#%d","hotelCodeSupplier":"%d%b%r%b%r%b%r%b%r}}' % (
+                index, hotel_code, market_and_net, net, selling_price_key, selling_price,
+                currency_and_markup, markup, exchange_rate_key, exchange_rate
+            )
+            for index, (hotel_code, net, selling_price, markup, exchange_rate) in enumerate(zip(
+                offers.hotel_codes[block].tolist(),
+                offers.net[block].tolist(),
+                offers.selling_price[block].tolist(),
+                offers.markup[block].tolist(),
+                offers.exchange_rate[block].tolist()
+            ), start=start + 1)
+        )
+
+
+def encode_offers(offers: OfferBatch) -> bytes:
+    """
+    Encodes the offers straight from their arrays into the compact wire format.
+    The bytes are identical to json.dumps(offers.to_dicts(), separators=(",", ":")).
+    """
+    if not len(offers):
+        return b"[]"
+    return b"[" + b",".join(_offer_objects(offers)) + b"]"
+
+
+def iter_offers_json(offers: OfferBatch) -> Iterator[bytes]:
+    """
+    Yields the compact wire format one offer at a time: "[" and the first offer, then
+    "," and each further offer, then "]". The pieces join to encode_offers(offers).
+    """
+    if not len(offers):
+        yield b"[]"
+        return
+    separator = b"["
+    for offer in _offer_objects(offers):
+        yield separator + offer
+        separator = b","
+    yield b"]"
+
+
+def encode_offers_pretty(offers: OfferBatch) -> bytes:
+    """
+    Encodes the offers as indented JSON, for the command line.
+    """
+    return json.dumps(offers.to_dicts(), indent=2).encode()
+
+
+@lru_cache(maxsize=1024)
+def encode_error(message: str, pretty: bool = False) -> bytes:
+    """
+    Encodes {"error": message}; the fixed validation messages are cached pre-encoded.
+    pretty keeps the historical json.dumps default spacing.
+    """
+    if pretty:
+        return json.dumps({"error": message}).encode()
+    return json.dumps({"error": message}, separators=COMPACT_SEPARATORS).encode()
+
+
+def encode_timeout_error(stage: str, timeout_ms: int, pretty: bool = False) -> bytes:
+    """
+    Encodes the structured error returned when a request runs out of its deadline.
+    """
+    error = {"error": "Request deadline exceeded.", "stage": stage, "timeoutMilliseconds": timeout_ms}
+    if pretty:
+        return json.dumps(error).encode()
+    return json.dumps(error, separators=COMPACT_SEPARATORS).encode()
+
+
+def write_bytes(payload: bytes, out: Any) -> int:
+    """
+    Writes payload into a bytearray, a socket (sendall) or any binary writer (write).
+    Returns the number of bytes written.
+    """
+    if isinstance(out, bytearray):
+        out += payload
+    elif hasattr(out, "sendall"):
+        out.sendall(payload)
+    else:
+        out.write(payload)
+    return len(payload)
+
+
+def write_offers(
+    offers: OfferBatch,
+    out: Union[bytearray, Any],
+    buffer_size: int = JSON_WRITE_BUFFER_SIZE,
+    pieces: Optional[List[bytes]] = None
+) -> int:
+    """
+    Streams the offers in the compact wire format into out as they are encoded,
+    writing whenever buffer_size bytes are pending (0 writes every offer). Neither
+    the whole array nor the whole string is held at once, and the first bytes go
+    out before the last offer is encoded. Returns the number of bytes written.
+    With pieces, every written piece is also appended to it (b"".join(pieces) is then
+    the whole response).
+    """
+    pending = bytearray()
+    written = 0
+    for part in iter_offers_json(offers):
+        pending += part
+        if len(pending) >= buffer_size:
+            # bytes(): a writer may keep the buffer it was handed
+            piece = bytes(pending)
+            written += write_bytes(piece, out)
+            if pieces is not None:
+                pieces.append(piece)
+            pending.clear()
+    if pending:
+        piece = bytes(pending)
+        written += write_bytes(piece, out)
+        if pieces is not None:
+            pieces.append(piece)
+    return written
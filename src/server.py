@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from typing import Dict, Optional, Sequence, Set, Tuple, Union
+from .batch import warm_worker
+from .config_snapshot import ConfigReloader, ConfigSnapshot
+from .configs import (
+    DEFAULT_PARSER,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_MAX_IN_FLIGHT,
+    SERVER_KEEP_ALIVE_TIMEOUT,
+    SERVER_MAX_BODY_BYTES,
+    SERVER_FEED_MIN_BYTES,
+    SERVER_FEED_WAIT,
+    SERVER_READ_SIZE,
+    STUB_SUPPLIER_MEDIAN_MS,
+    STUB_SUPPLIER_SIGMA,
+    STUB_SUPPLIER_TAIL_PROBABILITY,
+    STUB_SUPPLIER_TAIL_MS
+)
+from .feed import RequestFeed
+from .main import process_request_bytes
+from .request_model import AvailRequest
+from .singleflight import AsyncSingleFlight
+from .suppliers import LatencyProfile, SupplierAdapter, stub_suppliers
+
+AVAIL_PATHS = ("/", "/avail")
+
+
+class _BadRequest(Exception):
+    """
+    Raised while reading a request that cannot be answered on this connection.
+    """
+
+    def __init__(self, status: HTTPStatus) -> None:
+        super().__init__(status.phrase)
+        self.status = status
+
+
+def _encode_head(status: HTTPStatus, framing: str, keep_alive: bool, content_type: str) -> bytes:
+    return (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"{framing}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode("latin-1")
+
+
+def _encode_response(status: HTTPStatus, body: bytes, keep_alive: bool, content_type: str = "application/json") -> bytes:
+    return _encode_head(status, f"Content-Length: {len(body)}", keep_alive, content_type) + body
+
+
+def _encode_chunk(data: bytes) -> bytes:
+    return f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n"
+
+
+class _StreamedResponse:
+    """
+    Binary writer that process_request_bytes writes a freshly priced response into
+    from an executor thread (see its out argument). The first write is held back; from
+    the second on, the head and the pieces go out on the event loop as a chunked
+    HTTP/1.1 response. A response that arrives in a single write is left to the caller
+    to send whole, with a Content-Length.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        self._loop = loop
+        self._writer = writer
+        self._keep_alive = keep_alive
+        self._held: Optional[bytes] = None
+        self.started = False
+
+    def write(self, payload: bytes) -> int:
+        if not self.started:
+            if self._held is None:
+                self._held = payload
+                return len(payload)
+            self.started = True
+            head = _encode_head(HTTPStatus.OK, "Transfer-Encoding: chunked", self._keep_alive, "application/json")
+            self._send(head + _encode_chunk(self._held))
+            self._held = None
+        self._send(_encode_chunk(payload))
+        return len(payload)
+
+    def _send(self, data: bytes) -> None:
+        # Writes reach the loop in call order, before the executor's result does
+        self._loop.call_soon_threadsafe(self._writer.write, data)
+
+    def finish(self) -> None:
+        """
+        Ends a started response; called on the event loop.
+        """
+        self._writer.write(b"0\r\n\r\n")
+
+
+class AvailServer:
+    """
+    Minimal HTTP/1.1 front end for process_request_bytes built on asyncio streams.
+    POST the AvailRQ XML to / or /avail; the JSON response is returned with status 200,
+    including business errors. Connections are kept alive unless the client asks otherwise.
+    With the expat parser the body is parsed chunk by chunk while it arrives (see
+    src.feed), and a request that is already known to be rejected is answered without
+    reading the rest; the connection is then closed. Parsing and validation never run
+    on the event loop: the feed runs in the executor (in the loop's default thread pool
+    with a process pool, which cannot hold the parser state), one step per
+    SERVER_FEED_MIN_BYTES of body at least; smaller reads are coalesced unless the
+    client goes quiet for SERVER_FEED_WAIT seconds. The last bytes and the end of the
+    document are fed in one step. Feed steps and the validation and pricing of
+    complete requests run in the executor, at most max_in_flight at once.
+    The request deadline starts when the request has been read, so time spent waiting
+    for a slot counts.
+    A freshly priced response that spans more than one write of the streaming writer
+    (see write_offers) is sent as it is encoded, with chunked transfer encoding, when
+    the executor is a thread pool.
+    Identical request bodies arriving while one is being processed share its response
+    instead of taking another slot. With suppliers, offers come from a fan-out to those
+    adapters (see process_request_bytes) and every request is processed on its own.
+    """
+
+    def __init__(
+        self,
+        host: str = SERVER_HOST,
+        port: int = SERVER_PORT,
+        max_in_flight: int = SERVER_MAX_IN_FLIGHT,
+        executor: Optional[Executor] = None,
+        parser: str = DEFAULT_PARSER,
+        keep_alive_timeout: float = SERVER_KEEP_ALIVE_TIMEOUT,
+        max_body_bytes: int = SERVER_MAX_BODY_BYTES,
+        suppliers: Optional[Sequence[SupplierAdapter]] = None
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.max_in_flight = max_in_flight
+        self.parser = parser
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_body_bytes = max_body_bytes
+        self.suppliers = suppliers
+        self._executor = executor
+        self._owns_executor = executor is None
+        # Process workers keep their own config snapshot (see warm_worker); snapshots
+        # hold mapped files and are not sent across processes
+        self._share_snapshot = not isinstance(executor, ProcessPoolExecutor)
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.Server] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._flights = AsyncSingleFlight()
+
+    async def start(self) -> None:
+        """
+        Binds the listening socket. With port 0 the chosen port is stored in self.port.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stops listening and closes every open connection.
+        """
+        if self._server is not None:
+            self._server.close()
+            for task in self._connections:
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str], int]]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keep_alive_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise _BadRequest(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST)
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise _BadRequest(HTTPStatus.NOT_IMPLEMENTED)
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST)
+        if length < 0:
+            raise _BadRequest(HTTPStatus.BAD_REQUEST)
+        if length > self.max_body_bytes:
+            raise _BadRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        return method, path, version, headers, length
+
+    async def _read_body(
+        self,
+        reader: asyncio.StreamReader,
+        length: int,
+        feed: Optional[RequestFeed] = None
+    ) -> Tuple[Optional[bytes], bool]:
+        """
+        Reads length body bytes, handing them to feed in steps of SERVER_FEED_MIN_BYTES
+        or more, or of whatever arrived before the client went quiet for
+        SERVER_FEED_WAIT seconds. The bytes after the last step are left for the closing
+        step (feed.size tells how many were fed). Returns (body, complete): body is None
+        if the client went away, complete is False when feed rejected the request
+        before the whole body was read.
+        """
+        body = bytearray()
+        while len(body) < length:
+            read = reader.read(min(length - len(body), SERVER_READ_SIZE))
+            if feed is None or len(body) == feed.size:
+                chunk = await read
+            else:
+                try:
+                    chunk = await asyncio.wait_for(read, SERVER_FEED_WAIT)
+                except asyncio.TimeoutError:
+                    # Nothing more for now: parse what did arrive, it may already be rejected
+                    if await self._feed(feed, bytes(body[feed.size:])) is not None:
+                        return bytes(body), False
+                    continue
+            if not chunk:
+                return None, False
+            body += chunk
+            if feed is not None and len(body) < length and len(body) - feed.size >= SERVER_FEED_MIN_BYTES:
+                if await self._feed(feed, bytes(body[feed.size:])) is not None:
+                    return bytes(body), False
+        return bytes(body), True
+
+    async def _feed(self, feed: RequestFeed, chunk: bytes, close: bool = False) -> Optional[bytes]:
+        """
+        Hands chunk to feed, and then closes it when close is set, in one executor step
+        off the event loop that holds an in-flight slot.
+        Returns the encoded error response once the request is known to be rejected.
+        """
+        def step() -> Optional[bytes]:
+            error = feed.feed(chunk) if chunk else None
+            return feed.close() if close else error
+
+        executor = self._executor if self._share_snapshot else None
+        async with self._in_flight:
+            return await asyncio.get_running_loop().run_in_executor(executor, step)
+
+    async def _process(
+        self,
+        request: Union[bytes, AvailRequest],
+        received_at: float,
+        snapshot: Optional[ConfigSnapshot] = None,
+        out: Optional[_StreamedResponse] = None
+    ) -> bytes:
+        async with self._in_flight:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                partial(
+                    process_request_bytes, request, self.parser, received_at, snapshot=snapshot,
+                    suppliers=self.suppliers, out=out
+                )
+            )
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except _BadRequest as e:
+                    writer.write(_encode_response(e.status, e.status.phrase.encode(), False, "text/plain"))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, version, headers, length = request
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                avail = path in AVAIL_PATHS and method == "POST"
+                feed = RequestFeed() if avail and self.parser == "expat" else None
+                body, complete = await self._read_body(reader, length, feed)
+                if body is None:
+                    break
+                received_at = time.monotonic()
+
+                if path not in AVAIL_PATHS:
+                    status, payload, content_type = HTTPStatus.NOT_FOUND, b"Not Found", "text/plain"
+                elif method != "POST":
+                    status, payload, content_type = HTTPStatus.METHOD_NOT_ALLOWED, b"Method Not Allowed", "text/plain"
+                else:
+                    status, content_type = HTTPStatus.OK, "application/json"
+                    payload = await self._feed(feed, body[feed.size:], close=True) if feed is not None else None
+                    # The unread rest of a rejected body cannot be skipped reliably
+                    keep_alive = keep_alive and complete
+                    if payload is None:
+                        # A process pool cannot write to the connection
+                        stream = None
+                        if self._share_snapshot and version == "HTTP/1.1":
+                            stream = _StreamedResponse(asyncio.get_running_loop(), writer, keep_alive)
+                        if feed is not None:
+                            snapshot = feed.snapshot if self._share_snapshot else None
+                            process = partial(self._process, feed.request, received_at, snapshot, stream)
+                        else:
+                            process = partial(self._process, body, received_at, None, stream)
+                        if self.suppliers is None:
+                            payload, _ = await self._flights.do(body, process)
+                        else:
+                            # Live supplier answers are not shared between requests
+                            payload = await process()
+                        if stream is not None and stream.started:
+                            stream.finish()
+                            payload = None
+
+                if payload is not None:
+                    writer.write(_encode_response(status, payload, keep_alive, content_type))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancellation only comes from close(); end the connection quietly
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Runs the AvailRQ HTTP server until interrupted.
+    """
+    arg_parser = argparse.ArgumentParser(prog="python -m src.server", description=main.__doc__)
+    arg_parser.add_argument("--host", default=SERVER_HOST)
+    arg_parser.add_argument("--port", type=int, default=SERVER_PORT)
+    arg_parser.add_argument("--max-in-flight", type=int, default=SERVER_MAX_IN_FLIGHT)
+    arg_parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    arg_parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    arg_parser.add_argument("--parser", choices=("expat", "etree"), default=DEFAULT_PARSER)
+    arg_parser.add_argument("--config", help="JSON settings file, reloaded whenever it changes")
+    arg_parser.add_argument("--stub-suppliers", type=int, default=0, help="fan out to N local stub suppliers")
+    arg_parser.add_argument("--stub-latency-ms", type=float, default=STUB_SUPPLIER_MEDIAN_MS)
+    args = arg_parser.parse_args(argv)
+
+    if args.config is not None:
+        reloader = ConfigReloader(args.config)
+        reloader.start()
+        if reloader.last_error is not None:
+            arg_parser.error(f"cannot load {args.config}: {reloader.last_error}")
+    executor = None
+    if args.executor == "process":
+        # Every worker watches the file itself; snapshots are per process
+        executor = ProcessPoolExecutor(
+            max_workers=args.workers, initializer=warm_worker, initargs=(args.config, True)
+        )
+    suppliers = None
+    if args.stub_suppliers:
+        latency = LatencyProfile(args.stub_latency_ms, STUB_SUPPLIER_SIGMA, STUB_SUPPLIER_TAIL_PROBABILITY, STUB_SUPPLIER_TAIL_MS)
+        suppliers = stub_suppliers(args.stub_suppliers, latency)
+    server = AvailServer(args.host, args.port, args.max_in_flight, executor, args.parser, suppliers=suppliers)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import re
+from typing import BinaryIO, Iterator, Optional
+from .batch import process_requests
+from .configs import (
+    DEFAULT_BATCH_CHUNKSIZE,
+    DEFAULT_PARSER,
+    MAX_REQUEST_BYTES,
+    MAX_STREAM_DOCUMENT_BYTES,
+    STREAM_READ_SIZE,
+    STREAM_ROOT_TAG
+)
+from .main import write_response
+
+
+def iter_documents(
+    stream: BinaryIO,
+    root_tag: str = STREAM_ROOT_TAG,
+    read_size: int = STREAM_READ_SIZE,
+    max_document_bytes: int = MAX_STREAM_DOCUMENT_BYTES
+) -> Iterator[bytes]:
+    """
+    Splits a byte stream of concatenated or newline-delimited XML documents on the
+    closing tag of root_tag (or a self-closing root) and yields one document at a time.
+    Only the current document is buffered. A document longer than max_document_bytes
+    is yielded truncated, so it fails XML parsing, and the rest of it is skipped.
+    Trailing bytes without a closing tag are yielded as a final document. While the
+    rest of an oversized document is skipped, at most min(max_document_bytes,
+    MAX_REQUEST_BYTES) bytes of it are held, for a closing tag split across reads.
+    """
+    tag = re.escape(root_tag.encode())
+    document_end = re.compile(rb"</" + tag + rb"\s*>|<" + tag + rb"(?:\s[^<>]*)?/>")
+    max_partial_tag = min(max_document_bytes, MAX_REQUEST_BYTES)
+    buffer = bytearray()
+    scan_from = 0
+    skipping = False
+
+    while True:
+        chunk = stream.read(read_size)
+        if not chunk:
+            break
+        buffer += chunk
+
+        while True:
+            match = document_end.search(buffer, scan_from)
+            if match is None:
+                break
+            if not skipping:
+                yield bytes(buffer[:match.end()]).strip()
+            skipping = False
+            del buffer[:match.end()]
+            scan_from = 0
+
+        if len(buffer) > max_document_bytes and not skipping:
+            yield bytes(buffer[:max_document_bytes]).strip()
+            skipping = True
+        if skipping:
+            # Keep only a possible partial closing tag while skipping an oversized document:
+            # the bytes from the last "<", if it is among the last max_partial_tag bytes
+            tail = buffer.rfind(b"<", max(0, len(buffer) - max_partial_tag))
+            del buffer[:tail if tail >= 0 else len(buffer)]
+        # A closing tag split across reads can only start at the last "<"
+        last_open = buffer.rfind(b"<")
+        scan_from = last_open if last_open >= 0 else len(buffer)
+
+    if not skipping and buffer.strip():
+        yield bytes(buffer).strip()
+
+
+def process_stream(
+    input_stream: BinaryIO,
+    output_stream: BinaryIO,
+    mode: str = "serial",
+    max_workers: Optional[int] = None,
+    chunksize: int = DEFAULT_BATCH_CHUNKSIZE,
+    parser: str = DEFAULT_PARSER,
+    columnar: bool = False
+) -> int:
+    """
+    Runs every document of input_stream through the pipeline and writes one compact
+    JSON line per request to the binary output_stream, in input order (NDJSON).
+    In serial mode each response is written as it is encoded (see write_response).
+    Memory stays bounded by the document and in-flight chunk sizes, not the input size.
+    Returns the number of requests processed.
+    """
+    count = 0
+    documents = iter_documents(input_stream)
+    if mode == "serial" and not columnar:
+        for document in documents:
+            write_response(document, output_stream, parser)
+            output_stream.write(b"\n")
+            count += 1
+        return count
+    for response in process_requests(documents, mode, max_workers, chunksize, parser, compact=True, columnar=columnar):
+        output_stream.write(response.encode())
+        output_stream.write(b"\n")
+        count += 1
+    return count
@@ -0,0 +1,203 @@
+import asyncio
+import math
+import random
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple
+from .config_snapshot import current_snapshot
+from .offer_selection import RoomCombination, TopOffers
+from .pricing import OfferBatch, PricingConfig, price_offers
+
+
+@dataclass(frozen=True)
+class SupplierQuery:
+    """
+    What every supplier is asked for one validated request.
+    """
+    currency: str
+    market: str
+    quota: int
+    pricing: PricingConfig
+    markup: float
+    rooms: RoomCombination = ()
+
+
+class SupplierError(Exception):
+    """
+    Raised by a supplier adapter that cannot answer a query.
+    """
+
+
+class SupplierAdapter:
+    """
+    Base class of the suppliers queried by fan_out. search returns the supplier's
+    priced offers for the query (at most query.quota of them) and may raise; an
+    adapter still running when the fan-out stops is cancelled.
+    """
+    name = "supplier"
+
+    async def search(self, query: SupplierQuery) -> OfferBatch:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """
+    Response time distribution of a stub supplier: log-normal around median_ms with
+    shape sigma (0 for a constant latency), and with probability tail_probability a
+    tail_ms stall instead, to model the slow outliers that drive p99.
+    """
+    median_ms: float
+    sigma: float = 0.0
+    tail_probability: float = 0.0
+    tail_ms: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        Draws one response time, in seconds.
+        """
+        if self.tail_probability and rng.random() < self.tail_probability:
+            return self.tail_ms / 1000
+        if not self.sigma:
+            return self.median_ms / 1000
+        return rng.lognormvariate(math.log(self.median_ms), self.sigma) / 1000
+
+
+class StubSupplier(SupplierAdapter):
+    """
+    Local supplier for offline testing: answers after a latency drawn from its
+    LatencyProfile with up to offer_count offers priced like the simulated ones, its
+    net prices scaled by price_factor and its hotel codes starting at hotel_code.
+    With probability failure_rate it raises SupplierError instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: LatencyProfile,
+        hotel_code: int,
+        price_factor: float = 1.0,
+        offer_count: int = 50,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None
+    ) -> None:
+        self.name = name
+        self.latency = latency
+        self.hotel_code = hotel_code
+        self.price_factor = price_factor
+        self.offer_count = offer_count
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+
+    async def search(self, query: SupplierQuery) -> OfferBatch:
+        await asyncio.sleep(self.latency.sample(self._rng))
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise SupplierError(f"Supplier {self.name} failed.")
+        pricing = replace(
+            query.pricing, net_price=query.pricing.net_price * self.price_factor, hotel_code=self.hotel_code
+        )
+        return price_offers(query.currency, query.market, min(query.quota, self.offer_count), pricing, query.markup)
+
+
+def stub_suppliers(
+    count: int,
+    latency: LatencyProfile,
+    seed: Optional[int] = None,
+    base_code: Optional[int] = None
+) -> List[StubSupplier]:
+    """
+    count stub suppliers sharing one latency profile, each a little dearer than the
+    previous one and with its own hotel code range, starting at base_code (by default
+    SIMULATED_HOTEL_CODE of the current config snapshot).
+    """
+    if base_code is None:
+        base_code = current_snapshot().pricing.hotel_code
+    return [
+        StubSupplier(
+            f"stub{index}", latency, base_code + index * 1000, 1 + index * 0.02,
+            seed=None if seed is None else seed + index
+        )
+        for index in range(count)
+    ]
+
+
+@dataclass(frozen=True)
+class FanOutResult:
+    """
+    Offers kept by fan_out, cheapest first, and what happened to each supplier:
+    responded, failed (raised), or cancelled because the quota was met or the deadline
+    ran out (timed_out tells which).
+    """
+    offers: OfferBatch
+    responded: Tuple[str, ...]
+    failed: Tuple[str, ...]
+    cancelled: Tuple[str, ...]
+    timed_out: bool
+
+    @property
+    def partial(self) -> bool:
+        return self.timed_out or bool(self.failed)
+
+
+async def fan_out(
+    suppliers: Sequence[SupplierAdapter],
+    query: SupplierQuery,
+    timeout: Optional[float] = None
+) -> FanOutResult:
+    """
+    Queries every supplier concurrently and feeds their offers into a TopOffers
+    selector as they complete, so only the query.quota cheapest distinct offers are
+    kept. Stops once query.quota offers are held or timeout seconds have passed,
+    cancels the suppliers still running and returns whatever arrived.
+    """
+    loop = asyncio.get_running_loop()
+    expires_at = None if timeout is None else loop.time() + timeout
+    tasks = {} if query.quota <= 0 else {
+        asyncio.ensure_future(supplier.search(query)): supplier.name for supplier in suppliers
+    }
+    pending = set(tasks)
+    selected = TopOffers(query.quota)
+    responded: List[str] = []
+    failed: List[str] = []
+    timed_out = False
+    try:
+        while pending and len(selected) < query.quota:
+            wait = None if expires_at is None else expires_at - loop.time()
+            if wait is not None and wait <= 0:
+                timed_out = True
+                break
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                timed_out = True
+                break
+            # Tasks finishing together are taken in supplier order
+            for task in (task for task in tasks if task in done):
+                if task.exception() is not None:
+                    failed.append(tasks[task])
+                    continue
+                selected.add_batch(task.result(), query.rooms)
+                responded.append(tasks[task])
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return FanOutResult(
+        offers=selected.to_batch(query.pricing.hotel_price_currency, query.currency, query.market),
+        responded=tuple(responded),
+        failed=tuple(failed),
+        cancelled=tuple(name for task, name in tasks.items() if task in pending),
+        timed_out=timed_out,
+    )
+
+
+def collect_offers(
+    suppliers: Sequence[SupplierAdapter],
+    query: SupplierQuery,
+    timeout: Optional[float] = None
+) -> FanOutResult:
+    """
+    Runs fan_out to completion on a new event loop, for synchronous callers such as
+    the executor threads of src.server. Must not be called from a running loop.
+    """
+    return asyncio.run(fan_out(suppliers, query, timeout))
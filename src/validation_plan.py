@@ -0,0 +1,212 @@
+import itertools
+import threading
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+from .configs import VALIDATION_REORDER_INTERVAL, VALIDATION_STATS_SAMPLE_INTERVAL
+from .deadline import Deadline
+from .request_model import AvailRequest
+from .validators import (
+    DEFAULT_RULES,
+    ValidationRules,
+    validate_language_code,
+    validate_options_quota,
+    extract_required_parameters,
+    validate_search_type,
+    extract_currency,
+    extract_nationality_and_market,
+    validate_rooms_and_passengers
+)
+from .xml_parser import validate_dates
+
+
+class ValidationStep(NamedTuple):
+    """
+    One check of the plan. name is also the result key and the deadline stage name;
+    cost is a relative per-call cost used for ordering; can_fail is False for checks
+    that only fall back to defaults and never reject a request.
+    """
+    name: str
+    cost: float
+    validate: Callable[[AvailRequest, ValidationRules], Any]
+    can_fail: bool = True
+
+
+# Relative costs measured on a typical request: the date step pays for two strptime calls
+# and the room step loops over every pax
+VALIDATION_STEPS: Tuple[ValidationStep, ...] = (
+    ValidationStep("validate_options_quota", 1.0, validate_options_quota),
+    ValidationStep("extract_required_parameters", 1.5, lambda request, rules: extract_required_parameters(request)),
+    ValidationStep("validate_search_type", 1.0, lambda request, rules: validate_search_type(request)),
+    ValidationStep("validate_rooms_and_passengers", 3.0, validate_rooms_and_passengers),
+    ValidationStep("validate_dates", 6.0, lambda request, rules: validate_dates(request)),
+    ValidationStep("validate_language_code", 1.0, validate_language_code, can_fail=False),
+    ValidationStep("extract_currency", 1.0, extract_currency, can_fail=False),
+    ValidationStep("extract_nationality_and_market", 1.0, extract_nationality_and_market, can_fail=False),
+)
+
+
+class RejectionStats:
+    """
+    Thread-safe counts of how often each step ran and how often it rejected a request.
+    Only the requests picked by next_request() need to be recorded: the rates are
+    ratios, so a regular sample ranks the steps like the full stream does.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seen = itertools.count()
+        self.requests = 0
+        self.evaluated: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+
+    def record(self, steps_run: Iterable[str], rejected_by: Optional[str]) -> int:
+        """
+        Records one request and returns the running request count.
+        """
+        with self._lock:
+            for name in steps_run:
+                self.evaluated[name] = self.evaluated.get(name, 0) + 1
+            if rejected_by is not None:
+                self.rejected[rejected_by] = self.rejected.get(rejected_by, 0) + 1
+            self.requests += 1
+            return self.requests
+
+    def next_request(self) -> int:
+        """
+        Returns the index of a newly arrived request, counting recorded and skipped ones.
+        """
+        return next(self._seen)
+
+    def rejection_rate(self, name: str) -> float:
+        """
+        Laplace-smoothed share of evaluations of the step that ended in a rejection.
+        """
+        return (self.rejected.get(name, 0) + 1) / (self.evaluated.get(name, 0) + 2)
+
+
+def _order_key(step: ValidationStep, stats: Optional[RejectionStats]) -> Tuple[int, float]:
+    # Rejecting checks first, ranked by cost paid per rejection; fallback-only checks last
+    if not step.can_fail:
+        return 1, step.cost
+    rate = stats.rejection_rate(step.name) if stats is not None else 0.5
+    return 0, step.cost / rate
+
+
+class ValidationPlan:
+    """
+    Immutable, ordered list of validation steps bound to a ValidationRules snapshot.
+    run() stops at the first failing step, so cheap checks that reject often go first.
+    """
+
+    __slots__ = ("steps", "rules", "stats", "_calls")
+
+    def __init__(
+        self,
+        steps: Tuple[ValidationStep, ...],
+        rules: ValidationRules,
+        stats: Optional[RejectionStats] = None
+    ) -> None:
+        self.steps = steps
+        self.rules = rules
+        self.stats = stats if stats is not None else RejectionStats()
+        # (name, validate) pairs, so a run does no per-step attribute or override lookups
+        self._calls = tuple((step.name, step.validate) for step in steps)
+
+    @property
+    def order(self) -> Tuple[str, ...]:
+        return tuple(step.name for step in self.steps)
+
+    def run(
+        self,
+        request: AvailRequest,
+        deadline: Optional[Deadline] = None,
+        overrides: Optional[Dict[str, Callable[[AvailRequest, ValidationRules], Any]]] = None,
+        rules: Optional[ValidationRules] = None,
+        record: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Runs every step in order and returns the results keyed by step name.
+        Raises the first step's ValueError, after recording it in the rejection stats;
+        checks the deadline after each step when one is given. The request and the steps
+        it ran are recorded however the run ends, unless record is False. overrides
+        replaces the validate function of the named steps, e.g. with a result computed
+        for a whole batch. rules, when given, replaces the plan's own (the request's
+        config snapshot).
+        """
+        results: Dict[str, Any] = {}
+        rules = rules or self.rules
+        calls = self._calls
+        if overrides is not None:
+            calls = tuple((name, overrides.get(name, validate)) for name, validate in calls)
+        if not record:
+            for name, validate in calls:
+                results[name] = validate(request, rules)
+                if deadline is not None:
+                    deadline.check(name)
+            return results
+
+        rejected_by = None
+        try:
+            for name, validate in calls:
+                try:
+                    results[name] = validate(request, rules)
+                except ValueError:
+                    rejected_by = name
+                    raise
+                if deadline is not None:
+                    deadline.check(name)
+            return results
+        finally:
+            # Also when the deadline runs out mid-plan: the steps run so far still count
+            self.stats.record(results.keys() if rejected_by is None else results.keys() | {rejected_by}, rejected_by)
+
+    def reordered(self) -> "ValidationPlan":
+        """
+        Returns a plan with the same steps ranked by the observed rejection statistics.
+        """
+        steps = tuple(sorted(self.steps, key=lambda step: _order_key(step, self.stats)))
+        return ValidationPlan(steps, self.rules, self.stats)
+
+
+def compile_validation_plan(
+    rules: Optional[ValidationRules] = None,
+    steps: Tuple[ValidationStep, ...] = VALIDATION_STEPS,
+    stats: Optional[RejectionStats] = None
+) -> ValidationPlan:
+    """
+    Builds a plan from the configured rules, ordered by cost (and by stats when given).
+    """
+    ordered = tuple(sorted(steps, key=lambda step: _order_key(step, stats)))
+    return ValidationPlan(ordered, rules or DEFAULT_RULES, stats)
+
+
+_active_plan = compile_validation_plan()
+
+
+def get_validation_plan() -> ValidationPlan:
+    return _active_plan
+
+
+def set_validation_plan(plan: ValidationPlan) -> None:
+    global _active_plan
+    _active_plan = plan
+
+
+def run_validation_plan(
+    request: AvailRequest,
+    deadline: Optional[Deadline] = None,
+    overrides: Optional[Dict[str, Callable[[AvailRequest, ValidationRules], Any]]] = None,
+    rules: Optional[ValidationRules] = None
+) -> Dict[str, Any]:
+    """
+    Runs the active plan. One request in VALIDATION_STATS_SAMPLE_INTERVAL is recorded
+    in the plan's rejection statistics; every VALIDATION_REORDER_INTERVAL recorded
+    requests the active plan is replaced by one re-ranked from them.
+    """
+    plan = _active_plan
+    if VALIDATION_STATS_SAMPLE_INTERVAL > 1 and plan.stats.next_request() % VALIDATION_STATS_SAMPLE_INTERVAL:
+        return plan.run(request, deadline, overrides, rules, record=False)
+    try:
+        return plan.run(request, deadline, overrides, rules)
+    finally:
+        if VALIDATION_REORDER_INTERVAL and plan.stats.requests % VALIDATION_REORDER_INTERVAL == 0:
+            set_validation_plan(plan.reordered())
@@ -1,63 +1,101 @@
 import xml.etree.ElementTree as ET
-from typing import Any, Dict
-from .configs import (
-    VALID_LANGUAGES,
-    DEFAULT_LANGUAGE,
-    DEFAULT_OPTIONS_QUOTA,
-    MAX_OPTIONS_QUOTA,
-    ALLOWED_CURRENCIES,
-    DEFAULT_CURRENCY,
-    ALLOWED_NATIONALITIES,
-    DEFAULT_NATIONALITY,
-    ALLOWED_MARKET_VALUES,
-    DEFAULT_MARKET,
-    ALLOWED_ROOM_COUNT,
-    ALLOWED_ROOM_GUEST_COUNT,
-    ALLOWED_CHILD_COUNT_PER_ROOM
-)
-
-
-def validate_language_code(root: ET.Element) -> str:
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Union
+from . import configs
+# Default values also exposed here for callers of the validators
+from .configs import VALID_LANGUAGES, DEFAULT_LANGUAGE, DEFAULT_OPTIONS_QUOTA
+from .request_model import AvailRequest
+from .xml_parser import as_request
+
+
+@dataclass(frozen=True)
+class ValidationRules:
+    """
+    Immutable copy of the validation constants from src/configs.py (or a config snapshot).
+    """
+    valid_languages: FrozenSet[str]
+    default_language: str
+    default_options_quota: int
+    max_options_quota: int
+    allowed_currencies: FrozenSet[str]
+    default_currency: str
+    allowed_nationalities: FrozenSet[str]
+    default_nationality: str
+    allowed_market_values: FrozenSet[str]
+    default_market: str
+    allowed_room_count: int
+    allowed_room_guest_count: int
+    allowed_child_count_per_room: int
+
+    @classmethod
+    def from_configs(cls, values: Optional[Mapping[str, Any]] = None) -> "ValidationRules":
+        """
+        Builds the rules from src/configs.py, or from values keyed by the same setting names.
+        """
+        values = vars(configs) if values is None else values
+        return cls(
+            valid_languages=frozenset(values["VALID_LANGUAGES"]),
+            default_language=values["DEFAULT_LANGUAGE"],
+            default_options_quota=values["DEFAULT_OPTIONS_QUOTA"],
+            max_options_quota=values["MAX_OPTIONS_QUOTA"],
+            allowed_currencies=frozenset(values["ALLOWED_CURRENCIES"]),
+            default_currency=values["DEFAULT_CURRENCY"],
+            allowed_nationalities=frozenset(values["ALLOWED_NATIONALITIES"]),
+            default_nationality=values["DEFAULT_NATIONALITY"],
+            allowed_market_values=frozenset(values["ALLOWED_MARKET_VALUES"]),
+            default_market=values["DEFAULT_MARKET"],
+            allowed_room_count=values["ALLOWED_ROOM_COUNT"],
+            allowed_room_guest_count=values["ALLOWED_ROOM_GUEST_COUNT"],
+            allowed_child_count_per_room=values["ALLOWED_CHILD_COUNT_PER_ROOM"],
+        )
+
+
+DEFAULT_RULES = ValidationRules.from_configs()
+
+
+def validate_language_code(root: Union[AvailRequest, ET.Element], rules: Optional[ValidationRules] = None) -> str:
     """
     Validates the language code from <source>/<languageCode>.
     Returns the language if valid, otherwise returns the default language.
     """
-    language_elem = root.find('source/languageCode')
-    language_code = language_elem.text.strip() if language_elem is not None and language_elem.text else DEFAULT_LANGUAGE
+    rules = rules or DEFAULT_RULES
+    language_text = as_request(root).language_code
+    language_code = language_text.strip() if language_text else rules.default_language
     # using `var_filters_cg` for language validation
-    var_filters_cg = language_code not in VALID_LANGUAGES
+    var_filters_cg = language_code not in rules.valid_languages
     if var_filters_cg:
-        return DEFAULT_LANGUAGE
+        return rules.default_language
     return language_code
 
 
-def validate_options_quota(root: ET.Element) -> int:
+def validate_options_quota(root: Union[AvailRequest, ET.Element], rules: Optional[ValidationRules] = None) -> int:
     """
     Validates and returns the optionsQuota from the XML.
     Defaults to DEFAULT_OPTIONS_QUOTA if not provided.
     Raises ValueError if optionsQuota is above MAX_OPTIONS_QUOTA.
     """
-    options_quota_elem = root.find('optionsQuota')
-    if options_quota_elem is not None and options_quota_elem.text and options_quota_elem.text.isdigit():
-        quota = int(options_quota_elem.text)
-        if quota > MAX_OPTIONS_QUOTA:
-            raise ValueError("optionsQuota cannot be greater than 50.")
+    rules = rules or DEFAULT_RULES
+    options_quota = as_request(root).options_quota
+    if options_quota and options_quota.isdigit():
+        quota = int(options_quota)
+        if quota > rules.max_options_quota:
+            raise ValueError(f"optionsQuota cannot be greater than {rules.max_options_quota}.")
         return quota
-    return DEFAULT_OPTIONS_QUOTA
+    return rules.default_options_quota
 
 
-def extract_required_parameters(root: ET.Element) -> Dict[str, Any]:
+def extract_required_parameters(root: Union[AvailRequest, ET.Element]) -> Dict[str, Any]:
     """
     Extracts required parameters: password, username, and CompanyID.
     Raises ValueError if any required parameter is missing or invalid.
     """
-    param_elem = root.find('Configuration/Parameters/Parameter')
-    if param_elem is None:
+    params = as_request(root).parameters
+    if params is None:
         raise ValueError("Missing Configuration Parameters.")
 
-    password = param_elem.get("password")
-    username = param_elem.get("username")
-    company_id_str = param_elem.get("CompanyID")
+    password = params.get("password")
+    username = params.get("username")
+    company_id_str = params.get("CompanyID")
 
     if not (password and username and company_id_str):
         raise ValueError("Missing required parameters: password, username, or CompanyID.")
@@ -70,46 +108,50 @@ def extract_required_parameters(root: ET.Element) -> Dict[str, Any]:
     return {"password": password, "username": username, "CompanyID": company_id}
 
 
-def validate_search_type(root: ET.Element) -> str:
+def validate_search_type(root: Union[AvailRequest, ET.Element]) -> str:
     """
     Extracts and validates the SearchType.
     For 'Single' type, verifies that exactly one AvailDestination is provided.
     Raises ValueError on validation failure.
     """
-    search_type_elem = root.find('SearchType')
-    search_type = search_type_elem.text.strip() if search_type_elem is not None and search_type_elem.text else "Multiple"
+    request = as_request(root)
+    search_type = request.search_type.strip() if request.search_type else "Multiple"
 
     if search_type == "Single":
-        avail_destinations = root.find('AvailDestinations')
-        if avail_destinations is None or len(avail_destinations.findall('*')) != 1:
+        if request.destination_count != 1:
             raise ValueError("For Single search type, exactly one AvailDestination is required.")
     return search_type
 
 
-def extract_currency(root: ET.Element) -> str:
+def extract_currency(root: Union[AvailRequest, ET.Element], rules: Optional[ValidationRules] = None) -> str:
     """
     Extracts and validates the Currency element.
     Returns a valid currency or the default.
     """
-    currency_elem = root.find('Currency')
-    request_currency = currency_elem.text.strip() if currency_elem is not None and currency_elem.text else DEFAULT_CURRENCY
-    if request_currency not in ALLOWED_CURRENCIES:
-        return DEFAULT_CURRENCY
+    rules = rules or DEFAULT_RULES
+    currency_text = as_request(root).currency
+    request_currency = currency_text.strip() if currency_text else rules.default_currency
+    if request_currency not in rules.allowed_currencies:
+        return rules.default_currency
     return request_currency
 
 
-def extract_nationality_and_market(root: ET.Element) -> str:
+def extract_nationality_and_market(root: Union[AvailRequest, ET.Element], rules: Optional[ValidationRules] = None) -> str:
     """
     Extracts the Nationality and determines the market.
     Returns the nationality if valid; otherwise, returns the default market.
     """
-    nationality_elem = root.find('Nationality')
-    nationality = nationality_elem.text.strip() if nationality_elem is not None and nationality_elem.text else DEFAULT_NATIONALITY
-    market = nationality if nationality in ALLOWED_NATIONALITIES else DEFAULT_MARKET
+    rules = rules or DEFAULT_RULES
+    nationality_text = as_request(root).nationality
+    nationality = nationality_text.strip() if nationality_text else rules.default_nationality
+    market = nationality if nationality in rules.allowed_nationalities else rules.default_market
     return market
 
 
-def validate_rooms_and_passengers(root: ET.Element) -> None:
+def validate_rooms_and_passengers(
+    root: Union[AvailRequest, ET.Element],
+    rules: Optional[ValidationRules] = None
+) -> None:
     """
     Validates room and passenger rules:
     - Each <Paxes> block represents a room. Total rooms must not exceed ALLOWED_ROOM_COUNT.
@@ -118,30 +160,25 @@ def validate_rooms_and_passengers(root: ET.Element) -> None:
     - A room with children must have at least one adult.
     - Total children per room must not exceed ALLOWED_CHILD_COUNT_PER_ROOM.
     """
-    rooms = root.findall('.//Paxes')
-    if len(rooms) > ALLOWED_ROOM_COUNT:
+    rules = rules or DEFAULT_RULES
+    rooms = as_request(root).rooms
+    if len(rooms) > rules.allowed_room_count:
         raise ValueError("Exceeded maximum allowed room count.")
 
     for room in rooms:
-        # Find all <Pax> elements within this room
-        pax_list = room.findall('.//Pax')
-        if len(pax_list) > ALLOWED_ROOM_GUEST_COUNT:
+        # Each entry is the age of one <Pax> within this room
+        if len(room) > rules.allowed_room_guest_count:
             raise ValueError("Exceeded maximum allowed guests per room.")
+        if room.invalid_age:
+            raise ValueError("Invalid age value in Pax element.")
 
         children_count = 0
-        adult_count = 0
-        for pax in pax_list:
-            try:
-                age = int(pax.get("age", "0"))
-            except ValueError:
-                raise ValueError("Invalid age value in Pax element.")
-
+        for age in room.ages:
             if age <= 5:
                 children_count += 1
-            else:
-                adult_count += 1
+        adult_count = len(room) - children_count
 
-        if children_count > ALLOWED_CHILD_COUNT_PER_ROOM:
+        if children_count > rules.allowed_child_count_per_room:
             raise ValueError("Exceeded maximum children per room.")
         if children_count > 0 and adult_count == 0:
             raise ValueError("Each room with children must have at least one adult.")
@@ -1,55 +1,524 @@
 import xml.etree.ElementTree as ET
+import xml.parsers.expat
 import datetime
-from typing import Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, NoReturn, Optional, Tuple, Union
+from .clock import DayBoundary
+from . import configs
+from .configs import DATE_PARSE_CACHE_SIZE, DEFAULT_PARSER
+from .request_model import AvailRequest, Room
 
+# Fields copied from the children of the root element: nested dicts follow the element path,
+# string leaves name the AvailRequest attribute that receives the element's text or attributes
+_REQUEST_FIELDS: Dict[str, Any] = {
+    "timeoutMilliseconds": "timeout",
+    "source": {"languageCode": "language_code"},
+    "optionsQuota": "options_quota",
+    "Configuration": {"Parameters": {"Parameter": "parameters"}},
+    "SearchType": "search_type",
+    "AvailDestinations": "destination_count",
+    "StartDate": "start_date",
+    "EndDate": "end_date",
+    "Currency": "currency",
+    "Nationality": "nationality",
+}
 
-def parse_xml(xml_str: str) -> ET.Element:
+
+class InputLimitError(ValueError):
+    """
+    Raised as soon as a document crosses one of the InputLimits or declares a DTD.
+    """
+
+
+@dataclass(frozen=True)
+class InputLimits:
+    """
+    Size and shape limits checked while a request is parsed.
+    """
+    max_bytes: int
+    max_elements: int
+    max_depth: int
+    max_paxes: int
+    max_pax: int
+
+    @classmethod
+    def from_configs(cls, values: Optional[Mapping[str, Any]] = None) -> "InputLimits":
+        """
+        Builds the limits from src/configs.py, or from values keyed by the same setting names.
+        """
+        values = vars(configs) if values is None else values
+        return cls(
+            max_bytes=values["MAX_REQUEST_BYTES"],
+            max_elements=values["MAX_XML_ELEMENTS"],
+            max_depth=values["MAX_XML_DEPTH"],
+            max_paxes=values["MAX_XML_PAXES"],
+            max_pax=values["MAX_XML_PAX"],
+        )
+
+
+DEFAULT_LIMITS = InputLimits.from_configs()
+
+
+def _reject_doctype(*args: Any) -> NoReturn:
+    # Entity declarations can only appear inside a DTD, so this also stops entity expansion
+    raise InputLimitError("DTD and entity declarations are not allowed.")
+
+
+def check_input_size(size: int, limits: InputLimits = DEFAULT_LIMITS) -> None:
+    """
+    Raises InputLimitError if a document of size bytes is over limits.max_bytes.
+    """
+    if size > limits.max_bytes:
+        raise InputLimitError("Request exceeds the maximum size.")
+
+
+def _input_size(xml_str: Union[str, bytes]) -> int:
+    # The limit is in bytes; a str counts as its UTF-8 encoding
+    if not isinstance(xml_str, str) or xml_str.isascii():
+        return len(xml_str)
+    return len(xml_str.encode("utf-8", "surrogatepass"))
+
+
+class _GuardedTreeBuilder(ET.TreeBuilder):
+    """
+    TreeBuilder that enforces InputLimits while ElementTree builds the tree.
+    Every element event goes through Python, so parse_xml only uses it for documents
+    its pre-scan cannot clear.
+    """
+
+    def __init__(self, limits: InputLimits) -> None:
+        super().__init__()
+        self._limits = limits
+        self._depth = 0
+        self._elements = 0
+        self._paxes = 0
+        self._pax = 0
+
+    def start(self, tag: str, attrs: Dict[str, str]) -> ET.Element:
+        limits = self._limits
+        self._depth += 1
+        self._elements += 1
+        if self._depth > limits.max_depth:
+            raise InputLimitError("Request exceeds the maximum nesting depth.")
+        if self._elements > limits.max_elements:
+            raise InputLimitError("Request exceeds the maximum number of elements.")
+        if tag == "Paxes":
+            self._paxes += 1
+            if self._paxes > limits.max_paxes:
+                raise InputLimitError("Request exceeds the maximum number of Paxes.")
+        elif tag == "Pax":
+            self._pax += 1
+            if self._pax > limits.max_pax:
+                raise InputLimitError("Request exceeds the maximum number of Pax elements.")
+        return super().start(tag, attrs)
+
+    def end(self, tag: str) -> ET.Element:
+        self._depth -= 1
+        return super().end(tag)
+
+    doctype = _reject_doctype
+
+
+# Markers counted by the pre-scan, for str and bytes documents
+_SCAN_MARKERS = {
+    str: ("<", "</", "<Pax", "<!DOCTYPE"),
+    bytes: (b"<", b"</", b"<Pax", b"<!DOCTYPE"),
+}
+
+
+def _needs_guarded_parse(xml_str: Union[str, bytes], limits: InputLimits) -> Tuple[bool, int]:
+    """
+    Byte-level pre-scan. Returns whether the document might cross the element, Paxes or
+    Pax limits or declare a DTD, and an upper bound of its element count. Every element
+    opens with a "<" not followed by "/", and "<Pax" opens every Pax and Paxes element;
+    comments, CDATA and processing instructions can only raise the counts.
+    """
+    tag_open, end_tag_open, pax_open, doctype = _SCAN_MARKERS[bytes if isinstance(xml_str, bytes) else str]
+    tags = xml_str.count(tag_open)
+    elements = tags - xml_str.count(end_tag_open)
+    pax_limit = min(limits.max_pax, limits.max_paxes)
+    suspect = (
+        elements > limits.max_elements
+        # Fewer "<" than the limit leave no room for too many "<Pax"
+        or (tags > pax_limit and xml_str.count(pax_open) > pax_limit)
+        or doctype in xml_str
+    )
+    return suspect, elements
+
+
+def _check_depth(root: ET.Element, limits: InputLimits) -> None:
+    # The deepest element sits under a chain of elements that have children, so the depth
+    # is at most one more than their count (taken in C); only past that is it walked
+    if len(list(filter(None, map(len, root.iter())))) < limits.max_depth:
+        return
+    level = [root]
+    depth = 1
+    while level:
+        level = [child for element in level for child in element]
+        if level:
+            depth += 1
+            if depth > limits.max_depth:
+                raise InputLimitError("Request exceeds the maximum nesting depth.")
+
+
+def _guarded_parse(xml_str: Union[str, bytes], limits: InputLimits) -> ET.Element:
+    parser = ET.XMLParser(target=_GuardedTreeBuilder(limits))
+    parser.feed(xml_str)
+    return parser.close()
+
+
+def parse_xml(xml_str: Union[str, bytes], limits: InputLimits = DEFAULT_LIMITS) -> ET.Element:
     """
     Parses an XML string and returns the root element.
-    Raises ET.ParseError if the XML is invalid.
+    Raises ET.ParseError if the XML is invalid and InputLimitError if it crosses limits.
+    The size is checked before parsing. A document the pre-scan clears is built by the C
+    TreeBuilder and only its depth is checked on the tree; any other, and any document
+    that fails to parse, goes through the guarded builder, which reports the first
+    limit crossed, or the DTD, where the parse meets it.
     """
-    return ET.fromstring(xml_str)
+    check_input_size(_input_size(xml_str), limits)
+    suspect, elements = _needs_guarded_parse(xml_str, limits)
+    if suspect:
+        return _guarded_parse(xml_str, limits)
+    try:
+        root = ET.fromstring(xml_str)
+    except ET.ParseError:
+        # A limit crossed before the error comes first, as in the guarded parse
+        return _guarded_parse(xml_str, limits)
+    if elements > limits.max_depth:
+        _check_depth(root, limits)
+    return root
 
 
-def extract_timeout(root: ET.Element) -> int:
+# Text field marker for the children of <AvailDestinations> without a code attribute
+_DESTINATION_TEXT = "<destination>"
+
+
+def _destination_code(elem: ET.Element) -> str:
+    code = elem.get("code")
+    return (code if code is not None else elem.text or "").strip()
+
+
+class _RequestExtractor:
+    """
+    Expat handlers that fill an AvailRequest while the document streams through.
+    No element objects are built; only the fields the validators need are kept.
+    """
+
+    def __init__(self, parser: Any, limits: InputLimits = DEFAULT_LIMITS) -> None:
+        self.request = AvailRequest()
+        self._parser = parser
+        self._max_depth = limits.max_depth
+        self._elements_left = limits.max_elements
+        self._paxes_left = limits.max_paxes
+        self._pax_left = limits.max_pax
+        self._stack: List[Any] = []
+        self._text_field: Optional[str] = None
+        self._text_depth = 0
+        self._text_parts: List[str] = []
+        self._destinations_depth = 0
+        self._open_rooms: List[Tuple[int, Room]] = []
+
+    def start(self, tag: str, attrs: Dict[str, str]) -> None:
+        stack = self._stack
+        if self._text_field is not None:
+            # ElementTree only keeps the text that precedes the first child
+            self._finish_text()
+        self._elements_left -= 1
+        if self._elements_left < 0:
+            raise InputLimitError("Request exceeds the maximum number of elements.")
+        if not stack:
+            stack.append(_REQUEST_FIELDS)
+            return
+
+        parent = stack[-1]
+        node = parent.get(tag) if parent.__class__ is dict else None
+        stack.append(node)
+        depth = len(stack)
+        if depth > self._max_depth:
+            raise InputLimitError("Request exceeds the maximum nesting depth.")
+        request = self.request
+
+        if node.__class__ is str and getattr(request, node) is None:
+            if node == "parameters":
+                request.parameters = attrs
+            elif node == "destination_count":
+                request.destination_count = 0
+                self._destinations_depth = depth
+            else:
+                self._text_field = node
+                self._text_depth = depth
+                self._parser.CharacterDataHandler = self._text_parts.append
+        elif depth == self._destinations_depth + 1:
+            request.destination_count += 1
+            code = attrs.get("code")
+            if code is not None:
+                if code.strip():
+                    request.destination_codes.append(code.strip())
+            else:
+                self._text_field = _DESTINATION_TEXT
+                self._text_depth = depth
+                self._parser.CharacterDataHandler = self._text_parts.append
+
+        if tag == "Paxes":
+            self._paxes_left -= 1
+            if self._paxes_left < 0:
+                raise InputLimitError("Request exceeds the maximum number of Paxes.")
+            room = Room()
+            request.rooms.append(room)
+            self._open_rooms.append((depth, room))
+        elif tag == "Pax":
+            self._pax_left -= 1
+            if self._pax_left < 0:
+                raise InputLimitError("Request exceeds the maximum number of Pax elements.")
+            if not self._open_rooms:
+                return
+            age = attrs.get("age", "0")
+            for _, room in self._open_rooms:
+                room.add(age)
+
+    def end(self, tag: str) -> None:
+        stack = self._stack
+        depth = len(stack)
+        if depth == self._text_depth:
+            self._finish_text()
+        if self._open_rooms and self._open_rooms[-1][0] == depth:
+            self._open_rooms.pop()
+        if depth == self._destinations_depth:
+            self._destinations_depth = 0
+        stack.pop()
+
+    @property
+    def destinations_closed(self) -> bool:
+        return self.request.destination_count is not None and not self._destinations_depth
+
+    def _finish_text(self) -> None:
+        if self._text_field == _DESTINATION_TEXT:
+            code = "".join(self._text_parts).strip()
+            if code:
+                self.request.destination_codes.append(code)
+        else:
+            setattr(self.request, self._text_field, "".join(self._text_parts))
+        self._parser.CharacterDataHandler = None
+        self._text_field = None
+        self._text_depth = 0
+        self._text_parts = []
+
+
+def create_extractor(limits: InputLimits = DEFAULT_LIMITS) -> Tuple[Any, _RequestExtractor]:
+    """
+    Returns an expat parser wired to a fresh request extractor. Feed it with
+    parser.Parse(data, is_final); the fields land in extractor.request.
+    """
+    parser = xml.parsers.expat.ParserCreate(namespace_separator="}")
+    parser.buffer_text = True
+    extractor = _RequestExtractor(parser, limits)
+    parser.StartElementHandler = extractor.start
+    parser.EndElementHandler = extractor.end
+    parser.StartDoctypeDeclHandler = _reject_doctype
+    return parser, extractor
+
+
+def extract_request(xml_str: Union[str, bytes], limits: InputLimits = DEFAULT_LIMITS) -> AvailRequest:
+    """
+    Extracts an AvailRequest from the XML in a single event-driven pass, without building a tree.
+    Raises ET.ParseError if the XML is invalid and InputLimitError, as soon as it is
+    detected, if the document crosses limits or declares a DTD.
+    """
+    check_input_size(_input_size(xml_str), limits)
+    parser, extractor = create_extractor(limits)
+    try:
+        parser.Parse(xml_str, True)
+    except xml.parsers.expat.ExpatError as e:
+        err = ET.ParseError(str(e))
+        err.code = e.code
+        err.position = e.lineno, e.offset
+        raise err from None
+    return extractor.request
+
+
+def _element_text(elem: Optional[ET.Element]) -> Optional[str]:
+    if elem is None:
+        return None
+    return elem.text or ""
+
+
+def _find_path(root: ET.Element, *tags: str) -> Optional[ET.Element]:
+    # root.find("/".join(tags)) through the first element with each tag, one plain-tag
+    # find per level; only when that chain misses does the full path search the siblings
+    elem = root
+    for tag in tags:
+        elem = elem.find(tag)
+        if elem is None:
+            break
+    if elem is None and len(tags) > 1 and root.find(tags[0]) is not None:
+        return root.find("/".join(tags))
+    return elem
+
+
+def _read_parameters(root: ET.Element) -> Optional[Dict[str, str]]:
+    param_elem = _find_path(root, 'Configuration', 'Parameters', 'Parameter')
+    return dict(param_elem.attrib) if param_elem is not None else None
+
+
+def _read_destination_count(root: ET.Element) -> Optional[int]:
+    destinations_elem = root.find('AvailDestinations')
+    return len(destinations_elem) if destinations_elem is not None else None
+
+
+def _read_destination_codes(root: ET.Element) -> List[str]:
+    destinations_elem = root.find('AvailDestinations')
+    if destinations_elem is None:
+        return []
+    return [code for code in map(_destination_code, destinations_elem) if code]
+
+
+def _read_rooms(root: ET.Element) -> List[Room]:
+    return [Room(pax.get("age", "0") for pax in room.iter('Pax')) for room in root.iter('Paxes') if room is not root]
+
+
+def _read_text(*tags: str) -> Callable[[ET.Element], Optional[str]]:
+    return lambda root: _element_text(_find_path(root, *tags))
+
+
+# How each AvailRequest field is read from a parsed root
+_ELEMENT_READERS: Dict[str, Callable[[ET.Element], Any]] = {
+    "timeout": _read_text('timeoutMilliseconds'),
+    "language_code": _read_text('source', 'languageCode'),
+    "options_quota": _read_text('optionsQuota'),
+    "parameters": _read_parameters,
+    "search_type": _read_text('SearchType'),
+    "destination_count": _read_destination_count,
+    "destination_codes": _read_destination_codes,
+    "start_date": _read_text('StartDate'),
+    "end_date": _read_text('EndDate'),
+    "currency": _read_text('Currency'),
+    "nationality": _read_text('Nationality'),
+    "rooms": _read_rooms,
+}
+
+
+class _ElementRequest(AvailRequest):
+    """
+    AvailRequest read from a parsed ElementTree root one field at a time, when the field
+    is first used, so a request turned down by an early check never reads the rest of
+    the tree. The tree is let go once every field has been read.
+    """
+    __slots__ = ("_root", "_unread")
+
+    def __init__(self, root: ET.Element) -> None:
+        self._root = root
+        self._unread = len(_ELEMENT_READERS)
+
+    def __getattr__(self, name: str) -> Any:
+        read = _ELEMENT_READERS.get(name)
+        if read is None:
+            raise AttributeError(name)
+        value = read(self._root)
+        setattr(self, name, value)
+        self._unread -= 1
+        if not self._unread:
+            self._root = None
+        return value
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, AvailRequest):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _ELEMENT_READERS)
+
+    __hash__ = None
+
+
+def request_from_element(root: ET.Element) -> AvailRequest:
+    """
+    Builds an AvailRequest from an already parsed ElementTree root. Each field is read
+    from the tree when it is first used (see _ElementRequest).
+    """
+    return _ElementRequest(root)
+
+
+def as_request(source: Union[AvailRequest, ET.Element]) -> AvailRequest:
+    """
+    Returns the request record for validators that are handed an ElementTree root.
+    """
+    if isinstance(source, AvailRequest):
+        return source
+    return request_from_element(source)
+
+
+def parse_request(
+    xml_str: Union[str, bytes],
+    parser: str = DEFAULT_PARSER,
+    limits: InputLimits = DEFAULT_LIMITS
+) -> AvailRequest:
+    """
+    Parses an AvailRQ document into an AvailRequest using the selected backend:
+    "expat" for the single-pass extractor or "etree" for a full ElementTree build.
+    Both backends enforce limits while parsing.
+    Raises ET.ParseError if the XML is invalid and InputLimitError if it crosses limits.
+    """
+    if parser == "expat":
+        return extract_request(xml_str, limits)
+    if parser == "etree":
+        return request_from_element(parse_xml(xml_str, limits))
+    raise ValueError(f"Unknown XML parser backend: {parser}")
+
+
+def extract_timeout(root: Union[AvailRequest, ET.Element]) -> int:
     """
     Extracts the timeoutMilliseconds element from the XML, if available.
     Returns 0 if not found.
     """
-    timeout_elem = root.find('timeoutMilliseconds')
-    if timeout_elem is not None and timeout_elem.text and timeout_elem.text.isdigit():
-        return int(timeout_elem.text)
+    timeout = as_request(root).timeout
+    if timeout and timeout.isdigit():
+        return int(timeout)
     return 0
 
 
+_ASCII_DIGITS = frozenset("0123456789")
+
+# Earliest accepted StartDate (today + 2 days), recomputed once per day
+EARLIEST_START_DATE = DayBoundary(days_ahead=2)
+
+
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
 def parse_date(date_str: str) -> datetime.date:
     """
     Parses a date string in dd/mm/yyyy format.
     Raises ValueError if the format is incorrect.
+    Plain ASCII "dd/mm/yyyy" strings are sliced directly; anything else goes through
+    strptime("%d/%m/%Y"), so the accepted strings are exactly the strptime ones.
+    Results are cached by the raw string.
     """
+    if (
+        len(date_str) == 10
+        and date_str[2] == "/"
+        and date_str[5] == "/"
+        and _ASCII_DIGITS.issuperset(date_str[:2] + date_str[3:5] + date_str[6:])
+    ):
+        return datetime.date(int(date_str[6:]), int(date_str[3:5]), int(date_str[:2]))
     return datetime.datetime.strptime(date_str, "%d/%m/%Y").date()
 
 
-def validate_dates(root: ET.Element) -> Tuple[datetime.date, datetime.date]:
+def validate_dates(root: Union[AvailRequest, ET.Element]) -> Tuple[datetime.date, datetime.date]:
     """
     Extracts and validates StartDate and EndDate.
     Ensures StartDate is at least 2 days after today and the stay is at least 3 nights.
     Raises ValueError if any condition is not met.
     """
-    start_date_elem = root.find('StartDate')
-    end_date_elem = root.find('EndDate')
+    request = as_request(root)
 
-    if start_date_elem is None or end_date_elem is None:
+    if request.start_date is None or request.end_date is None:
         raise ValueError("Missing StartDate or EndDate.")
 
     try:
-        start_date = parse_date(start_date_elem.text.strip())
-        end_date = parse_date(end_date_elem.text.strip())
+        start_date = parse_date(request.start_date.strip())
+        end_date = parse_date(request.end_date.strip())
     except ValueError:
         raise ValueError("Dates must be in dd/mm/yyyy format.")
 
-    today = datetime.date.today()
-    if (start_date - today).days < 2:
+    if start_date < EARLIEST_START_DATE.get():
         raise ValueError("StartDate must be at least 2 days after today.")
     if (end_date - start_date).days < 3:
         raise ValueError("The stay duration must be at least 3 nights.")
@@ -0,0 +1,57 @@
+import datetime
+import pytest
+from src.batch import process_requests
+from src.main import process_request
+from tests.test_main import create_full_xml
+
+def create_batch() -> list:
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    return [
+        create_full_xml(start, end),
+        "not xml",
+        create_full_xml(start, end, options_quota="60"),
+        create_full_xml(start, end, currency="GBP").encode(),
+        create_full_xml(start, end + datetime.timedelta(days=-1)),
+    ]
+
+def test_process_requests_serial_matches_process_request():
+    docs = create_batch()
+    assert list(process_requests(docs)) == [process_request(doc) for doc in docs]
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_process_requests_pooled_matches_serial(mode):
+    docs = create_batch() * 5
+    expected = list(process_requests(docs))
+    assert list(process_requests(iter(docs), mode=mode, max_workers=2, chunksize=3)) == expected
+
+def test_process_requests_empty():
+    assert list(process_requests([], mode="thread")) == []
+
+def test_process_requests_invalid_arguments():
+    with pytest.raises(ValueError, match="Unknown batch mode"):
+        process_requests([], mode="gpu")
+    with pytest.raises(ValueError, match="chunksize must be at least 1."):
+        process_requests([], mode="thread", chunksize=0)
+
+def create_room_batch() -> list:
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    rooms = [
+        '<Paxes><Pax age="30"/><Pax age="4"/></Paxes>',
+        '<Paxes><Pax age="3"/></Paxes>',
+        '<Paxes><Pax age="x"/></Paxes>',
+        '<Paxes><Pax age="30"/></Paxes>' * 6,
+    ]
+    docs = [create_full_xml(start, end).replace("</AvailRQ>", room + "</AvailRQ>") for room in rooms]
+    # Rejected by an earlier step as well as by the rooms
+    docs.append(create_full_xml(start, end, options_quota="60").replace("</AvailRQ>", rooms[1] + "</AvailRQ>"))
+    return docs + create_batch()
+
+@pytest.mark.parametrize("mode", ["serial", "thread"])
+def test_process_requests_columnar_matches_scalar(mode):
+    docs = create_room_batch() * 3
+    expected = [process_request(doc) for doc in docs]
+    assert list(process_requests(iter(docs), mode=mode, max_workers=2, chunksize=4, columnar=True)) == expected
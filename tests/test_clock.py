@@ -0,0 +1,17 @@
+import datetime
+from src.clock import DayBoundary
+
+def test_day_boundary_today_plus_days():
+    boundary = DayBoundary(days_ahead=2)
+    assert boundary.get() == datetime.date.today() + datetime.timedelta(days=2)
+
+def test_day_boundary_recomputed_at_local_midnight():
+    day = datetime.date(2030, 3, 14)
+    before_midnight = datetime.datetime.combine(day, datetime.time(23, 59, 59)).timestamp()
+    now = [before_midnight - 3600]
+    boundary = DayBoundary(days_ahead=2, clock=lambda: now[0])
+    assert boundary.get() == datetime.date(2030, 3, 16)
+    now[0] = before_midnight
+    assert boundary.get() == datetime.date(2030, 3, 16)
+    now[0] = before_midnight + 1
+    assert boundary.get() == datetime.date(2030, 3, 17)
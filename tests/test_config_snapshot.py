@@ -0,0 +1,85 @@
+import datetime
+import json
+import os
+import pytest
+from src import config_snapshot, configs
+from src.config_snapshot import ConfigReloader, ConfigSnapshot, current_snapshot, load_settings, reload_config
+from src.main import process_request_bytes
+from src.response_cache import RESPONSE_CACHE
+from tests.test_main import create_full_xml
+
+@pytest.fixture(autouse=True)
+def restore_snapshot(monkeypatch):
+    monkeypatch.setattr(config_snapshot, "_current", config_snapshot._current)
+    RESPONSE_CACHE.clear()
+    yield
+    RESPONSE_CACHE.clear()
+
+def write_config(path, settings):
+    path.write_text(json.dumps(settings))
+    return str(path)
+
+def create_request():
+    start = datetime.date.today() + datetime.timedelta(days=3)
+    return create_full_xml(start, start + datetime.timedelta(days=3))
+
+def test_load_settings_merges_defaults(tmp_path):
+    values = load_settings(write_config(tmp_path / "c.json", {"DEFAULT_MARKUP": 5, "VALID_LANGUAGES": ["en"]}))
+    assert values["DEFAULT_MARKUP"] == 5.0
+    assert values["VALID_LANGUAGES"] == {"en"}
+    assert values["MAX_OPTIONS_QUOTA"] == configs.MAX_OPTIONS_QUOTA
+
+@pytest.mark.parametrize("settings, message", [
+    ({"NO_SUCH_SETTING": 1}, "Unknown settings"),
+    ({"MAX_OPTIONS_QUOTA": "50"}, "must be of type int"),
+    ({"VALID_LANGUAGES": "en"}, "list of strings"),
+    ({"CONVERSION_RATES": {"USD": {"EUR": 0}}}, "positive rates"),
+    ([1, 2], "JSON object"),
+])
+def test_load_settings_rejects_bad_values(tmp_path, settings, message):
+    with pytest.raises(ValueError, match=message):
+        load_settings(write_config(tmp_path / "c.json", settings))
+
+def test_reload_bumps_version(tmp_path):
+    before = current_snapshot()
+    snapshot = reload_config(write_config(tmp_path / "c.json", {"MAX_OPTIONS_QUOTA": 10}))
+    assert snapshot.version == before.version + 1
+    assert current_snapshot() is snapshot
+    assert snapshot.rules.max_options_quota == 10
+    assert before.rules.max_options_quota == configs.MAX_OPTIONS_QUOTA
+
+def test_reloader_keeps_snapshot_on_invalid_file(tmp_path):
+    path = write_config(tmp_path / "c.json", {"DEFAULT_MARKUP": 4.0})
+    reloader = ConfigReloader(path)
+    assert reloader.check()
+    assert not reloader.check()
+    loaded = current_snapshot()
+
+    (tmp_path / "c.json").write_text("{not json")
+    os.utime(path, ns=(0, 0))
+    assert not reloader.check()
+    assert isinstance(reloader.last_error, ValueError)
+    assert current_snapshot() is loaded
+
+def test_markup_change_applies_after_reload(tmp_path):
+    xml_str = create_request()
+    before = json.loads(process_request_bytes(xml_str))
+    reload_config(write_config(tmp_path / "c.json", {"DEFAULT_MARKUP": 10.0}))
+    after = json.loads(process_request_bytes(xml_str))
+    assert before[0]["price"]["markup"] == configs.DEFAULT_MARKUP
+    assert after[0]["price"]["markup"] == 10.0
+
+def test_request_keeps_its_snapshot(tmp_path):
+    snapshot = current_snapshot()
+    reload_config(write_config(tmp_path / "c.json", {"DEFAULT_MARKUP": 10.0, "MAX_OPTIONS_QUOTA": 10}))
+    # A request that started before the reload still sees the old rules and prices
+    result = json.loads(process_request_bytes(create_request(), snapshot=snapshot))
+    assert len(result) == 20
+    assert result[0]["price"]["markup"] == configs.DEFAULT_MARKUP
+
+def test_snapshot_from_values_builds_every_part():
+    values = {name: getattr(configs, name) for name in config_snapshot.RELOADABLE_SETTINGS}
+    snapshot = ConfigSnapshot.from_values(values, version=7)
+    assert snapshot.version == 7
+    assert snapshot.limits == config_snapshot.DEFAULT_LIMITS
+    assert snapshot.pricing.markup == configs.DEFAULT_MARKUP
@@ -1,5 +1,7 @@
+import numpy as np
 import pytest
-from src.currency import convert_currency
+from src.configs import CONVERSION_RATES
+from src.currency import convert_currency, convert_many, RateMatrix, RATE_MATRIX
 
 def test_convert_currency_same():
     price, rate = convert_currency("USD", "USD", 100)
@@ -16,3 +18,53 @@ def test_convert_currency_fallback():
     price, rate = convert_currency("ABC", "DEF", 100)
     assert price == 100
     assert rate == 1.0
+
+def test_convert_currency_all_configured_pairs():
+    for (from_currency, to_currency), expected_rate in CONVERSION_RATES.items():
+        price, rate = convert_currency(from_currency, to_currency, 10.0)
+        assert rate == expected_rate
+        assert price == 10.0 * expected_rate
+
+def test_rate_matrix_triangulates_through_pivot():
+    matrix = RateMatrix({("USD", "EUR"): 0.9, ("USD", "GBP"): 0.75, ("CHF", "USD"): 1.25}, pivot="USD")
+    # EUR->USD is the inverse of the configured USD->EUR leg
+    assert matrix.rate("EUR", "USD") == pytest.approx(1 / 0.9)
+    assert matrix.rate("EUR", "GBP") == pytest.approx(0.75 / 0.9)
+    assert matrix.rate("CHF", "GBP") == pytest.approx(1.25 * 0.75)
+    assert matrix.rate("GBP", "GBP") == 1.0
+    # Configured pairs are kept as is
+    assert matrix.rate("USD", "EUR") == 0.9
+
+def test_rate_matrix_unreachable_and_unknown():
+    matrix = RateMatrix({("USD", "EUR"): 0.9, ("JPY", "CNY"): 0.05}, pivot="USD")
+    with pytest.raises(ValueError, match="No exchange rate from JPY to EUR."):
+        matrix.rate("JPY", "EUR")
+    with pytest.raises(KeyError):
+        matrix.rate("ABC", "USD")
+    with pytest.raises(ValueError):
+        matrix.matrix[0, 0] = 2.0
+
+def test_convert_many_matches_convert_currency():
+    pairs = [("USD", "EUR"), ("EUR", "GBP"), ("GBP", "GBP"), ("GBP", "USD")]
+    prices = np.array([100.0, 20.5, 3.0, 132.42])
+    from_ids = RATE_MATRIX.currency_ids(source for source, _ in pairs)
+    to_ids = RATE_MATRIX.currency_ids(target for _, target in pairs)
+    converted, rates = convert_many(prices, from_ids, to_ids)
+    for index, (source, target) in enumerate(pairs):
+        assert (converted[index], rates[index]) == convert_currency(source, target, prices[index])
+
+def test_convert_many_broadcasts_single_pair():
+    usd, eur = RATE_MATRIX.currency_ids(["USD", "EUR"])
+    converted, rates = convert_many([10.0, 20.0], usd, eur)
+    assert converted.tolist() == [9.0, 18.0]
+    assert rates.tolist() == [0.9, 0.9]
+
+def test_rate_units():
+    assert RATE_MATRIX.rate_units("USD", "EUR") == 900_000
+    assert RATE_MATRIX.rate_units("GBP", "GBP") == 1_000_000
+    matrix = RateMatrix({("USD", "EUR"): 0.9, ("JPY", "CNY"): 0.05}, pivot="USD")
+    assert matrix.rate_units("EUR", "USD") == 1_111_111
+    with pytest.raises(ValueError, match="No exchange rate from JPY to EUR."):
+        matrix.rate_units("JPY", "EUR")
+    with pytest.raises(ValueError):
+        matrix.units[0, 0] = 2
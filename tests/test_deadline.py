@@ -0,0 +1,49 @@
+import time
+import pytest
+from src.deadline import Deadline, DeadlineExceeded, StageBudgetStats
+
+def test_deadline_without_timeout_never_expires():
+    deadline = Deadline(0, started=time.monotonic() - 1000)
+    deadline.check("parse")
+    assert deadline.remaining_ms() is None
+    assert [stage for stage, _ in deadline.stages] == ["parse"]
+
+def test_deadline_check_raises_when_spent():
+    deadline = Deadline(50, started=time.monotonic() - 1)
+    assert deadline.remaining_ms() == 0.0
+    with pytest.raises(DeadlineExceeded) as excinfo:
+        deadline.check("validate_dates")
+    assert excinfo.value.stage == "validate_dates"
+    assert excinfo.value.timeout_ms == 50
+    assert excinfo.value.elapsed_ms >= 1000
+
+def test_deadline_set_timeout_after_start():
+    deadline = Deadline()
+    deadline.set_timeout(60000)
+    deadline.check("parse")
+    assert 0 < deadline.remaining_ms() <= 60000
+
+def test_stage_budget_stats():
+    stats = StageBudgetStats()
+    deadline = Deadline(100)
+    deadline.stages = [("parse", 10.0), ("offer", 30.0)]
+    stats.record(deadline)
+    stats.record(deadline, exceeded_stage="offer")
+    snapshot = stats.snapshot()
+    assert snapshot["parse"]["calls"] == 2
+    assert snapshot["parse"]["mean_ms"] == 10.0
+    assert snapshot["offer"]["max_ms"] == 30.0
+    assert snapshot["offer"]["budget_share"] == pytest.approx(0.6)
+    assert snapshot["offer"]["deadline_exceeded"] == 1
+    assert snapshot["parse"]["deadline_exceeded"] == 0
+    stats.reset()
+    assert stats.snapshot() == {}
+
+def test_deadline_mark_records_without_raising():
+    deadline = Deadline(50, started=time.monotonic() - 1)
+    deadline.mark("offer")
+    assert [stage for stage, _ in deadline.stages] == ["offer"]
+    with pytest.raises(DeadlineExceeded) as excinfo:
+        deadline.enforce("serialize")
+    assert excinfo.value.stage == "serialize"
+    assert len(deadline.stages) == 1
@@ -0,0 +1,108 @@
+import datetime
+import json
+import pytest
+from src import validation_plan
+from src.feed import RequestFeed, process_chunks
+from src.main import process_request_bytes
+from src.xml_parser import InputLimits
+from tests.test_main import create_full_xml
+
+@pytest.fixture(autouse=True)
+def fixed_plan(monkeypatch):
+    # The feed and process_request_bytes must see the same plan order
+    monkeypatch.setattr(validation_plan, "VALIDATION_REORDER_INTERVAL", 0)
+    monkeypatch.setattr(validation_plan, "_active_plan", validation_plan.compile_validation_plan())
+
+def create_body(**kwargs) -> bytes:
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    return create_full_xml(start, end, **kwargs).encode()
+
+def split(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+def consumed_until_result(body: bytes, size: int):
+    # Returns the response and how many chunks process_chunks pulled
+    pulled = []
+
+    def chunks():
+        for chunk in split(body, size):
+            pulled.append(chunk)
+            yield chunk
+
+    return json.loads(process_chunks(chunks())), len(pulled), len(split(body, size))
+
+@pytest.mark.parametrize("size", [1, 7, 64, 100000])
+@pytest.mark.parametrize("body", [
+    create_body(),
+    create_body(currency="GBP", language="fr", options_quota="5"),
+    create_body(search_type="Single", destinations="<AvailDestinations><Destination/></AvailDestinations>"),
+    b"not xml",
+    b"<AvailRQ><StartDate>01/01/2000</StartDate></AvailRQ>",
+])
+def test_process_chunks_matches_process_request(body, size):
+    assert process_chunks(split(body, size)) == process_request_bytes(body)
+
+@pytest.mark.parametrize("body, message", [
+    (create_body(options_quota="60"), "optionsQuota cannot be greater than 50."),
+    (create_body().replace(b'password="pass" ', b""), "Missing required parameters: password, username, or CompanyID."),
+    (create_body(search_type="Single", destinations="<AvailDestinations><A/><B/></AvailDestinations>"),
+     "For Single search type, exactly one AvailDestination is required."),
+])
+def test_process_chunks_rejects_early(body, message):
+    data, pulled, total = consumed_until_result(body, 16)
+    assert data == {"error": message}
+    assert pulled < total
+
+def test_process_chunks_rejects_rooms_before_end():
+    # The room count is decided once quota, search type and credentials have passed
+    rooms = "".join('<Paxes><Pax age="30"/></Paxes>' for _ in range(6))
+    body = create_body(destinations=rooms) + b" " * 200
+    data, pulled, total = consumed_until_result(body, 16)
+    assert data == {"error": "Exceeded maximum allowed room count."}
+    assert pulled < total
+    assert process_request_bytes(body) == process_chunks([body])
+
+CHILD_ONLY_ROOM = '<Paxes><Pax age="3"/></Paxes>'
+
+@pytest.mark.parametrize("body", [
+    # Credentials come before rooms in the plan, and their absence is only known at the end
+    b"<AvailRQ><optionsQuota>5</optionsQuota>" + CHILD_ONLY_ROOM.encode() + b"</AvailRQ>",
+    # The quota comes first in the plan whichever element arrives first
+    b"<AvailRQ>" + CHILD_ONLY_ROOM.encode() + b"<optionsQuota>51</optionsQuota></AvailRQ>",
+    b"<AvailRQ>" + "".join([CHILD_ONLY_ROOM] * 6).encode() + b"<optionsQuota>51</optionsQuota></AvailRQ>",
+    b"<AvailRQ><StartDate>01/01/2000</StartDate><EndDate>01/02/2000</EndDate><optionsQuota>7</optionsQuota></AvailRQ>",
+    create_body(destinations=CHILD_ONLY_ROOM),
+    create_body(destinations="".join([CHILD_ONLY_ROOM] * 6)),
+    create_body(search_type="Single", destinations="<AvailDestinations><A/><B/></AvailDestinations>" + CHILD_ONLY_ROOM),
+    create_body(include_required_params=False, options_quota="60"),
+])
+def test_process_chunks_answer_does_not_depend_on_chunk_boundaries(body):
+    expected = process_request_bytes(body)
+    for offset in range(len(body) + 1):
+        assert process_chunks([body[:offset], body[offset:]]) == expected, offset
+    assert process_chunks(split(body, 1)) == expected
+
+def test_process_chunks_rejects_malformed_prefix():
+    data, pulled, total = consumed_until_result(b"<AvailRQ><a></b>" + b" " * 200 + b"</AvailRQ>", 16)
+    assert data == {"error": "Invalid XML format."}
+    assert pulled < total
+
+def test_request_feed_size_limit():
+    feed = RequestFeed(InputLimits(max_bytes=20, max_elements=100, max_depth=10, max_paxes=10, max_pax=10))
+    assert feed.feed(b"<AvailRQ>") is None
+    assert json.loads(feed.feed(b" " * 20)) == {"error": "Request exceeds the maximum size."}
+    assert feed.close() == feed.error
+
+def test_request_feed_waits_for_closed_fields():
+    feed = RequestFeed()
+    # The quota element is still open, so its text may continue
+    assert feed.feed(b"<AvailRQ><optionsQuota>6") is None
+    assert json.loads(feed.feed(b"0</optionsQuota>")) == {"error": "optionsQuota cannot be greater than 50."}
+
+def test_request_feed_dates_checked_after_close():
+    feed = RequestFeed()
+    assert feed.feed(create_body()) is None
+    assert feed.close() is None
+    assert isinstance(json.loads(process_request_bytes(feed.request)), list)
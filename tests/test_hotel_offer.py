@@ -1,4 +1,4 @@
-from src.hotel_offer import simulate_hotel_offer
+from src.hotel_offer import simulate_hotel_offer, simulate_hotel_offers
 
 def test_simulate_hotel_offer():
     offer = simulate_hotel_offer("EUR", "US")
@@ -11,3 +11,10 @@ def test_simulate_hotel_offer():
     price = offer["price"]
     for key in ["minimumSellingPrice", "currency", "net", "selling_price", "selling_currency", "markup", "exchange_rate"]:
         assert key in price
+
+def test_simulate_hotel_offers():
+    offers = simulate_hotel_offers("GBP", "GB", 5)
+    assert [offer["id"] for offer in offers] == ["A#1", "A#2", "A#3", "A#4", "A#5"]
+    assert offers[0] == simulate_hotel_offer("GBP", "GB")
+    prices = [offer["price"]["selling_price"] for offer in offers]
+    assert prices == sorted(prices)
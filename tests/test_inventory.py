@@ -0,0 +1,91 @@
+import datetime
+import json
+import mmap
+import pytest
+from src import config_snapshot
+from src.config_snapshot import reload_config
+from src.inventory import Inventory, open_inventory, write_inventory
+from src.main import process_request_bytes
+from src.response_cache import RESPONSE_CACHE
+from tests.test_main import create_full_xml
+
+HOTELS = [
+    ("PMI", 30, 4),
+    ("BCN", 20, 3),
+    ("PMI", 10, 5),
+    ("MAD", 40, 2),
+    ("PMI", 20, 3),
+]
+
+@pytest.fixture
+def inventory_path(tmp_path):
+    path = str(tmp_path / "hotels.inv")
+    write_inventory(path, HOTELS)
+    return path
+
+def test_lookup_by_destination(inventory_path):
+    inventory = open_inventory(inventory_path)
+    assert len(inventory) == 5
+    assert inventory.destination_count == 3
+    assert inventory.hotels_for("PMI").tolist() == [10, 20, 30]
+    assert inventory.hotels_for("BCN").tolist() == [20]
+    assert inventory.records_for("PMI")["category"].tolist() == [5, 3, 4]
+    for missing in ("AAA", "ZZZ", "PMIX", "", "TOOLONGCODE", "PMÍ"):
+        assert len(inventory.hotels_for(missing)) == 0
+
+def test_lookups_are_views_into_the_mapping(inventory_path):
+    inventory = open_inventory(inventory_path)
+    view = inventory.hotels_for("PMI")
+    assert not view.flags.owndata
+    assert not view.flags.writeable
+    base = view
+    while isinstance(base, type(view)):
+        base = base.base
+    assert isinstance(base.obj, mmap.mmap)
+
+def test_resolve_several_destinations(inventory_path):
+    inventory = open_inventory(inventory_path)
+    assert inventory.resolve(["MAD", "PMI", "MAD"]).tolist() == [40, 10, 20, 30]
+    assert inventory.resolve([]).tolist() == []
+
+def test_rejects_other_files(tmp_path, inventory_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not an inventory file at all")
+    with pytest.raises(ValueError, match="Not an inventory file"):
+        Inventory(str(path))
+    truncated = tmp_path / "truncated.inv"
+    truncated.write_bytes(open(inventory_path, "rb").read()[:-1])
+    with pytest.raises(ValueError, match="Not an inventory file"):
+        Inventory(str(truncated))
+
+def test_rejects_invalid_destination_codes(tmp_path):
+    with pytest.raises(ValueError, match="Invalid destination code"):
+        write_inventory(str(tmp_path / "x.inv"), [("TOOLONGCODE", 1, 0)])
+
+def test_empty_inventory(tmp_path):
+    path = str(tmp_path / "empty.inv")
+    assert write_inventory(path, []) == 0
+    assert len(open_inventory(path).hotels_for("PMI")) == 0
+
+def test_request_destinations_resolve_to_inventory_hotels(tmp_path, inventory_path, monkeypatch):
+    monkeypatch.setattr(config_snapshot, "_current", config_snapshot._current)
+    RESPONSE_CACHE.clear()
+    settings = tmp_path / "settings.json"
+    settings.write_text(json.dumps({"INVENTORY_FILE": inventory_path}))
+    reload_config(str(settings))
+
+    start = datetime.date.today() + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    xml_str = create_full_xml(
+        start, end, destinations='<AvailDestinations><Destination code="PMI"/></AvailDestinations>'
+    )
+    offers = json.loads(process_request_bytes(xml_str))
+    assert [offer["hotelCodeSupplier"] for offer in offers] == ["10", "20", "30"]
+    # A different destination is a different cache entry
+    other = xml_str.replace('code="PMI"', 'code="BCN"')
+    assert [offer["hotelCodeSupplier"] for offer in json.loads(process_request_bytes(other))] == ["20"]
+    unknown = xml_str.replace('code="PMI"', 'code="XYZ"')
+    assert json.loads(process_request_bytes(unknown)) == []
+    # Without destinations the offers stay simulated
+    assert len(json.loads(process_request_bytes(create_full_xml(start, end)))) == 20
+    RESPONSE_CACHE.clear()
@@ -1,5 +1,6 @@
 import json
 import datetime
+import time
 import pytest
 from src.main import process_request
 
@@ -113,3 +114,166 @@ def test_process_request_secret_handshake_failure(monkeypatch):
     data = json.loads(result)
     assert "error" in data
     assert "Secret handshake verification failed." in data["error"]
+
+def test_process_request_parser_backends_match():
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    for xml_str in (create_full_xml(start, end), create_full_xml(start, end, options_quota="60"), "not xml"):
+        assert process_request(xml_str, parser="expat") == process_request(xml_str, parser="etree")
+
+def test_process_request_deadline_exceeded():
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    xml_str = create_full_xml(start, end)
+    # create_full_xml asks for a 25000 ms timeout; the request arrived 30 s ago
+    result = process_request(xml_str, received_at=time.monotonic() - 30)
+    data = json.loads(result)
+    assert data == {"error": "Request deadline exceeded.", "stage": "parse", "timeoutMilliseconds": 25000}
+
+def test_process_request_records_stage_budget():
+    from src.deadline import STAGE_BUDGET
+    from src.response_cache import RESPONSE_CACHE
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    RESPONSE_CACHE.clear()
+    STAGE_BUDGET.reset()
+    process_request(create_full_xml(start, end))
+    stages = STAGE_BUDGET.snapshot()
+    for stage in ("parse", "validate_dates", "validate_rooms_and_passengers", "offer", "serialize"):
+        assert stages[stage]["calls"] == 1
+
+def test_process_request_returns_options_quota_offers():
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    for quota in ("1", "20", "50"):
+        data = json.loads(process_request(create_full_xml(start, end, options_quota=quota)))
+        assert len(data) == int(quota)
+        assert len({offer["id"] for offer in data}) == int(quota)
+    # As before the engine priced several offers, a quota of 0 gets one offer
+    data = json.loads(process_request(create_full_xml(start, end, options_quota="0")))
+    assert [offer["id"] for offer in data] == ["A#1"]
+
+def test_process_request_compact_by_default():
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    xml_str = create_full_xml(start, end)
+    compact = process_request(xml_str)
+    pretty = process_request(xml_str, compact=False)
+    assert "\n" not in compact
+    assert pretty == json.dumps(json.loads(compact), indent=2)
+    assert compact == json.dumps(json.loads(pretty), separators=(",", ":"))
+    assert process_request("not xml", compact=False) == '{"error": "Invalid XML format."}'
+
+def test_process_request_response_cache():
+    from src.response_cache import RESPONSE_CACHE
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    RESPONSE_CACHE.clear()
+    first = process_request(create_full_xml(start, end, currency="GBP"))
+    hits = RESPONSE_CACHE.hits
+    # Different language and whitespace, same priced fields
+    second = process_request(create_full_xml(start, end, currency="GBP", language="fr").replace("    ", ""))
+    assert second == first
+    assert RESPONSE_CACHE.hits == hits + 1
+    assert process_request(create_full_xml(start, end, currency="EUR")) != first
+
+def test_process_request_coalesces_concurrent_duplicates(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from src import main
+    from src.response_cache import RESPONSE_CACHE
+    from src.singleflight import OFFER_FLIGHTS
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    xml_str = create_full_xml(start, end, currency="GBP", options_quota="7")
+    RESPONSE_CACHE.clear()
+    expected = process_request(xml_str)
+    RESPONSE_CACHE.clear()
+
+    release = threading.Event()
+    calls = []
+    price_offers = main.price_offers
+
+    def slow_price_offers(*args):
+        calls.append(args)
+        release.wait(5)
+        return price_offers(*args)
+
+    monkeypatch.setattr(main, "price_offers", slow_price_offers)
+    shared_before = OFFER_FLIGHTS.shared
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(process_request, xml_str) for _ in range(4)]
+        while OFFER_FLIGHTS.shared < shared_before + 3:
+            time.sleep(0.001)
+        release.set()
+        assert [future.result() for future in futures] == [expected] * 4
+    assert len(calls) == 1
+
+def test_process_request_shared_wait_respects_deadline(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from src import main
+    from src.response_cache import RESPONSE_CACHE
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    RESPONSE_CACHE.clear()
+
+    release = threading.Event()
+    price_offers = main.price_offers
+
+    def slow_price_offers(*args):
+        release.wait(5)
+        return price_offers(*args)
+
+    monkeypatch.setattr(main, "price_offers", slow_price_offers)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        xml_str = create_full_xml(start, end, currency="EUR", options_quota="3")
+        leader = pool.submit(process_request, xml_str)
+        while not main.OFFER_FLIGHTS.in_flight():
+            time.sleep(0.001)
+        # 100 ms left of the 25000 ms budget when the follower starts waiting
+        follower = json.loads(process_request(xml_str, received_at=time.monotonic() - 24.9))
+        release.set()
+        assert isinstance(json.loads(leader.result()), list)
+    assert follower["stage"] == "single_flight"
+
+def test_process_request_rejects_dtd():
+    xml_str = '<!DOCTYPE AvailRQ [<!ENTITY a "aaaa">]><AvailRQ>&a;</AvailRQ>'
+    for parser in ("expat", "etree"):
+        assert json.loads(process_request(xml_str, parser)) == {"error": "DTD and entity declarations are not allowed."}
+
+def test_write_response_streams_fresh_offers(monkeypatch):
+    from functools import partial
+    from src import main as main_module
+    from src.main import process_request_bytes, write_response
+    from src.response_cache import RESPONSE_CACHE
+    from src.serialization import write_offers
+    RESPONSE_CACHE.clear()
+    writes = []
+
+    class Recorder:
+        def write(self, payload):
+            writes.append(payload)
+
+    monkeypatch.setattr(main_module, "write_offers", partial(write_offers, buffer_size=0))
+    today = datetime.date.today()
+    xml_str = create_full_xml(today + datetime.timedelta(days=3), today + datetime.timedelta(days=6), options_quota="5")
+    written = write_response(xml_str, Recorder())
+    # One write per offer plus the closing bracket, then the same bytes from the cache in one write
+    assert len(writes) == 6
+    assert b"".join(writes) == process_request_bytes(xml_str)
+    assert written == len(b"".join(writes))
+    writes.clear()
+    assert write_response(xml_str, Recorder()) == written and len(writes) == 1
+    out = bytearray()
+    write_response(b"not xml", out)
+    assert json.loads(out) == {"error": "Invalid XML format."}
+    RESPONSE_CACHE.clear()
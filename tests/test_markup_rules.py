@@ -0,0 +1,114 @@
+import datetime
+import json
+import pytest
+from src import config_snapshot
+from src.config_snapshot import reload_config
+from src.main import process_request_bytes
+from src.markup_rules import MarkupRule, MarkupRuleIndex, load_markup_rules
+from src.response_cache import RESPONSE_CACHE
+from tests.test_main import create_full_xml
+
+HEADER = "company_id,market,currency,start_date,end_date,markup\n"
+
+def day(month, date):
+    return datetime.date(2030, month, date)
+
+def test_most_specific_key_wins():
+    index = MarkupRuleIndex([
+        MarkupRule(None, None, None, 1.0),
+        MarkupRule(None, "US", None, 2.0),
+        MarkupRule(None, "US", "EUR", 3.0),
+        MarkupRule(7, None, None, 4.0),
+        MarkupRule(7, "US", "EUR", 5.0),
+    ])
+    assert index.markup_for(7, "US", "EUR", day(1, 1)) == 5.0
+    assert index.markup_for(7, "GB", "EUR", day(1, 1)) == 4.0
+    assert index.markup_for(8, "US", "EUR", day(1, 1)) == 3.0
+    assert index.markup_for(8, "US", "GBP", day(1, 1)) == 2.0
+    assert index.markup_for(8, "CA", "GBP", day(1, 1)) == 1.0
+    assert len(index) == 5
+
+def test_date_ranges_fall_back_outside_their_dates():
+    index = MarkupRuleIndex([
+        MarkupRule(7, None, None, 10.0, day(6, 1), day(8, 31)),
+        MarkupRule(None, None, None, 1.0),
+    ])
+    assert index.markup_for(7, "US", "EUR", day(5, 31)) == 1.0
+    assert index.markup_for(7, "US", "EUR", day(6, 1)) == 10.0
+    assert index.markup_for(7, "US", "EUR", day(8, 31)) == 10.0
+    assert index.markup_for(7, "US", "EUR", day(9, 1)) == 1.0
+    assert MarkupRuleIndex([]).markup_for(7, "US", "EUR", day(1, 1)) is None
+
+def test_overlapping_ranges_narrowest_then_last_wins():
+    index = MarkupRuleIndex([
+        MarkupRule(7, None, None, 5.0, day(1, 1), day(12, 31)),
+        MarkupRule(7, None, None, 9.0, day(7, 1), day(7, 31)),
+        MarkupRule(7, None, None, 8.0, day(7, 10), day(7, 12)),
+        MarkupRule(7, None, None, 6.0, day(7, 10), day(7, 12)),
+    ])
+    assert index.markup_for(7, None, None, day(6, 30)) == 5.0
+    assert index.markup_for(7, None, None, day(7, 9)) == 9.0
+    assert index.markup_for(7, None, None, day(7, 11)) == 6.0
+    assert index.markup_for(7, None, None, day(7, 13)) == 9.0
+    assert index.markup_for(7, None, None, day(8, 1)) == 5.0
+
+def test_load_markup_rules(tmp_path):
+    path = tmp_path / "rules.csv"
+    path.write_text(HEADER + "123456,*,,2030-06-01,2030-06-30,7.5\n,US,EUR,,,2\n")
+    index = load_markup_rules(str(path))
+    assert index.markup_for(123456, "GB", "USD", day(6, 15)) == 7.5
+    assert index.markup_for(1, "US", "EUR", day(6, 15)) == 2.0
+
+def test_markup_periods_match_markup_for_each_night():
+    index = MarkupRuleIndex([
+        MarkupRule(7, None, None, 5.0, day(1, 1), day(12, 31)),
+        MarkupRule(7, None, None, 9.0, day(7, 1), day(7, 31)),
+        MarkupRule(7, "US", None, 8.0, day(7, 10), day(7, 12)),
+        MarkupRule(None, "US", None, 2.0),
+    ])
+    for company_id, start, end in [(7, day(6, 20), day(8, 5)), (7, day(7, 11), day(7, 14)), (8, day(7, 1), day(7, 8))]:
+        periods = index.markup_periods(company_id, "US", "EUR", start, end)
+        nights = [start + datetime.timedelta(days=offset) for offset in range((end - start).days)]
+        assert [
+            markup for first, last, markup in periods for _ in range((last - first).days)
+        ] == [index.markup_for(company_id, "US", "EUR", night) for night in nights]
+        assert periods[0][0] == start and periods[-1][1] == end
+        assert all(periods[i][2] != periods[i + 1][2] for i in range(len(periods) - 1))
+    assert index.markup_periods(7, "US", "EUR", day(6, 20), day(8, 5)) == [
+        (day(6, 20), day(7, 1), 5.0),
+        (day(7, 1), day(7, 10), 9.0),
+        (day(7, 10), day(7, 13), 8.0),
+        (day(7, 13), day(8, 1), 9.0),
+        (day(8, 1), day(8, 5), 5.0),
+    ]
+    assert index.markup_periods(9, "GB", "EUR", day(1, 1), day(1, 4)) == [(day(1, 1), day(1, 4), None)]
+    assert index.markup_periods(9, "GB", "EUR", day(1, 4), day(1, 4)) == []
+
+@pytest.mark.parametrize("content, message", [
+    ("company_id,markup\n1,2\n", "missing columns"),
+    (HEADER + "abc,,,,,2\n", "line 2"),
+    (HEADER + "1,,,2030-02-01,2030-01-01,2\n", "after end_date"),
+    (HEADER + "1,,,,,\n", "markup is required"),
+])
+def test_load_markup_rules_rejects_bad_files(tmp_path, content, message):
+    path = tmp_path / "rules.csv"
+    path.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        load_markup_rules(str(path))
+
+def test_company_markup_applies_to_responses(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_snapshot, "_current", config_snapshot._current)
+    RESPONSE_CACHE.clear()
+    rules = tmp_path / "rules.csv"
+    rules.write_text(HEADER + "123456,US,,,,12.5\n")
+    settings = tmp_path / "settings.json"
+    settings.write_text(json.dumps({"MARKUP_RULES_FILE": str(rules)}))
+    reload_config(str(settings))
+
+    start = datetime.date.today() + datetime.timedelta(days=3)
+    xml_str = create_full_xml(start, start + datetime.timedelta(days=3))
+    other_company = xml_str.replace('CompanyID="123456"', 'CompanyID="654321"')
+    assert json.loads(process_request_bytes(xml_str))[0]["price"]["markup"] == 12.5
+    # Same fingerprint, different company: must not be served the cached response
+    assert json.loads(process_request_bytes(other_company))[0]["price"]["markup"] == 3.2
+    RESPONSE_CACHE.clear()
@@ -0,0 +1,94 @@
+import random
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+import numpy as np
+import pytest
+from src import configs
+from src.money import (
+    divide_rounded,
+    from_minor_units,
+    price_minor_units,
+    to_markup_units,
+    to_minor_units,
+    to_rate_units
+)
+from src.pricing import PricingConfig, price_offers
+
+def decimal_price(net, markup, rate, rounding):
+    exact = Decimal(net) * (1 + Decimal(markup) / 10**6) * Decimal(rate) / 10**6
+    return int(exact.to_integral_value(rounding))
+
+def random_inputs(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        (rng.randrange(1, 10**7), rng.randrange(-200_000, 500_000), rng.randrange(1, 3 * 10**6))
+        for _ in range(count)
+    ]
+
+def test_conversions():
+    assert to_minor_units(132.42) == 13242
+    assert to_minor_units(np.float64(0.29)) == 29
+    assert to_minor_units(0.125) == 12
+    assert to_minor_units(0.125, ROUND_HALF_UP) == 13
+    assert to_rate_units(0.9) == 900_000
+    assert to_rate_units(1 / 0.9) == 1_111_111
+    assert to_markup_units(3.2) == 32_000
+    assert from_minor_units(13242) == 132.42
+    assert from_minor_units(np.array([13242, 5])).tolist() == [132.42, 0.05]
+    with pytest.raises(ValueError, match="Unsupported rounding mode"):
+        to_minor_units(1.0, "ROUND_CEILING")
+
+@pytest.mark.parametrize("rounding, expected", [
+    (ROUND_HALF_EVEN, [0, 2, 2, 2, -2, -2, 1, -1]),
+    (ROUND_HALF_UP, [1, 2, 3, 2, -3, -2, 1, -1]),
+])
+def test_divide_rounded_ties(rounding, expected):
+    numerators = [1, 3, 5, 4, -5, -3, 2, -2]
+    assert [divide_rounded(n, 2, rounding) for n in numerators] == expected
+    assert divide_rounded(np.array(numerators), 2, rounding).tolist() == expected
+
+@pytest.mark.parametrize("rounding", [ROUND_HALF_EVEN, ROUND_HALF_UP])
+def test_price_matches_decimal(rounding):
+    inputs = random_inputs(2000)
+    expected = [decimal_price(net, markup, rate, rounding) for net, markup, rate in inputs]
+    assert [price_minor_units(net, markup, rate, rounding) for net, markup, rate in inputs] == expected
+    nets, markups, rates = (np.array(column, dtype=np.int64) for column in zip(*inputs))
+    assert price_minor_units(nets, markups, rates, rounding).tolist() == expected
+
+def test_price_ties_follow_rounding_mode():
+    # 1.01 at half the rate is 0.505
+    assert price_minor_units(101, 0, 500_000, ROUND_HALF_EVEN) == 50
+    assert price_minor_units(101, 0, 500_000, ROUND_HALF_UP) == 51
+
+def test_large_batches_do_not_overflow():
+    nets = np.array([10**12, 3, 10**15], dtype=np.int64)
+    prices = price_minor_units(nets, 32_000, 1_300_000)
+    assert prices.dtype == np.int64
+    assert prices.tolist() == [decimal_price(int(net), 32_000, 1_300_000, ROUND_HALF_EVEN) for net in nets]
+
+def test_float_path_drifts_by_at_most_a_cent_at_ties():
+    # Round markups and rates, as configured, often make the exact price a half cent
+    rng = random.Random(2)
+    mismatches = 0
+    for _ in range(20_000):
+        net = rng.randrange(1, 10**6)
+        markup = rng.choice([0, 32_000, 50_000, 125_000])
+        rate = rng.choice([250_000, 500_000, 750_000, 1_250_000])
+        float_price = round(round(net / 100 * (1 + markup / 10**6) * (rate / 10**6), 2) * 100)
+        exact = Decimal(net) * (1 + Decimal(markup) / 10**6) * Decimal(rate) / 10**6
+        integer_price = price_minor_units(net, markup, rate)
+        assert integer_price == decimal_price(net, markup, rate, ROUND_HALF_EVEN)
+        if float_price != integer_price:
+            mismatches += 1
+            assert abs(float_price - integer_price) == 1
+            assert exact % 1 == Decimal("0.5")
+    assert mismatches > 0
+
+def test_price_offers_uses_configured_rounding():
+    values = dict(vars(configs), DEFAULT_NET_PRICE=1.01, SIMULATED_PRICE_STEP=0.0, DEFAULT_MARKUP=0.0,
+                  CONVERSION_RATES={("USD", "EUR"): 0.5})
+    half_even = PricingConfig.from_configs(values)
+    half_up = PricingConfig.from_configs(dict(values, MONEY_ROUNDING=ROUND_HALF_UP))
+    assert price_offers("EUR", "US", 2, half_even).selling_price.tolist() == [0.5, 0.5]
+    assert price_offers("EUR", "US", 2, half_up).selling_price.tolist() == [0.51, 0.51]
+    with pytest.raises(ValueError, match="Unsupported rounding mode"):
+        PricingConfig.from_configs(dict(values, MONEY_ROUNDING="ROUND_FLOOR"))
@@ -0,0 +1,68 @@
+import random
+from src.offer_selection import Offer, TopOffers, iter_offers, select_cheapest
+from src.pricing import price_offers
+
+def offer(hotel_code, selling_price, rooms=()):
+    return Offer(hotel_code, selling_price, 0.0, selling_price, 1.0, rooms)
+
+def test_keeps_k_cheapest_in_order():
+    offers = [offer(code, price) for code, price in enumerate([50.0, 10.0, 40.0, 30.0, 20.0])]
+    assert [o.selling_price for o in select_cheapest(iter(offers), 3)] == [10.0, 20.0, 30.0]
+
+def test_equal_prices_keep_first_arrival():
+    offers = [offer(1, 10.0), offer(2, 10.0), offer(3, 10.0)]
+    assert [o.hotel_code for o in select_cheapest(offers, 2)] == [1, 2]
+
+def test_duplicate_keeps_cheaper_offer():
+    top = TopOffers(3)
+    assert top.add(offer(1, 30.0))
+    assert not top.add(offer(1, 35.0))
+    assert top.add(offer(1, 25.0))
+    assert top.add(offer(2, 40.0))
+    assert [(o.hotel_code, o.selling_price) for o in top.offers()] == [(1, 25.0), (2, 40.0)]
+    assert len(top) == 2
+
+def test_same_hotel_different_rooms_are_distinct():
+    top = TopOffers(5)
+    top.add_all([offer(1, 30.0, ((30, 30),)), offer(1, 20.0, ((30,), (30,)))])
+    assert len(top) == 2
+
+def test_evicted_hotel_can_come_back_cheaper():
+    top = TopOffers(2)
+    top.add_all([offer(1, 50.0), offer(2, 20.0), offer(3, 30.0)])
+    assert [o.hotel_code for o in top.offers()] == [2, 3]
+    top.add(offer(1, 10.0))
+    assert [o.hotel_code for o in top.offers()] == [1, 2]
+
+def test_matches_sorting_everything():
+    rng = random.Random(7)
+    offers = [offer(rng.randrange(300), round(rng.uniform(10, 500), 2)) for _ in range(5000)]
+    cheapest = {}
+    for position, candidate in enumerate(offers):
+        best = cheapest.get(candidate.hotel_code)
+        if best is None or candidate.selling_price < best[0]:
+            cheapest[candidate.hotel_code] = (candidate.selling_price, position, candidate)
+    expected = [entry[2] for entry in sorted(cheapest.values())[:20]]
+    assert select_cheapest((o for o in offers), 20) == expected
+
+def test_heap_stays_bounded_under_many_replacements():
+    top = TopOffers(3)
+    for price in range(1000, 0, -1):
+        top.add(offer(price % 3, float(price)))
+    assert len(top._heap) <= 2 * top.k + 1
+    assert [o.selling_price for o in top.offers()] == [1.0, 2.0, 3.0]
+
+def test_add_batch_filters_on_threshold():
+    top = TopOffers(3)
+    top.add_batch(price_offers("EUR", "US", 10))
+    top.add_batch(price_offers("EUR", "US", 10))
+    assert len(top) == 3
+    assert [o.hotel_code for o in top.offers()] == [39971881, 39971882, 39971883]
+    batch = top.to_batch("USD", "EUR", "US")
+    assert batch.hotel_codes.tolist() == [39971881, 39971882, 39971883]
+    assert list(iter_offers(batch)) == top.offers()
+
+def test_zero_quota_keeps_nothing():
+    top = TopOffers(0)
+    top.add_batch(price_offers("EUR", "US", 5))
+    assert top.offers() == []
@@ -0,0 +1,58 @@
+import numpy as np
+from src.configs import DEFAULT_NET_PRICE, DEFAULT_MARKUP, SIMULATED_HOTEL_CODE
+from src.currency import convert_currency
+from src.pricing import price_offers, simulate_net_prices
+
+def test_price_offers_honours_quota():
+    for quota in (0, 1, 20, 50):
+        offers = price_offers("EUR", "US", quota)
+        assert len(offers) == quota
+        assert len(offers.to_dicts()) == quota
+
+def test_price_offers_arrays():
+    offers = price_offers("GBP", "GB", 3)
+    assert offers.net.tolist() == simulate_net_prices(3).tolist()
+    assert offers.net[0] == DEFAULT_NET_PRICE
+    assert np.all(np.diff(offers.net) > 0)
+    assert offers.markup.tolist() == [DEFAULT_MARKUP] * 3
+    assert offers.hotel_codes.tolist() == [SIMULATED_HOTEL_CODE, SIMULATED_HOTEL_CODE + 1, SIMULATED_HOTEL_CODE + 2]
+
+def test_price_offers_matches_scalar_conversion():
+    for currency in ("USD", "EUR", "GBP"):
+        offers = price_offers(currency, "US", 50)
+        for net, selling_price, exchange_rate in zip(offers.net, offers.selling_price, offers.exchange_rate):
+            expected_price, expected_rate = convert_currency("USD", currency, net * (1 + DEFAULT_MARKUP / 100))
+            assert exchange_rate == expected_rate
+            assert selling_price == round(expected_price, 2)
+
+def test_to_dicts_format():
+    offer = price_offers("EUR", "ES", 2).to_dicts()[1]
+    assert offer["id"] == "A#2"
+    assert offer["hotelCodeSupplier"] == str(SIMULATED_HOTEL_CODE + 1)
+    assert offer["market"] == "ES"
+    assert offer["price"]["currency"] == "USD"
+    assert offer["price"]["selling_currency"] == "EUR"
+    assert offer["price"]["minimumSellingPrice"] is None
+    assert all(type(offer["price"][key]) is float for key in ("net", "selling_price", "markup", "exchange_rate"))
+
+def test_few_offers_match_the_array_path(monkeypatch):
+    import dataclasses
+    from src import configs
+    from src.pricing import DEFAULT_PRICING
+    cases = [
+        (currency, markup, pricing, hotel_codes)
+        for currency in ("USD", "EUR", "GBP", "XXX")
+        for markup in (None, 0.0, 12.345)
+        for pricing in (DEFAULT_PRICING, dataclasses.replace(DEFAULT_PRICING, rounding="ROUND_HALF_UP", net_price=0.05))
+        for hotel_codes in (None, np.array([7, 3], dtype=np.int32))
+    ]
+    for quota in range(-1, configs.SCALAR_PRICING_MAX_OFFERS + 1):
+        for currency, markup, pricing, hotel_codes in cases:
+            few = price_offers(currency, "ES", quota, pricing, markup, hotel_codes)
+            monkeypatch.setattr(configs, "SCALAR_PRICING_MAX_OFFERS", -1)
+            array = price_offers(currency, "ES", quota, pricing, markup, hotel_codes)
+            monkeypatch.undo()
+            for field in ("hotel_codes", "net", "markup", "selling_price", "exchange_rate"):
+                assert getattr(few, field).dtype == getattr(array, field).dtype
+                assert getattr(few, field).tolist() == getattr(array, field).tolist()
+            assert few.to_dicts() == array.to_dicts()
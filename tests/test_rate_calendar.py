@@ -0,0 +1,140 @@
+import datetime
+import json
+from decimal import Decimal, ROUND_HALF_EVEN
+import numpy as np
+import pytest
+from src import config_snapshot, configs
+from src.config_snapshot import reload_config
+from src.main import process_request_bytes
+from src.pricing import PricingConfig, price_offers, price_stays
+from src.rate_calendar import NightlyRate, RateCalendar, load_rate_calendar
+from src.response_cache import RESPONSE_CACHE
+from tests.test_main import create_full_xml
+
+HEADER = "hotel_code,start_date,end_date,net\n"
+
+def day(month, date):
+    return datetime.date(2030, month, date)
+
+RATES = [
+    NightlyRate(10, day(7, 1), day(7, 31), 100.0),
+    NightlyRate(10, day(7, 10), day(7, 12), 150.5),
+    NightlyRate(20, day(7, 1), day(7, 31), 90.0),
+    NightlyRate(30, day(7, 1), day(7, 9), 80.0),
+    NightlyRate(30, day(7, 11), day(7, 31), 80.0),
+]
+
+def nightly_rate(hotel_code, night):
+    # The rate listed last wins
+    return [
+        Decimal(str(rate.net)) for rate in RATES if rate.hotel_code == hotel_code and rate.start <= night <= rate.end
+    ][-1]
+
+def create_pricing(rates=RATES, **values):
+    pricing = PricingConfig.from_configs(dict(vars(configs), **values))
+    return PricingConfig(**dict(vars(pricing), rate_calendar=RateCalendar(rates)))
+
+def test_stay_net_from_prefix_sums():
+    calendar = RateCalendar(RATES)
+    rows, known = calendar.rows_for(np.array([30, 10, 15, 20, 99]))
+    assert known.tolist() == [True, True, False, True, False]
+    rows = rows[known]
+    # Nights of 8 to 13 July; the later range of hotel 10 overrides its nights 10-12
+    assert calendar.net_between(rows, day(7, 8), day(7, 14)).tolist() == [40000, 75150, 54000]
+    assert calendar.available(rows, day(7, 8), day(7, 14)).tolist() == [False, True, True]
+    assert calendar.available(rows, day(7, 11), day(7, 14)).tolist() == [True, True, True]
+    # Nights outside the calendar are never available
+    assert calendar.available(rows, day(6, 30), day(7, 3)).tolist() == [False, False, False]
+    assert calendar.available(rows, day(7, 30), day(8, 2)).tolist() == [False, False, False]
+    assert len(RateCalendar([])) == 0
+    assert RateCalendar([]).rows_for(np.array([10]))[1].tolist() == [False]
+
+def test_price_stays_matches_night_by_night_pricing():
+    pricing = create_pricing(MONEY_ROUNDING=ROUND_HALF_EVEN)
+    periods = ((day(7, 11), day(7, 15), 3.2), (day(7, 15), day(7, 20), 10.0))
+    offers = price_stays("EUR", "US", 10, periods, pricing)
+    # Hotel 30 has no rate for 10 July only, so it is still offered
+    assert offers.hotel_codes.tolist() == [30, 20, 10]
+    for hotel_code, net, selling_price in zip(offers.hotel_codes, offers.net, offers.selling_price):
+        nights = [
+            (nightly_rate(hotel_code, first + datetime.timedelta(days=offset)), markup)
+            for first, end, markup in periods for offset in range((end - first).days)
+        ]
+        exact = sum(rate * (1 + Decimal(str(markup)) / 100) for rate, markup in nights) * Decimal("0.9")
+        assert net == float(sum(rate for rate, _ in nights))
+        assert selling_price == float(exact.quantize(Decimal("0.01"), ROUND_HALF_EVEN))
+    assert offers.markup.tolist()[0] == pytest.approx((80 * 4 * 3.2 + 80 * 5 * 10) / (80 * 9), abs=1e-4)
+    assert offers.exchange_rate.tolist() == [0.9, 0.9, 0.9]
+
+def test_price_stays_quota_and_unavailable_hotels():
+    pricing = create_pricing()
+    periods = ((day(7, 8), day(7, 12), 3.2),)
+    assert price_stays("USD", "US", 1, periods, pricing).hotel_codes.tolist() == [20]
+    assert price_stays("USD", "US", 10, periods, pricing, np.array([30, 10, 99])).hotel_codes.tolist() == [10]
+    assert len(price_stays("USD", "US", 10, ((day(8, 1), day(8, 4), 3.2),), pricing)) == 0
+    assert len(price_stays("USD", "US", 0, periods, pricing)) == 0
+    # Without periods, or without a calendar, offers stay simulated
+    assert price_offers("USD", "US", 3, pricing).hotel_codes.tolist()[0] == configs.SIMULATED_HOTEL_CODE
+    assert price_offers("USD", "US", 3, periods=periods).hotel_codes.tolist()[0] == configs.SIMULATED_HOTEL_CODE
+    assert price_offers("USD", "US", 3, pricing, periods=periods).hotel_codes.tolist() == [20, 10]
+
+def test_price_stays_keeps_hotel_order_among_equal_prices():
+    pricing = create_pricing([NightlyRate(code, day(7, 1), day(7, 31), 100.0) for code in (50, 40, 30, 20)])
+    periods = ((day(7, 8), day(7, 12), 3.2),)
+    assert price_stays("USD", "US", 2, periods, pricing).hotel_codes.tolist() == [20, 30]
+    assert price_stays("USD", "US", 3, periods, pricing, np.array([40, 50, 20, 30])).hotel_codes.tolist() == [40, 50, 20]
+
+def test_load_rate_calendar(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text(HEADER + "10,2030-07-01,2030-07-31,100\n\n20,2030-07-05,2030-07-06,99.99\n")
+    calendar = load_rate_calendar(str(path))
+    assert calendar.hotel_codes.tolist() == [10, 20]
+    rows, _ = calendar.rows_for(np.array([20]))
+    assert calendar.net_between(rows, day(7, 5), day(7, 7)).tolist() == [19998]
+
+@pytest.mark.parametrize("content, message", [
+    ("hotel_code,net\n1,2\n", "missing columns"),
+    (HEADER + "abc,2030-07-01,2030-07-02,1\n", "line 2"),
+    (HEADER + "1,2030-07-02,2030-07-01,1\n", "after end_date"),
+    (HEADER + "1,2030-07-01,2030-07-02,-1\n", "negative"),
+])
+def test_load_rate_calendar_rejects_bad_files(tmp_path, content, message):
+    path = tmp_path / "rates.csv"
+    path.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        load_rate_calendar(str(path))
+
+def test_requests_are_priced_night_by_night(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_snapshot, "_current", config_snapshot._current)
+    RESPONSE_CACHE.clear()
+    start = datetime.date.today() + datetime.timedelta(days=3)
+    rates = tmp_path / "rates.csv"
+    rates.write_text(
+        HEADER
+        + f"1,{start},{start + datetime.timedelta(days=1)},100\n"
+        + f"1,{start + datetime.timedelta(days=2)},{start + datetime.timedelta(days=30)},200\n"
+        + f"2,{start},{start + datetime.timedelta(days=30)},150\n"
+    )
+    rules = tmp_path / "rules.csv"
+    second_night = start + datetime.timedelta(days=1)
+    rules.write_text(f"company_id,market,currency,start_date,end_date,markup\n123456,,,{second_night},{second_night},10\n")
+    settings = tmp_path / "settings.json"
+    settings.write_text(json.dumps({
+        "RATE_CALENDAR_FILE": str(rates), "MARKUP_RULES_FILE": str(rules), "DEFAULT_MARKUP": 0.0
+    }))
+    reload_config(str(settings))
+
+    xml_str = create_full_xml(start, start + datetime.timedelta(days=3))
+    offers = json.loads(process_request_bytes(xml_str))
+    # Hotel 1: 100 + 100 + 200 with 10% on the second night only; hotel 2: 3 x 150
+    assert [(offer["hotelCodeSupplier"], offer["price"]["net"], offer["price"]["selling_price"])
+            for offer in offers] == [("1", 400.0, 410.0), ("2", 450.0, 465.0)]
+    # Another company has the same markup on the first night but not on the second: the
+    # cached response of the first must not be served
+    other_company = xml_str.replace('CompanyID="123456"', 'CompanyID="654321"')
+    assert [offer["price"]["selling_price"] for offer in json.loads(process_request_bytes(other_company))] == [
+        400.0, 450.0
+    ]
+    longer = create_full_xml(start, start + datetime.timedelta(days=10))
+    assert [offer["price"]["net"] for offer in json.loads(process_request_bytes(longer))] == [1500.0, 1800.0]
+    RESPONSE_CACHE.clear()
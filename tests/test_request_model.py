@@ -0,0 +1,28 @@
+import pytest
+from src.request_model import AvailRequest, Room
+
+def test_room_packs_ages():
+    room = Room(["30", " 4 ", "0"])
+    assert room.ages.typecode == "B"
+    assert list(room) == [30, 4, 0]
+    assert len(room) == 3
+    assert not room.invalid_age
+
+@pytest.mark.parametrize("age, packed", [("-3", 0), ("5", 5), ("6", 6), ("255", 255), ("300", 255)])
+def test_room_clamps_ages_keeping_child_adult_split(age, packed):
+    room = Room([age])
+    assert list(room) == [packed]
+    assert (packed <= 5) == (int(age) <= 5)
+
+def test_room_invalid_age():
+    room = Room(["30", "abc"])
+    assert room.invalid_age
+    assert room != Room(["30", "0"])
+    assert room == Room(["30", "abc"])
+
+def test_request_model_uses_slots():
+    request = AvailRequest(rooms=[Room(["30"])])
+    with pytest.raises(AttributeError):
+        request.extra = 1
+    with pytest.raises(AttributeError):
+        request.rooms[0].extra = 1
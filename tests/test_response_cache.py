@@ -0,0 +1,83 @@
+import dataclasses
+from src import config_snapshot
+from src.request_model import AvailRequest, Room
+from src.response_cache import ResponseCache, request_fingerprint
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def create_validated(currency="EUR", quota=20):
+    return {
+        "extract_currency": currency,
+        "extract_nationality_and_market": "US",
+        "validate_dates": ("d1", "d2"),
+        "validate_options_quota": quota,
+    }
+
+def test_request_fingerprint_is_canonical():
+    first = request_fingerprint(AvailRequest(rooms=[Room(["30", "4"])], parameters={"username": "a"}), create_validated())
+    second = request_fingerprint(AvailRequest(rooms=[Room(["4", "30"])], parameters={"username": "b"}), create_validated())
+    assert first == second
+    assert first != request_fingerprint(AvailRequest(rooms=[Room(["30", "4"])]), create_validated(quota=5))
+    assert first != request_fingerprint(AvailRequest(rooms=[Room(["30"]), Room(["4"])]), create_validated())
+
+def test_cache_hit_miss_and_lru_eviction():
+    cache = ResponseCache(max_entries=2, max_bytes=1000, ttl=60)
+    assert cache.get("a") is None
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+    assert cache.stats() == {
+        "hits": 2, "misses": 2, "evictions": 1, "expirations": 0, "invalidations": 0, "entries": 2, "bytes": 2
+    }
+
+def test_cache_byte_bound():
+    cache = ResponseCache(max_entries=10, max_bytes=10, ttl=60)
+    cache.put("a", b"x" * 6)
+    cache.put("b", b"y" * 6)
+    assert cache.get("a") is None
+    assert cache.get("b") == b"y" * 6
+    cache.put("huge", b"z" * 11)
+    assert cache.get("huge") is None
+    assert cache.stats()["bytes"] == 6
+
+def test_cache_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=10, max_bytes=100, ttl=5, clock=clock)
+    cache.put("a", b"1")
+    clock.now = 4.9
+    assert cache.get("a") == b"1"
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+def test_cache_invalidated_on_config_change(monkeypatch):
+    cache = ResponseCache(max_entries=10, max_bytes=100, ttl=60)
+    cache.put("a", b"1")
+    snapshot = config_snapshot.current_snapshot()
+    monkeypatch.setattr(config_snapshot, "_current", dataclasses.replace(snapshot, version=snapshot.version + 1))
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+    cache.put("a", b"1")
+    assert cache.get("a") == b"1"
+
+def test_cache_custom_config_token():
+    token = [1]
+    cache = ResponseCache(max_entries=10, max_bytes=100, ttl=60, config_token=lambda: token[0])
+    cache.put("a", b"1")
+    token[0] = 2
+    assert cache.get("a") is None
+
+def test_cache_disabled():
+    cache = ResponseCache(max_entries=0)
+    cache.put("a", b"1")
+    assert not cache.enabled
+    assert cache.get("a") is None
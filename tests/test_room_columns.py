@@ -0,0 +1,64 @@
+import random
+import dataclasses
+import numpy as np
+import pytest
+from src.request_model import AvailRequest, Room
+from src.room_columns import (
+    ROOM_OK,
+    ROOM_COUNT_EXCEEDED,
+    ROOM_ERROR_MESSAGES,
+    RoomColumns,
+    room_errors,
+    validate_rooms_columnar
+)
+from src.validators import DEFAULT_RULES, validate_rooms_and_passengers
+
+def scalar_error(request: AvailRequest, rules=DEFAULT_RULES):
+    try:
+        validate_rooms_and_passengers(request, rules)
+    except ValueError as e:
+        return str(e)
+    return None
+
+def random_request(rng: random.Random) -> AvailRequest:
+    ages = ["1", "4", "5", "6", "30", "70", "-2", "300", "x"]
+    weights = [3, 3, 2, 2, 8, 2, 1, 1, 1]
+    rooms = [Room(rng.choices(ages, weights, k=rng.randint(0, 6))) for _ in range(rng.randint(0, 7))]
+    return AvailRequest(rooms=rooms)
+
+def test_room_columns_layout():
+    columns = RoomColumns.from_requests([
+        AvailRequest(rooms=[Room(["30", "4"]), Room(["7"])]),
+        AvailRequest(),
+        AvailRequest(rooms=[Room(["x"])]),
+    ])
+    assert columns.ages.tolist() == [30, 4, 7, 0]
+    assert columns.room_sizes.tolist() == [2, 1, 1]
+    assert columns.room_invalid.tolist() == [False, False, True]
+    assert columns.request_rooms.tolist() == [2, 0, 1]
+    assert columns.room_request.tolist() == [0, 0, 2]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_columnar_matches_scalar_validator(seed):
+    rng = random.Random(seed)
+    requests = [random_request(rng) for _ in range(500)]
+    assert room_errors(requests) == [scalar_error(request) for request in requests]
+
+def test_columnar_matches_scalar_validator_with_custom_rules():
+    rules = dataclasses.replace(DEFAULT_RULES, allowed_room_count=2, allowed_room_guest_count=6, allowed_child_count_per_room=4)
+    rng = random.Random(42)
+    requests = [random_request(rng) for _ in range(500)]
+    assert room_errors(requests, rules) == [scalar_error(request, rules) for request in requests]
+
+def test_columnar_codes():
+    codes = validate_rooms_columnar(RoomColumns.from_requests([
+        AvailRequest(rooms=[Room(["30"])]),
+        AvailRequest(rooms=[Room(["3"])] * 6),
+    ]))
+    assert codes.dtype == np.int8
+    assert codes.tolist() == [ROOM_OK, ROOM_COUNT_EXCEEDED]
+    assert ROOM_ERROR_MESSAGES[ROOM_COUNT_EXCEEDED] == "Exceeded maximum allowed room count."
+
+def test_columnar_empty_batch():
+    assert room_errors([]) == []
+    assert room_errors([AvailRequest()]) == [None]
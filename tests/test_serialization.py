@@ -0,0 +1,87 @@
+import io
+import json
+import socket
+import pytest
+from src import serialization
+from src.pricing import price_offers
+from src.serialization import (
+    encode_error,
+    encode_offers,
+    encode_offers_pretty,
+    encode_timeout_error,
+    iter_offers_json,
+    write_offers
+)
+
+@pytest.mark.parametrize("currency, market, quota", [
+    ("USD", "US", 1), ("EUR", "ES", 20), ("GBP", "GB", 50), ("XXX", "CA", 3), ("EUR", "US", 0),
+])
+def test_encode_offers_matches_compact_json_dumps(currency, market, quota):
+    offers = price_offers(currency, market, quota)
+    assert encode_offers(offers) == json.dumps(offers.to_dicts(), separators=(",", ":")).encode()
+
+def test_encode_offers_pretty():
+    offers = price_offers("EUR", "US", 2)
+    assert encode_offers_pretty(offers) == json.dumps(offers.to_dicts(), indent=2).encode()
+
+def test_encode_error_is_cached():
+    first = encode_error("optionsQuota cannot be greater than 50.")
+    assert first == b'{"error":"optionsQuota cannot be greater than 50."}'
+    assert encode_error("optionsQuota cannot be greater than 50.") is first
+    assert encode_error("Invalid XML format.", pretty=True) == b'{"error": "Invalid XML format."}'
+
+def test_encode_timeout_error():
+    assert json.loads(encode_timeout_error("parse", 100)) == {
+        "error": "Request deadline exceeded.", "stage": "parse", "timeoutMilliseconds": 100
+    }
+
+def test_write_offers_targets():
+    offers = price_offers("GBP", "GB", 5)
+    expected = encode_offers(offers)
+
+    buffer = bytearray(b"prefix:")
+    assert write_offers(offers, buffer) == len(expected)
+    assert bytes(buffer) == b"prefix:" + expected
+
+    stream = io.BytesIO()
+    write_offers(offers, stream)
+    assert stream.getvalue() == expected
+
+    left, right = socket.socketpair()
+    with left, right:
+        write_offers(offers, left)
+        left.shutdown(socket.SHUT_WR)
+        received = b"".join(iter(lambda: right.recv(65536), b""))
+    assert received == expected
+
+@pytest.mark.parametrize("quota", [0, 1, 2, 50])
+def test_iter_offers_json_streams_one_offer_at_a_time(quota):
+    offers = price_offers("EUR", "ES", quota)
+    pieces = list(iter_offers_json(offers))
+    assert b"".join(pieces) == json.dumps(offers.to_dicts(), separators=(",", ":")).encode()
+    assert len(pieces) == (1 if quota == 0 else quota + 1)
+
+@pytest.mark.parametrize("buffer_size", [0, 100, 10**6])
+def test_write_offers_flushes_in_buffered_writes(buffer_size):
+    offers = price_offers("USD", "US", 50)
+
+    class RecordingWriter:
+        def __init__(self):
+            self.writes = []
+
+        def write(self, data):
+            self.writes.append(data)
+
+    out = RecordingWriter()
+    assert write_offers(offers, out, buffer_size) == len(encode_offers(offers))
+    assert b"".join(out.writes) == encode_offers(offers)
+    assert all(len(data) < buffer_size + 300 for data in out.writes[:-1])
+    if buffer_size == 0:
+        assert len(out.writes) == 51
+    elif buffer_size == 10**6:
+        assert len(out.writes) == 1
+
+def test_iter_offers_json_across_offer_blocks(monkeypatch):
+    monkeypatch.setattr(serialization, "OFFER_BLOCK_SIZE", 7)
+    offers = price_offers("EUR", "US", 20)
+    assert b"".join(iter_offers_json(offers)) == json.dumps(offers.to_dicts(), separators=(",", ":")).encode()
@@ -0,0 +1,250 @@
+import asyncio
+import datetime
+import json
+from functools import partial
+from src.main import process_request
+from src.server import AvailServer
+from tests.test_main import create_full_xml
+
+def create_body(**kwargs) -> bytes:
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    return create_full_xml(start, end, **kwargs).encode()
+
+async def send(writer, body: bytes, path: str = "/avail", method: str = "POST", extra_headers: str = "") -> None:
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n{extra_headers}\r\n"
+    writer.write(head.encode() + body)
+    await writer.drain()
+
+async def receive(reader):
+    head = (await reader.readuntil(b"\r\n\r\n")).decode()
+    status = int(head.split(" ")[1])
+    headers = dict(line.lower().split(": ", 1) for line in head.split("\r\n")[1:] if line)
+    body = await reader.readexactly(int(headers["content-length"]))
+    return status, headers, body
+
+def run_with_server(scenario, **server_kwargs):
+    async def runner():
+        server = AvailServer(host="127.0.0.1", port=0, **server_kwargs)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+    return asyncio.run(runner())
+
+def test_server_keep_alive_multiple_requests():
+    bodies = [create_body(), create_body(options_quota="60"), b"not xml"]
+
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        responses = []
+        for body in bodies:
+            await send(writer, body)
+            responses.append(await receive(reader))
+        writer.close()
+        return responses
+
+    responses = run_with_server(scenario)
+    for body, (status, headers, payload) in zip(bodies, responses):
+        assert status == 200
+        assert headers["connection"] == "keep-alive"
+        assert headers["content-type"] == "application/json"
+        assert payload.decode() == process_request(body, compact=True)
+    assert json.loads(responses[1][2])["error"] == "optionsQuota cannot be greater than 50."
+
+def test_server_error_statuses():
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await send(writer, b"", path="/other")
+        not_found = await receive(reader)
+        await send(writer, b"", method="GET")
+        not_allowed = await receive(reader)
+        await send(writer, b"x" * 100)
+        too_large = await receive(reader)
+        closed = await reader.read()
+        writer.close()
+        return not_found, not_allowed, too_large, closed
+
+    not_found, not_allowed, too_large, closed = run_with_server(scenario, max_body_bytes=50)
+    assert not_found[0] == 404
+    assert not_allowed[0] == 405
+    assert too_large[0] == 413
+    assert too_large[1]["connection"] == "close"
+    assert closed == b""
+
+def test_server_connection_close():
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await send(writer, create_body(), extra_headers="Connection: close\r\n")
+        response = await receive(reader)
+        closed = await reader.read()
+        writer.close()
+        return response, closed
+
+    (status, headers, _), closed = run_with_server(scenario)
+    assert status == 200
+    assert headers["connection"] == "close"
+    assert closed == b""
+
+def test_server_concurrent_connections_limited_in_flight():
+    body = create_body()
+    other = create_body(options_quota="7")
+
+    async def scenario(server):
+        async def client():
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            results = []
+            for _ in range(5):
+                await send(writer, body)
+                results.append(await receive(reader))
+            writer.close()
+            return results
+        return await asyncio.gather(*(client() for _ in range(8)))
+
+    expected = process_request(body, compact=True).encode()
+    for results in run_with_server(scenario, max_in_flight=2):
+        assert [payload for _, _, payload in results] == [expected] * 5
+
+def test_server_coalesces_identical_bodies(monkeypatch):
+    import time
+    from src import server as server_module
+    calls = []
+
+    def slow_process(request, parser, received_at, **kwargs):
+        calls.append(request)
+        time.sleep(0.05)
+        return b"[]"
+
+    monkeypatch.setattr(server_module, "process_request_bytes", slow_process)
+    body = create_body()
+    other = create_body(options_quota="7")
+
+    async def client(server, payload):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await send(writer, payload)
+        response = await receive(reader)
+        writer.close()
+        return response
+
+    async def scenario(server):
+        return await asyncio.gather(*(client(server, payload) for payload in (body, body, body, other)))
+
+    responses = run_with_server(scenario, parser="expat")
+    assert [response[2] for response in responses] == [b"[]"] * 4
+    assert sorted(request.options_quota for request in calls) == ["20", "7"]
+
+    # Live supplier answers are never shared
+    calls.clear()
+    responses = run_with_server(scenario, parser="expat", suppliers=[])
+    assert [response[2] for response in responses] == [b"[]"] * 4
+    assert sorted(request.options_quota for request in calls) == ["20", "20", "20", "7"]
+
+def test_server_rejects_before_body_complete():
+    body = create_body(options_quota="60")
+    cut = body.index(b"</optionsQuota>") + len(b"</optionsQuota>")
+
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        head = f"POST /avail HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+        writer.write(head.encode() + body[:cut])
+        await writer.drain()
+        # The rest of the body is never sent
+        response = await asyncio.wait_for(receive(reader), 5)
+        closed = await reader.read()
+        writer.close()
+        return response, closed
+
+    (status, headers, payload), closed = run_with_server(scenario, parser="expat")
+    assert status == 200
+    assert headers["connection"] == "close"
+    assert json.loads(payload) == {"error": "optionsQuota cannot be greater than 50."}
+    assert closed == b""
+
+def test_server_parses_bodies_off_the_event_loop(monkeypatch):
+    import threading
+    from src.feed import RequestFeed
+    threads = []
+    feed = RequestFeed.feed
+
+    def recording_feed(self, chunk):
+        threads.append(threading.current_thread())
+        return feed(self, chunk)
+
+    monkeypatch.setattr(RequestFeed, "feed", recording_feed)
+
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await send(writer, create_body())
+        response = await receive(reader)
+        writer.close()
+        return response
+
+    status, _, payload = run_with_server(scenario, parser="expat")
+    assert status == 200
+    assert isinstance(json.loads(payload), list)
+    assert threads and threading.main_thread() not in threads
+
+def test_server_coalesces_small_reads_into_slot_bound_feed_steps(monkeypatch):
+    from src import server as server_module
+    from src.feed import RequestFeed
+    monkeypatch.setattr(server_module, "SERVER_FEED_WAIT", 0.5)
+    servers = []
+    steps = []
+    feed = RequestFeed.feed
+
+    def recording_feed(self, chunk):
+        steps.append((len(chunk), servers[0]._in_flight.locked()))
+        return feed(self, chunk)
+
+    monkeypatch.setattr(RequestFeed, "feed", recording_feed)
+    body = create_body()
+
+    async def scenario(server):
+        servers.append(server)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(f"POST /avail HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode())
+        for start in range(0, len(body), 64):
+            writer.write(body[start:start + 64])
+            await writer.drain()
+        response = await receive(reader)
+        writer.close()
+        return response
+
+    status, _, payload = run_with_server(scenario, parser="expat", max_in_flight=1)
+    assert status == 200
+    assert payload.decode() == process_request(body, compact=True)
+    # The 64-byte writes reach the parser in one step, which holds the only in-flight slot
+    assert steps == [(len(body), True)]
+
+def test_server_streams_large_responses_chunked(monkeypatch):
+    from src import main as main_module
+    from src.response_cache import RESPONSE_CACHE
+    from src.serialization import write_offers
+    RESPONSE_CACHE.clear()
+    monkeypatch.setattr(main_module, "write_offers", partial(write_offers, buffer_size=0))
+    body = create_body(options_quota="5")
+
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await send(writer, body)
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n"))[:-2], 16)
+            chunks.append((await reader.readexactly(size + 2))[:-2])
+            if not size:
+                break
+        # The connection stays usable; the cached response comes whole
+        await send(writer, body)
+        cached = await receive(reader)
+        writer.close()
+        return head, chunks, cached
+
+    head, chunks, cached = run_with_server(scenario)
+    assert "transfer-encoding: chunked" in head.lower()
+    assert len(chunks) == 7
+    assert b"".join(chunks) == process_request(body, compact=True).encode() == cached[2]
+    assert cached[1]["content-length"] == str(len(cached[2]))
+    RESPONSE_CACHE.clear()
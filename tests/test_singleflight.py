@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import pytest
+from src.singleflight import AsyncSingleFlight, SingleFlight
+
+def start_leader(flight, key, fn):
+    # Runs the leader in a thread and returns once it is inside fn
+    entered = threading.Event()
+    release = threading.Event()
+
+    def leader_fn():
+        entered.set()
+        release.wait(5)
+        return fn()
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    leader = pool.submit(flight.do, key, leader_fn)
+    assert entered.wait(5)
+    return pool, leader, release
+
+def test_single_flight_shares_result():
+    flight = SingleFlight()
+    calls = []
+    pool, leader, release = start_leader(flight, "k", lambda: calls.append(1) or b"body")
+    with ThreadPoolExecutor(max_workers=4) as followers:
+        shared = [followers.submit(flight.do, "k", lambda: calls.append(2) or b"other") for _ in range(4)]
+        while flight.shared < 4:
+            pass
+        release.set()
+        assert leader.result() == (b"body", False)
+        assert [future.result() for future in shared] == [(b"body", True)] * 4
+    pool.shutdown()
+    assert calls == [1]
+    assert flight.in_flight() == 0
+    # Completed flights are not remembered
+    assert flight.do("k", lambda: b"again") == (b"again", False)
+
+def test_single_flight_shares_exception():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    pool, leader, release = start_leader(flight, "k", fail)
+    with ThreadPoolExecutor(max_workers=1) as followers:
+        follower = followers.submit(flight.do, "k", lambda: b"unused")
+        while flight.shared < 1:
+            pass
+        release.set()
+        with pytest.raises(ValueError, match="boom"):
+            leader.result()
+        with pytest.raises(ValueError, match="boom"):
+            follower.result()
+    pool.shutdown()
+    assert flight.in_flight() == 0
+
+def test_single_flight_follower_timeout():
+    flight = SingleFlight()
+    pool, leader, release = start_leader(flight, "k", lambda: b"body")
+    with pytest.raises(FutureTimeoutError):
+        flight.do("k", lambda: b"unused", timeout=0.01)
+    release.set()
+    assert leader.result() == (b"body", False)
+    pool.shutdown()
+
+def test_single_flight_distinct_keys():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
+    assert flight.leaders == 2 and flight.shared == 0
+
+def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return b"body"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", compute) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert results == [(b"body", False)] + [(b"body", True)] * 4
+    assert calls == [1]
+    assert flight.in_flight() == 0
+
+def test_async_single_flight_exception():
+    flight = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["boom", "boom"]
+    assert flight.in_flight() == 0
@@ -0,0 +1,74 @@
+import datetime
+import io
+import json
+import tracemalloc
+from src.main import main, process_request
+from src.stream import iter_documents, process_stream
+from tests.test_main import create_full_xml
+
+def create_docs() -> list:
+    today = datetime.date.today()
+    start = today + datetime.timedelta(days=3)
+    end = start + datetime.timedelta(days=3)
+    return [
+        create_full_xml(start, end).strip(),
+        create_full_xml(start, end, options_quota="60").strip(),
+        '<?xml version="1.0" encoding="UTF-8"?>\n<AvailRQ><optionsQuota>70</optionsQuota></AvailRQ >',
+        '<AvailRQ/>',
+    ]
+
+def test_iter_documents_concatenated_and_newline_delimited():
+    docs = create_docs()
+    for separator in ("", "\n", "\r\n  \n"):
+        data = separator.join(docs).encode()
+        for read_size in (1, 7, 4096):
+            assert list(iter_documents(io.BytesIO(data), read_size=read_size)) == [doc.encode() for doc in docs]
+
+def test_iter_documents_trailing_garbage():
+    data = b"<AvailRQ></AvailRQ>\n<AvailRQ><Currency>US"
+    assert list(iter_documents(io.BytesIO(data), read_size=5)) == [b"<AvailRQ></AvailRQ>", b"<AvailRQ><Currency>US"]
+
+def test_iter_documents_oversized_document_is_skipped():
+    oversized = b"<AvailRQ>" + b"<x/>" * 100 + b"</AvailRQ>"
+    data = oversized + b"\n<AvailRQ/>"
+    documents = list(iter_documents(io.BytesIO(data), read_size=16, max_document_bytes=64))
+    assert documents == [oversized[:64], b"<AvailRQ/>"]
+
+def test_iter_documents_skipping_holds_a_bounded_tail():
+    # 4 MiB of an oversized document after its last "<" holds no closing tag
+    junk = b"x" * (4 * 1024 * 1024)
+    for skipped in (junk, b"<" + junk):
+        data = b"<AvailRQ>" + b"<x/>" * 100 + skipped + b"</AvailRQ>\n<AvailRQ/>"
+        documents = iter_documents(io.BytesIO(data), read_size=4096, max_document_bytes=1024)
+        assert next(documents) == data[:1024]
+        tracemalloc.start()
+        try:
+            assert list(documents) == [b"<AvailRQ/>"]
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # The retained tail stays within max_document_bytes plus one read
+        assert peak < 1024 + 4096 + 16 * 1024
+
+def test_process_stream_writes_ndjson():
+    docs = create_docs()
+    output = io.BytesIO()
+    count = process_stream(io.BytesIO("\n".join(docs).encode()), output)
+    lines = output.getvalue().decode().splitlines()
+    assert count == len(docs) == len(lines)
+    for doc, line in zip(docs, lines):
+        assert line == process_request(doc, compact=True)
+        assert json.loads(line) == json.loads(process_request(doc))
+
+def test_main_stream_mode(tmp_path):
+    docs = create_docs()
+    input_path = tmp_path / "replay.xml"
+    output_path = tmp_path / "responses.ndjson"
+    input_path.write_text("".join(docs))
+    main(["--input", str(input_path), "--output", str(output_path), "--mode", "thread", "--chunksize", "2"])
+    lines = output_path.read_text().splitlines()
+    assert lines == [process_request(doc, compact=True) for doc in docs]
+
+def test_main_sample(capsys):
+    main([])
+    assert json.loads(capsys.readouterr().out)
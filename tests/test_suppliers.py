@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+import json
+import random
+import time
+from src.main import process_request_bytes
+from src.pricing import DEFAULT_PRICING
+from src.suppliers import (
+    LatencyProfile,
+    StubSupplier,
+    SupplierQuery,
+    collect_offers,
+    fan_out,
+    stub_suppliers
+)
+from tests.test_main import create_full_xml
+
+def create_query(quota=20):
+    return SupplierQuery("EUR", "US", quota, DEFAULT_PRICING, DEFAULT_PRICING.markup)
+
+def stub(name, latency_ms, hotel_code, offer_count=5, failure_rate=0.0):
+    return StubSupplier(name, LatencyProfile(latency_ms), hotel_code, offer_count=offer_count, failure_rate=failure_rate)
+
+def test_gathers_cheapest_offers_across_suppliers():
+    suppliers = [stub("slow", 30, 2000), stub("fast", 1, 1000)]
+    result = collect_offers(suppliers, create_query())
+    assert result.responded == ("fast", "slow")
+    # Equal prices keep arrival order
+    assert result.offers.hotel_codes.tolist() == [1000, 2000, 1001, 2001, 1002, 2002, 1003, 2003, 1004, 2004]
+    assert not result.partial
+
+def test_same_hotel_from_two_suppliers_is_deduplicated():
+    cheap = StubSupplier("cheap", LatencyProfile(20), 1000, price_factor=0.9, offer_count=5)
+    dear = StubSupplier("dear", LatencyProfile(1), 1000, price_factor=1.1, offer_count=5)
+    result = collect_offers([cheap, dear], create_query(quota=10))
+    assert result.offers.hotel_codes.tolist() == [1000, 1001, 1002, 1003, 1004]
+    # 132.42 * 0.9 is 119.18 in cents, then 5% dearer per offer
+    assert result.offers.net.tolist() == [119.18, 125.14, 131.1, 137.06, 143.02]
+
+def test_stops_once_quota_is_met():
+    suppliers = [stub("fast", 1, 1000, offer_count=20), stub("stalled", 10_000, 2000)]
+    started = time.monotonic()
+    result = collect_offers(suppliers, create_query(quota=20))
+    assert time.monotonic() - started < 2
+    assert result.responded == ("fast",)
+    assert result.cancelled == ("stalled",)
+    assert not result.timed_out
+    assert len(result.offers) == 20
+
+def test_returns_partial_offers_at_deadline():
+    suppliers = [stub("fast", 1, 1000), stub("stalled", 10_000, 2000)]
+    started = time.monotonic()
+    result = collect_offers(suppliers, create_query(), timeout=0.05)
+    assert time.monotonic() - started < 2
+    assert result.timed_out and result.partial
+    assert result.cancelled == ("stalled",)
+    assert result.offers.hotel_codes.tolist() == [1000, 1001, 1002, 1003, 1004]
+
+def test_failed_supplier_is_skipped():
+    suppliers = [stub("broken", 1, 1000, failure_rate=1.0), stub("ok", 5, 2000)]
+    result = collect_offers(suppliers, create_query())
+    assert result.failed == ("broken",)
+    assert result.responded == ("ok",)
+    assert len(result.offers) == 5
+
+def test_nothing_arrives_in_time():
+    result = collect_offers([stub("stalled", 10_000, 1000)], create_query(), timeout=0.01)
+    assert result.timed_out
+    assert len(result.offers) == 0
+
+def test_cancelling_fan_out_cancels_suppliers():
+    supplier = stub("stalled", 10_000, 1000)
+
+    async def scenario():
+        task = asyncio.ensure_future(fan_out([supplier], create_query()))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(scenario()) == []
+
+def test_latency_profile_sampling():
+    rng = random.Random(1)
+    assert LatencyProfile(40).sample(rng) == 0.04
+    assert LatencyProfile(40, tail_probability=1.0, tail_ms=500).sample(rng) == 0.5
+    samples = sorted(LatencyProfile(40, sigma=0.5).sample(rng) for _ in range(2000))
+    assert 0.035 < samples[1000] < 0.045
+    assert samples[-20] > 0.08
+
+def test_process_request_with_suppliers_answers_at_deadline():
+    start = datetime.date.today() + datetime.timedelta(days=3)
+    xml_str = create_full_xml(start, start + datetime.timedelta(days=3)).replace(
+        "<timeoutMilliseconds>25000</timeoutMilliseconds>", "<timeoutMilliseconds>100</timeoutMilliseconds>"
+    )
+    suppliers = [stub("fast", 1, 1000), stub("stalled", 10_000, 2000)]
+    offers = json.loads(process_request_bytes(xml_str, suppliers=suppliers))
+    assert [offer["hotelCodeSupplier"] for offer in offers] == ["1000", "1001", "1002", "1003", "1004"]
+    assert offers[0]["id"] == "A#1"
+
+def test_stub_suppliers_have_distinct_hotels():
+    suppliers = stub_suppliers(3, LatencyProfile(1), seed=1)
+    result = collect_offers(suppliers, create_query(quota=150))
+    assert len(set(result.offers.hotel_codes.tolist())) == 150
+
+def test_stub_suppliers_start_at_the_configured_hotel_code():
+    from src.configs import SIMULATED_HOTEL_CODE
+    assert [supplier.hotel_code for supplier in stub_suppliers(2, LatencyProfile(1))] == [
+        SIMULATED_HOTEL_CODE, SIMULATED_HOTEL_CODE + 1000
+    ]
+    assert stub_suppliers(1, LatencyProfile(1), base_code=5)[0].hotel_code == 5
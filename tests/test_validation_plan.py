@@ -0,0 +1,113 @@
+import dataclasses
+import pytest
+from src import validation_plan
+from src.request_model import AvailRequest
+from src.validators import DEFAULT_RULES
+from src.validation_plan import compile_validation_plan, run_validation_plan, RejectionStats
+
+def create_request(**fields) -> AvailRequest:
+    values = dict(
+        options_quota="20",
+        parameters={"password": "pass", "username": "user", "CompanyID": "123456"},
+        start_date="01/01/2099",
+        end_date="10/01/2099",
+    )
+    values.update(fields)
+    return AvailRequest(**values)
+
+def test_default_order_runs_cheap_rejecting_checks_first():
+    order = compile_validation_plan().order
+    assert order.index("validate_options_quota") < order.index("validate_dates")
+    assert order.index("extract_required_parameters") < order.index("validate_dates")
+    assert order.index("validate_rooms_and_passengers") < order.index("validate_dates")
+    assert set(order[-3:]) == {"validate_language_code", "extract_currency", "extract_nationality_and_market"}
+
+def test_plan_stops_at_first_error():
+    plan = compile_validation_plan()
+    request = create_request(options_quota="60", start_date="bad")
+    with pytest.raises(ValueError, match="optionsQuota cannot be greater than 50."):
+        plan.run(request)
+    assert plan.stats.rejected == {"validate_options_quota": 1}
+    assert "validate_dates" not in plan.stats.evaluated
+
+def test_plan_results():
+    results = compile_validation_plan().run(create_request(currency="GBP"))
+    assert results["validate_options_quota"] == 20
+    assert results["extract_required_parameters"]["CompanyID"] == 123456
+    assert results["extract_currency"] == "GBP"
+    assert results["validate_dates"][1].day == 10
+
+def test_plan_uses_compiled_rules():
+    rules = dataclasses.replace(DEFAULT_RULES, max_options_quota=10)
+    plan = compile_validation_plan(rules)
+    with pytest.raises(ValueError, match="optionsQuota cannot be greater than 10."):
+        plan.run(create_request())
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        plan.rules.max_options_quota = 50
+
+def test_plan_reorders_from_rejection_stats():
+    plan = compile_validation_plan()
+    for _ in range(50):
+        with pytest.raises(ValueError):
+            plan.run(create_request(start_date="bad"))
+    reordered = plan.reordered()
+    assert reordered.order[0] == "validate_dates"
+    assert reordered.stats is plan.stats
+    stats = RejectionStats()
+    stats.record(["validate_search_type"], "validate_search_type")
+    assert compile_validation_plan(stats=stats).order[0] == "validate_search_type"
+
+def test_run_validation_plan_reorders_active_plan(monkeypatch):
+    monkeypatch.setattr(validation_plan, "VALIDATION_STATS_SAMPLE_INTERVAL", 1)
+    monkeypatch.setattr(validation_plan, "VALIDATION_REORDER_INTERVAL", 10)
+    monkeypatch.setattr(validation_plan, "_active_plan", compile_validation_plan())
+    for _ in range(10):
+        with pytest.raises(ValueError):
+            run_validation_plan(create_request(parameters=None))
+    assert validation_plan.get_validation_plan().order[0] == "extract_required_parameters"
+
+def test_plan_run_overrides_step():
+    plan = compile_validation_plan()
+
+    def reject(request, rules):
+        raise ValueError("Exceeded maximum allowed room count.")
+
+    with pytest.raises(ValueError, match="Exceeded maximum allowed room count."):
+        plan.run(create_request(), overrides={"validate_rooms_and_passengers": reject})
+    assert plan.run(create_request(), overrides={"validate_rooms_and_passengers": lambda request, rules: None})
+
+def test_deadline_mid_plan_still_records_stats(monkeypatch):
+    from src.deadline import Deadline, DeadlineExceeded
+    monkeypatch.setattr(validation_plan, "VALIDATION_STATS_SAMPLE_INTERVAL", 1)
+    monkeypatch.setattr(validation_plan, "VALIDATION_REORDER_INTERVAL", 2)
+    monkeypatch.setattr(validation_plan, "_active_plan", compile_validation_plan())
+    plan = validation_plan.get_validation_plan()
+    # A deadline that started long ago runs out after the first step
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        run_validation_plan(create_request(), Deadline(timeout_ms=1, started=0.0))
+    assert exc_info.value.stage == plan.order[0]
+    assert plan.stats.requests == 1
+    assert plan.stats.evaluated == {plan.order[0]: 1}
+    assert plan.stats.rejected == {}
+    # The counter advanced, so the second request is the one that triggers the reorder
+    run_validation_plan(create_request())
+    assert plan.stats.requests == 2
+    assert validation_plan.get_validation_plan() is not plan
+
+def test_run_validation_plan_records_a_sample(monkeypatch):
+    monkeypatch.setattr(validation_plan, "VALIDATION_STATS_SAMPLE_INTERVAL", 4)
+    monkeypatch.setattr(validation_plan, "VALIDATION_REORDER_INTERVAL", 3)
+    monkeypatch.setattr(validation_plan, "_active_plan", compile_validation_plan())
+    plan = validation_plan.get_validation_plan()
+    for _ in range(8):
+        with pytest.raises(ValueError, match="optionsQuota cannot be greater than 50."):
+            run_validation_plan(create_request(options_quota="60"))
+    # Every request is validated, but only the first of every 4 is recorded
+    assert plan.stats.requests == 2
+    assert plan.stats.rejected == {"validate_options_quota": 2}
+    assert validation_plan.get_validation_plan() is plan
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            run_validation_plan(create_request(options_quota="60"))
+    assert plan.stats.requests == 3
+    assert validation_plan.get_validation_plan() is not plan
@@ -265,3 +265,9 @@ def test_invalid_age_value():
     with pytest.raises(ValueError, match="Invalid age value in Pax element."):
         validate_rooms_and_passengers(root)
 
+
+def test_out_of_range_ages_keep_child_adult_split():
+    # Negative ages count as children and ages above 255 as adults, as with int()
+    validate_rooms_and_passengers(create_xml_with_rooms("<Paxes><Pax age='-1'/><Pax age='300'/></Paxes>"))
+    with pytest.raises(ValueError, match="Each room with children must have at least one adult."):
+        validate_rooms_and_passengers(create_xml_with_rooms("<Paxes><Pax age='-1'/></Paxes>"))
@@ -1,7 +1,18 @@
 import datetime
 import pytest
 import xml.etree.ElementTree as ET
-from src.xml_parser import parse_xml, extract_timeout, parse_date, validate_dates
+from src.request_model import Room
+from src.xml_parser import (
+    parse_xml,
+    extract_timeout,
+    parse_date,
+    validate_dates,
+    extract_request,
+    request_from_element,
+    parse_request,
+    InputLimits,
+    InputLimitError
+)
 
 
 def test_parse_xml_valid():
@@ -85,3 +96,170 @@ def test_validate_dates_missing_elements():
     root = parse_xml(xml_str)
     with pytest.raises(ValueError, match="Missing StartDate or EndDate."):
         validate_dates(root)
+
+FULL_REQUEST_XML = """
+<AvailRQ xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+    <timeoutMilliseconds>25000</timeoutMilliseconds>
+    <source><languageCode> fr </languageCode></source>
+    <optionsQuota>30</optionsQuota>
+    <Configuration>
+        <Parameters>
+            <Parameter password="pass" username="user" CompanyID="123456"/>
+        </Parameters>
+    </Configuration>
+    <SearchType>Single</SearchType>
+    <AvailDestinations><Destination>Dest1</Destination></AvailDestinations>
+    <StartDate>14/10/2030</StartDate>
+    <EndDate></EndDate>
+    <Currency>GBP</Currency>
+    <Rooms>
+        <Paxes><Pax age="30"/><Pax age="4"/></Paxes>
+        <Paxes><Pax/><Pax age="invalid"/></Paxes>
+    </Rooms>
+</AvailRQ>
+"""
+
+def test_extract_request_fields():
+    request = extract_request(FULL_REQUEST_XML)
+    assert request.timeout == "25000"
+    assert request.language_code == " fr "
+    assert request.options_quota == "30"
+    assert request.parameters == {"password": "pass", "username": "user", "CompanyID": "123456"}
+    assert request.search_type == "Single"
+    assert request.destination_count == 1
+    assert request.destination_codes == ["Dest1"]
+    assert request.start_date == "14/10/2030"
+    assert request.end_date == ""
+    assert request.currency == "GBP"
+    assert request.nationality is None
+    assert request.rooms == [Room(["30", "4"]), Room(["0", "invalid"])]
+    assert request.rooms[1].invalid_age
+
+def test_extract_request_matches_etree():
+    assert extract_request(FULL_REQUEST_XML) == request_from_element(parse_xml(FULL_REQUEST_XML))
+    assert extract_request(FULL_REQUEST_XML.encode()) == parse_request(FULL_REQUEST_XML, parser="etree")
+
+def test_request_from_element_reads_fields_when_used():
+    root = parse_xml(FULL_REQUEST_XML)
+    request = request_from_element(root)
+    assert request.options_quota == extract_request(FULL_REQUEST_XML).options_quota
+    assert request._root is root
+    # Once every field has been read the tree is let go
+    assert request == extract_request(FULL_REQUEST_XML)
+    assert request._root is None
+
+def test_request_from_element_searches_later_siblings():
+    xml_str = (
+        "<AvailRQ><source/><source><languageCode>fr</languageCode></source><Configuration/>"
+        "<Configuration><Parameters><Parameter CompanyID='1'/></Parameters></Configuration></AvailRQ>"
+    )
+    request = request_from_element(parse_xml(xml_str))
+    assert request.language_code == "fr"
+    assert request.parameters == {"CompanyID": "1"}
+
+def test_extract_request_first_element_wins():
+    xml_str = "<AvailRQ><Currency>USD</Currency><Currency>GBP</Currency><AvailDestinations/></AvailRQ>"
+    request = extract_request(xml_str)
+    assert request.currency == "USD"
+    assert request.destination_count == 0
+    assert request == request_from_element(parse_xml(xml_str))
+
+def test_extract_destination_codes():
+    xml_str = (
+        '<AvailRQ><AvailDestinations><Destination code=" PMI "/><Destination> BCN </Destination>'
+        '<Destination/><Destination code="MAD">ignored</Destination></AvailDestinations></AvailRQ>'
+    )
+    request = extract_request(xml_str)
+    assert request.destination_count == 4
+    assert request.destination_codes == ["PMI", "BCN", "MAD"]
+    assert request == request_from_element(parse_xml(xml_str))
+
+def test_extract_request_text_before_first_child():
+    xml_str = "<AvailRQ><Currency>US<x/>D</Currency></AvailRQ>"
+    assert extract_request(xml_str).currency == parse_xml(xml_str).find('Currency').text
+
+def test_extract_request_invalid():
+    with pytest.raises(ET.ParseError):
+        extract_request("not xml")
+
+LIMITS = InputLimits(max_bytes=2000, max_elements=20, max_depth=4, max_paxes=3, max_pax=5)
+
+@pytest.mark.parametrize("xml_str, message", [
+    ("<AvailRQ>" + " " * 2000 + "</AvailRQ>", "maximum size"),
+    # 1000 characters but 2000 bytes in UTF-8
+    ("<AvailRQ><a>" + "é" * 990 + "</a></AvailRQ>", "maximum size"),
+    ("<AvailRQ>" + "<a/>" * 20 + "</AvailRQ>", "maximum number of elements"),
+    ("<AvailRQ><a><b><c><d/></c></b></a></AvailRQ>", "maximum nesting depth"),
+    ("<AvailRQ>" + "<Paxes/>" * 4 + "</AvailRQ>", "maximum number of Paxes"),
+    ("<AvailRQ><Paxes>" + "<Pax/>" * 6 + "</Paxes></AvailRQ>", "maximum number of Pax elements"),
+    ('<!DOCTYPE AvailRQ [<!ENTITY a "aaaa"><!ENTITY b "&a;&a;&a;">]><AvailRQ>&b;</AvailRQ>', "DTD"),
+    ('<!DOCTYPE AvailRQ SYSTEM "http://example.com/avail.dtd"><AvailRQ/>', "DTD"),
+])
+@pytest.mark.parametrize("backend", ["expat", "etree"])
+def test_parse_request_input_limits(backend, xml_str, message):
+    with pytest.raises(InputLimitError, match=message):
+        parse_request(xml_str, backend, LIMITS)
+
+@pytest.mark.parametrize("backend", ["expat", "etree"])
+def test_parse_request_within_limits(backend):
+    xml_str = "<AvailRQ><a><Paxes>" + '<Pax age="30"/>' * 5 + "</Paxes></a>" + "<Paxes/>" * 2 + "</AvailRQ>"
+    assert parse_request(xml_str, backend, LIMITS).rooms == [Room(["30"] * 5), Room(), Room()]
+
+def test_parse_xml_uses_guarded_builder_only_when_needed(monkeypatch):
+    from src import xml_parser
+    guarded = []
+    builder = xml_parser._GuardedTreeBuilder
+
+    def recording_builder(limits):
+        guarded.append(limits)
+        return builder(limits)
+
+    monkeypatch.setattr(xml_parser, "_GuardedTreeBuilder", recording_builder)
+    parse_xml(FULL_REQUEST_XML)
+    parse_xml(FULL_REQUEST_XML.encode())
+    assert guarded == []
+    # Markers in comments only make the pre-scan cautious; the result is the same
+    xml_str = "<AvailRQ><!-- <!DOCTYPE x> " + "<Pax " * 10 + "--><Currency>USD</Currency></AvailRQ>"
+    assert parse_xml(xml_str, LIMITS).find("Currency").text == "USD"
+    assert len(guarded) == 1
+
+@pytest.mark.parametrize("backend", ["expat", "etree"])
+def test_input_limit_reported_before_later_parse_error(backend):
+    with pytest.raises(InputLimitError, match="maximum nesting depth"):
+        parse_request("<AvailRQ><a><b><c><d/></c></b></a><broken", backend, LIMITS)
+
+def test_input_limit_aborts_parse_early():
+    # The element limit stops the parse before the malformed tail is reached
+    with pytest.raises(InputLimitError):
+        extract_request("<AvailRQ>" + "<a/>" * 20 + "<broken", LIMITS)
+
+def test_parse_request_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown XML parser backend"):
+        parse_request("<AvailRQ/>", parser="sax")
+
+def strptime_date(date_str: str):
+    try:
+        return datetime.datetime.strptime(date_str, "%d/%m/%Y").date()
+    except ValueError:
+        return None
+
+def cached_parse_date(date_str: str):
+    try:
+        return parse_date(date_str)
+    except ValueError:
+        return None
+
+@pytest.mark.parametrize("date_str", [
+    "14/10/2025", "29/02/2024", "29/02/2025", "31/04/2025", "00/01/2025", "01/00/2025",
+    "32/01/2025", "01/13/2025", "01/01/0000", "01/01/0001", "31/12/9999", "1/1/2025",
+    " 1/01/2025", "01/01/25", "01-01-2025", "01/01/2025 ", "ab/cd/efgh", "1٣/01/2025",
+    "٠١/01/2025", "+1/01/2025", "",
+])
+def test_parse_date_matches_strptime(date_str):
+    assert cached_parse_date(date_str) == strptime_date(date_str)
+
+def test_parse_date_is_cached():
+    parse_date.cache_clear()
+    parse_date("14/10/2030")
+    parse_date("14/10/2030")
+    assert parse_date.cache_info().hits == 1